@@ -0,0 +1,169 @@
+"""
+Task search benchmark
+
+Creates a separate `<PSQL_DB_NAME>_search_benchmark` database, seeds it with
+random tasks (Zipf-like word frequencies, so there are both common and rare
+words) and measures latency of the `GET /task/search` query: the first page
+and the page after a few cursors, for all tasks and for one user's tasks.
+
+Usage (from backend directory):
+    python benchmarks/task_search.py --tasks 1000000 --runs 20
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlalchemy_utils import create_database, database_exists, drop_database
+
+from db.models import BaseModel
+from service.controllers.v1.task.task import get_search_query
+from service.core import settings
+
+COMMON_WORDS = (
+    "fix add update remove refactor deploy release test review billing login "
+    "report dashboard api database cache queue email search export import user "
+    "task board sprint bug feature page form button error timeout migration"
+).split()
+SEED_BATCH_SIZE = 100_000
+USERS = 100
+QUERIES = (
+    "fix",
+    "billing",
+    "deploy billing",
+    '"login form"',
+    "export or import",
+    "migration -database",
+    "word7000",
+)
+
+
+def seed(engine, tasks: int) -> None:
+    """Insert users and tasks, names have 3 and descriptions 12 random words"""
+    words = COMMON_WORDS + [f"word{i}" for i in range(10_000)]
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                'INSERT INTO "user" (email, name, status, created_at) '
+                "SELECT 'user' || i || '@benchmark.test', 'User ' || i, "
+                "'DEVELOPER', now() FROM generate_series(1, :users) i"
+            ),
+            {"users": USERS},
+        )
+    # random()^3 skews picks to the beginning of the list (common words)
+    phrase = (
+        "(SELECT string_agg((CAST(:words AS text[]))"
+        "[1 + floor(random() ^ 3 * :count)::int], ' ') "
+        "FROM generate_series(1, {size}) WHERE i > 0)"
+    )
+    statement = text(
+        "INSERT INTO task (name, description, responsible_person_id, priority, "
+        "status, created_by, created_at) "
+        f"SELECT left({phrase.format(size=3)}, 40), "
+        f"left({phrase.format(size=12)}, 180), "
+        "1 + i % :users, 'Low', 'Todo', 1, now() "
+        "FROM generate_series(:start, :stop) i"
+    )
+    for start in range(1, tasks + 1, SEED_BATCH_SIZE):
+        stop = min(start + SEED_BATCH_SIZE - 1, tasks)
+        with engine.begin() as connection:
+            connection.execute(
+                statement,
+                {
+                    "words": words,
+                    "count": len(words),
+                    "users": USERS,
+                    "start": start,
+                    "stop": stop,
+                },
+            )
+        print(f"  seeded {stop} tasks")
+    # Task executors of user 1 for `mine` queries
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO task_executors (user_id, task_id, created_at) "
+                "SELECT 1, id, now() FROM task WHERE id % 50 = 0"
+            )
+        )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM ANALYZE"))
+
+
+def measure(engine, q: str, runs: int, user_id=None, pages: int = 1) -> list:
+    """Return latencies (ms) per page of fetching up to `pages` pages of 50 tasks"""
+    latencies = []
+    with Session(engine) as db:
+        for _ in range(runs):
+            after = None
+            started = time.perf_counter()
+            for page in range(1, pages + 1):
+                rows = db.execute(get_search_query(q, 51, user_id, after)).all()
+                if len(rows) <= 50:
+                    break
+                after = [rows[49].rank, rows[49].Task.id]
+            latencies.append((time.perf_counter() - started) * 1000 / page)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Keep the database")
+    args = parser.parse_args()
+
+    url = make_url(settings.PSQL_DB_URI)
+    url = url.set(database=f"{url.database}_search_benchmark")
+    if database_exists(url):
+        drop_database(url)
+    create_database(url)
+    engine = create_engine(url)
+    try:
+        BaseModel.metadata.create_all(engine)
+        started = time.perf_counter()
+        print(f"Seeding {args.tasks} tasks")
+        seed(engine, args.tasks)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s\n")
+
+        with engine.connect() as connection:
+            query = get_search_query(QUERIES[1], 51).compile(engine)
+            plan = connection.exec_driver_sql(
+                f"EXPLAIN ANALYZE {query}", query.params
+            ).scalars()
+            print("\n".join(plan), "\n")
+
+        print(
+            f"{'query':<22}{'matches':>9}{'mode':>10}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"
+        )
+        for q in QUERIES:
+            with Session(engine) as db:
+                matches = db.execute(
+                    select(func.count()).select_from(
+                        get_search_query(q, None).order_by(None).subquery()
+                    )
+                ).scalar()
+            for mode, user_id, pages in (
+                ("all", None, 1),
+                ("page 5", None, 5),
+                ("mine", 1, 1),
+            ):
+                latencies = sorted(measure(engine, q, args.runs, user_id, pages))
+                p95 = latencies[int(len(latencies) * 0.95) - 1]
+                print(
+                    f"{q:<22}{matches:>9}{mode:>10}"
+                    f"{statistics.median(latencies):>9.1f}{p95:>9.1f}"
+                    f"{latencies[-1]:>9.1f}"
+                )
+    finally:
+        engine.dispose()
+        if not args.keep:
+            drop_database(url)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,18 @@
-from .constants import (NAME_MAX, NAME_MIN, PASSWORD_MAX, PASSWORD_MIN,
-                        UserStatus)
-from .task import (MAX_DESCRIPTIONS_LENGTH, MAX_NAME_LENGTH, Priority,
-                   TaskStatus)
+from .activity import ActivityAction
+from .analytics import (DEFAULT_FLOW_DAYS, MAX_FLOW_DAYS, SnapshotFormat,
+                        SnapshotTable)
+from .constants import (MAX_BATCH_ITEMS, MAX_IDEMPOTENCY_KEY_LENGTH,
+                        MAX_USER_SEARCH_QUERY_LENGTH,
+                        MIN_USER_SEARCH_QUERY_LENGTH, NAME_MAX, NAME_MIN,
+                        PASSWORD_MAX, PASSWORD_MIN, USER_SEARCH_BUCKET_SIZE,
+                        USER_SEARCH_LIMIT, UserStatus)
+from .task import (AUTO_ASSIGN_LOCK_KEY, BOARD_COLUMN_SIZE,
+                   BULK_COPY_THRESHOLD, EXPORT_BATCH_SIZE, MAX_BULK_ITEMS,
+                   MAX_DESCRIPTIONS_LENGTH, MAX_NAME_LENGTH,
+                   MAX_SEARCH_QUERY_LENGTH, OPEN_TASK_STATUSES,
+                   TASK_CHANGES_CHANNEL, TASK_CHANGES_MAX_TASK_IDS,
+                   TASK_SEARCH_CONFIG, ExportFormat, ImportStatus, Priority,
+                   TaskInclude, TaskSort, TaskStatus)
 from .user import JWTType
 
 __all__ = (
@@ -10,9 +21,34 @@ __all__ = (
     "PASSWORD_MAX",
     "NAME_MIN",
     "NAME_MAX",
+    "USER_SEARCH_LIMIT",
+    "MAX_USER_SEARCH_QUERY_LENGTH",
+    "MIN_USER_SEARCH_QUERY_LENGTH",
+    "USER_SEARCH_BUCKET_SIZE",
+    "MAX_BATCH_ITEMS",
+    "MAX_IDEMPOTENCY_KEY_LENGTH",
     "JWTType",
     "MAX_DESCRIPTIONS_LENGTH",
     "MAX_NAME_LENGTH",
+    "MAX_BULK_ITEMS",
+    "BULK_COPY_THRESHOLD",
+    "EXPORT_BATCH_SIZE",
+    "TASK_SEARCH_CONFIG",
+    "MAX_SEARCH_QUERY_LENGTH",
+    "BOARD_COLUMN_SIZE",
+    "AUTO_ASSIGN_LOCK_KEY",
+    "OPEN_TASK_STATUSES",
+    "TASK_CHANGES_CHANNEL",
+    "TASK_CHANGES_MAX_TASK_IDS",
+    "ExportFormat",
+    "ImportStatus",
     "Priority",
     "TaskStatus",
+    "TaskSort",
+    "TaskInclude",
+    "SnapshotTable",
+    "SnapshotFormat",
+    "DEFAULT_FLOW_DAYS",
+    "MAX_FLOW_DAYS",
+    "ActivityAction",
 )
@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class ActivityAction(Enum):
+    TASK_CREATED = "TaskCreated"
+    TASK_UPDATED = "TaskUpdated"
+    TASK_DELETED = "TaskDeleted"
+    TASK_ASSIGNED = "TaskAssigned"
+    TASK_UNASSIGNED = "TaskUnassigned"
+    USER_SIGNED_UP = "UserSignedUp"
+    USER_INVITED = "UserInvited"
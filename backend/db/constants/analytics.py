@@ -0,0 +1,16 @@
+from enum import Enum
+
+# Days of task flow analytics by default and at most per request
+DEFAULT_FLOW_DAYS = 30
+MAX_FLOW_DAYS = 366
+
+
+class SnapshotTable(Enum):
+    TASK = "task"
+    TASK_EXECUTORS = "task_executors"
+    USER = "user"
+
+
+class SnapshotFormat(Enum):
+    PARQUET = "parquet"
+    ARROW = "arrow"
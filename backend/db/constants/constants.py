@@ -11,3 +11,17 @@ PASSWORD_MAX = 150
 
 NAME_MIN = 8
 NAME_MAX = 50
+
+# Typeahead user search
+USER_SEARCH_LIMIT = 10
+MAX_USER_SEARCH_QUERY_LENGTH = 50
+# Shorter queries have no trigrams to look up in the indexes. Users matching
+# the first characters of a query are cached together, up to the bucket size
+MIN_USER_SEARCH_QUERY_LENGTH = 3
+USER_SEARCH_BUCKET_SIZE = 200
+
+# Sub-requests of one batch request
+MAX_BATCH_ITEMS = 20
+
+# Client-generated key of a retried write, e.g. UUID
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
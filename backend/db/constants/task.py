@@ -3,6 +3,29 @@ from enum import Enum
 MAX_NAME_LENGTH = 40
 MAX_DESCRIPTIONS_LENGTH = 180
 
+# Max items in one bulk request and size from which COPY is used for inserts
+MAX_BULK_ITEMS = 5000
+BULK_COPY_THRESHOLD = 1000
+
+# Rows fetched from server-side cursor per round trip while exporting
+EXPORT_BATCH_SIZE = 1000
+
+# Text search configuration of task search vector
+TASK_SEARCH_CONFIG = "english"
+MAX_SEARCH_QUERY_LENGTH = 200
+
+# Tasks per status column of the board page
+BOARD_COLUMN_SIZE = 20
+
+# Key of transaction level advisory lock which serializes auto-assignments
+AUTO_ASSIGN_LOCK_KEY = 42_001
+
+# NOTIFY channel of task and assignment changes, see task stream
+TASK_CHANGES_CHANNEL = "task_changes"
+
+# Task ids per notification of the channel, payload must be under 8000 bytes
+TASK_CHANGES_MAX_TASK_IDS = 500
+
 
 class Priority(Enum):
     HIGH = "High"
@@ -14,3 +37,34 @@ class TaskStatus(Enum):
     TODO = "Todo"
     IN_PROGRESS = "InProgress"
     DONE = "Done"
+
+
+# Tasks in these statuses are the load of developer for auto-assignment
+OPEN_TASK_STATUSES = (TaskStatus.TODO, TaskStatus.IN_PROGRESS)
+
+
+class TaskInclude(Enum):
+    """Related rows which task listings can include"""
+
+    ASSIGNERS = "assigners"
+
+
+class ExportFormat(Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class ImportStatus(Enum):
+    QUEUED = "Queued"
+    RUNNING = "Running"
+    DONE = "Done"
+    FAILED = "Failed"
+
+
+class TaskSort(Enum):
+    """Sort keys of task listings, `-` means descending"""
+
+    CREATED_AT = "created_at"
+    CREATED_AT_DESC = "-created_at"
+    NAME = "name"
+    NAME_DESC = "-name"
@@ -0,0 +1,193 @@
+"""Task changes notify
+
+Revision ID: 5d67135928d2
+Revises: bbd306b0b0d1
+Create Date: 2026-10-19 15:41:46.263485
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5d67135928d2"
+down_revision = "bbd306b0b0d1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION task_changes_notify(
+            op text, user_ids integer[], task_ids integer[]
+        ) RETURNS void
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify('task_changes', json_build_object(
+                'op', op,
+                'user_id', c.user_id,
+                'task_ids', array_agg(c.task_id ORDER BY c.task_id)
+            )::text)
+            FROM (
+                SELECT
+                    p.user_id,
+                    p.task_id,
+                    (row_number() OVER (PARTITION BY p.user_id ORDER BY p.task_id) - 1)
+                        / 500 AS part
+                FROM (
+                    SELECT DISTINCT u.user_id, u.task_id
+                    FROM unnest(user_ids, task_ids) AS u(user_id, task_id)
+                    WHERE u.user_id IS NOT NULL
+                ) p
+            ) c
+            GROUP BY c.user_id, c.part;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION task_changes_task_insert() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM task_changes_notify(
+                'created', array_agg(n.responsible_person_id), array_agg(n.id)
+            )
+            FROM new_tasks n;
+            RETURN NULL;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION task_changes_task_update() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM task_changes_notify(
+                'updated', array_agg(c.user_id), array_agg(c.task_id)
+            )
+            FROM (
+                SELECT o.id AS task_id, o.responsible_person_id AS user_id
+                FROM old_tasks o
+                UNION SELECT n.id, n.responsible_person_id FROM new_tasks n
+                UNION SELECT e.task_id, e.user_id
+                FROM task_executors e
+                JOIN new_tasks n ON n.id = e.task_id
+            ) c;
+            RETURN NULL;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION task_changes_task_delete() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM task_changes_notify(
+                'deleted', array_agg(c.user_id), array_agg(OLD.id)
+            )
+            FROM (
+                SELECT OLD.responsible_person_id AS user_id
+                UNION SELECT e.user_id FROM task_executors e WHERE e.task_id = OLD.id
+            ) c;
+            RETURN OLD;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER task_changes_insert AFTER INSERT ON task
+        REFERENCING NEW TABLE AS new_tasks
+        FOR EACH STATEMENT EXECUTE FUNCTION task_changes_task_insert();
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER task_changes_update AFTER UPDATE ON task
+        REFERENCING OLD TABLE AS old_tasks NEW TABLE AS new_tasks
+        FOR EACH STATEMENT EXECUTE FUNCTION task_changes_task_update();
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER task_changes_delete BEFORE DELETE ON task
+        FOR EACH ROW EXECUTE FUNCTION task_changes_task_delete();
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION task_changes_executors_insert() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM task_changes_notify(
+                'assigned', array_agg(c.user_id), array_agg(c.task_id)
+            )
+            FROM (
+                SELECT t.id AS task_id, t.responsible_person_id AS user_id
+                FROM task t
+                WHERE t.id IN (SELECT task_id FROM new_executors)
+                UNION SELECT e.task_id, e.user_id
+                FROM task_executors e
+                WHERE e.task_id IN (SELECT task_id FROM new_executors)
+            ) c;
+            RETURN NULL;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION task_changes_executors_delete() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM task_changes_notify(
+                'unassigned', array_agg(c.user_id), array_agg(c.task_id)
+            )
+            FROM (
+                SELECT t.id AS task_id, t.responsible_person_id AS user_id
+                FROM task t
+                WHERE t.id IN (SELECT task_id FROM old_executors)
+                UNION SELECT e.task_id, e.user_id
+                FROM task_executors e
+                WHERE e.task_id IN (SELECT task_id FROM old_executors)
+                UNION SELECT o.task_id, o.user_id
+                FROM old_executors o
+                JOIN task t ON t.id = o.task_id
+            ) c;
+            RETURN NULL;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER task_changes_insert AFTER INSERT ON task_executors
+        REFERENCING NEW TABLE AS new_executors
+        FOR EACH STATEMENT EXECUTE FUNCTION task_changes_executors_insert();
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER task_changes_delete AFTER DELETE ON task_executors
+        REFERENCING OLD TABLE AS old_executors
+        FOR EACH STATEMENT EXECUTE FUNCTION task_changes_executors_delete();
+        """
+    )
+
+
+def downgrade() -> None:
+    for table in ("task", "task_executors"):
+        for action in ("insert", "update", "delete"):
+            op.execute(f"DROP TRIGGER IF EXISTS task_changes_{action} ON {table}")
+    for function in (
+        "task_changes_notify(text, integer[], integer[])",
+        "task_changes_task_insert()",
+        "task_changes_task_update()",
+        "task_changes_task_delete()",
+        "task_changes_executors_insert()",
+        "task_changes_executors_delete()",
+    ):
+        op.execute(f"DROP FUNCTION IF EXISTS {function}")
@@ -1,5 +1,11 @@
+from .activity import Activity
+from .analytics import AnalyticsWatermark, TaskCycleTimeDaily, TaskStatusDaily
 from .base import BaseModel
-from .task import Task, TaskExecutors
+from .history import TaskStatusHistory
+from .mail import FailedEmail
+from .stats import UserTaskStats
+from .sync import TaskTombstone
+from .task import Task, TaskArchive, TaskExecutors
 from .user import User
 
 __all__ = (
@@ -10,4 +16,16 @@ __all__ = (
     # Task
     "Task",
     "TaskExecutors",
+    "TaskArchive",
+    "UserTaskStats",
+    "TaskStatusHistory",
+    "TaskTombstone",
+    # Analytics
+    "TaskStatusDaily",
+    "TaskCycleTimeDaily",
+    "AnalyticsWatermark",
+    # Activity
+    "Activity",
+    # Mail
+    "FailedEmail",
 )
@@ -0,0 +1,26 @@
+from sqlalchemy import VARCHAR, Column, Index, Integer
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from .base import BaseModel
+
+
+class Activity(BaseModel):
+    """
+    Activity log: who created, updated, assigned and deleted what. Written in
+    batches by service.core.activity, `created_at` is the time of the action
+    """
+
+    __tablename__ = "activity"
+    # Set by the producer, so an event written twice is stored once
+    event_id = Column(UUID(as_uuid=False), nullable=False, unique=True, doc="Event id")
+    # No foreign keys: log outlives deleted tasks and users
+    actor_id = Column(Integer, nullable=False, doc="User who made the action")
+    action = Column(VARCHAR, nullable=False, doc="Activity action value")
+    task_id = Column(Integer, nullable=True, doc="Task of the action")
+    user_id = Column(Integer, nullable=True, doc="User of the action")
+    details = Column(JSONB, nullable=True, doc="Changed values")
+
+    __table_args__ = (
+        Index("ix_activity_task_id_created_at_id", "task_id", "created_at", "id"),
+        Index("ix_activity_actor_id_created_at_id", "actor_id", "created_at", "id"),
+    )
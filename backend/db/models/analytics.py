@@ -0,0 +1,47 @@
+from sqlalchemy import VARCHAR, Column, Date, DateTime, Float, Integer, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from .base import BaseModel
+
+
+class TaskStatusDaily(BaseModel):
+    """
+    Daily rollup of task_status_history: count of tasks which entered and
+    exited the status during the day. Maintained by the worker
+    """
+
+    __tablename__ = "task_status_daily"
+    day = Column(Date, nullable=False, doc="Day (UTC)")
+    status = Column(VARCHAR, nullable=False, doc="Task status value")
+    entered = Column(Integer, nullable=False, default=0, doc="Tasks entered status")
+    exited = Column(Integer, nullable=False, default=0, doc="Tasks exited status")
+
+    __table_args__ = (UniqueConstraint("day", "status"),)
+
+
+class TaskCycleTimeDaily(BaseModel):
+    """
+    Daily rollup of lead time (created to Done) and cycle time (first
+    InProgress to Done) of tasks done during the day. Histograms have fixed
+    buckets, so runs of the worker merge them by adding counts; percentiles
+    are in hours
+    """
+
+    __tablename__ = "task_cycle_time_daily"
+    day = Column(Date, nullable=False, unique=True, doc="Day (UTC)")
+    lead_time_histogram = Column(ARRAY(Integer), nullable=False, doc="Bucket counts")
+    cycle_time_histogram = Column(ARRAY(Integer), nullable=False, doc="Bucket counts")
+    lead_time_p50 = Column(Float, nullable=True, doc="Lead time median")
+    lead_time_p85 = Column(Float, nullable=True, doc="Lead time 85th percentile")
+    lead_time_p95 = Column(Float, nullable=True, doc="Lead time 95th percentile")
+    cycle_time_p50 = Column(Float, nullable=True, doc="Cycle time median")
+    cycle_time_p85 = Column(Float, nullable=True, doc="Cycle time 85th percentile")
+    cycle_time_p95 = Column(Float, nullable=True, doc="Cycle time 95th percentile")
+
+
+class AnalyticsWatermark(BaseModel):
+    """Time up to which the source rows are already added to a rollup"""
+
+    __tablename__ = "analytics_watermark"
+    name = Column(VARCHAR, nullable=False, unique=True, doc="Rollup name")
+    watermark = Column(DateTime, nullable=False, doc="Processed up to")
@@ -0,0 +1,87 @@
+from sqlalchemy import DDL, VARCHAR, Column, Index, Integer, event
+
+from .base import BaseModel
+from .task import Task
+
+
+class TaskStatusHistory(BaseModel):
+    """
+    Append-only log of task status transitions, written by triggers of task
+    table. `created_at` is the time of transition
+    """
+
+    __tablename__ = "task_status_history"
+    # No foreign key: history outlives deleted and archived tasks
+    task_id = Column(Integer, nullable=False, doc="Task id")
+    from_status = Column(VARCHAR, nullable=True, doc="Status before, null if created")
+    to_status = Column(VARCHAR, nullable=True, doc="Status after, null if deleted")
+
+    __table_args__ = (
+        Index("ix_task_status_history_task_id_created_at", "task_id", "created_at"),
+        Index("ix_task_status_history_created_at", "created_at"),
+    )
+
+
+# Statement level triggers write transitions of the whole statement with one
+# INSERT ... SELECT, so bulk changes of tasks don't log row by row
+TASK_INSERT_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_status_history_task_insert() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO task_status_history (task_id, from_status, to_status, created_at)
+    SELECT n.id, NULL, n.status, timezone('utc', now())
+    FROM new_tasks n;
+    RETURN NULL;
+END
+$$;
+"""
+
+TASK_UPDATE_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_status_history_task_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO task_status_history (task_id, from_status, to_status, created_at)
+    SELECT n.id, o.status, n.status, timezone('utc', now())
+    FROM old_tasks o
+    JOIN new_tasks n ON n.id = o.id
+    WHERE o.status IS DISTINCT FROM n.status;
+    RETURN NULL;
+END
+$$;
+"""
+
+TASK_DELETE_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_status_history_task_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO task_status_history (task_id, from_status, to_status, created_at)
+    SELECT o.id, o.status, NULL, timezone('utc', now())
+    FROM old_tasks o;
+    RETURN NULL;
+END
+$$;
+"""
+
+TASK_STATUS_HISTORY_DDL = (
+    TASK_INSERT_FUNCTION,
+    TASK_UPDATE_FUNCTION,
+    TASK_DELETE_FUNCTION,
+    """
+CREATE OR REPLACE TRIGGER task_status_history_insert AFTER INSERT ON task
+REFERENCING NEW TABLE AS new_tasks
+FOR EACH STATEMENT EXECUTE FUNCTION task_status_history_task_insert();
+""",
+    """
+CREATE OR REPLACE TRIGGER task_status_history_update AFTER UPDATE ON task
+REFERENCING OLD TABLE AS old_tasks NEW TABLE AS new_tasks
+FOR EACH STATEMENT EXECUTE FUNCTION task_status_history_task_update();
+""",
+    """
+CREATE OR REPLACE TRIGGER task_status_history_delete AFTER DELETE ON task
+REFERENCING OLD TABLE AS old_tasks
+FOR EACH STATEMENT EXECUTE FUNCTION task_status_history_task_delete();
+""",
+)
+
+for statement in TASK_STATUS_HISTORY_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement))
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from .base import BaseModel
+
+
+class FailedEmail(BaseModel):
+    """Mail task which has exhausted its retries (dead letter)"""
+
+    __tablename__ = "failed_email"
+
+    task_name = Column(String, nullable=False, doc="Celery task name")
+    args = Column(JSONB, nullable=False, default=list, doc="Task positional args")
+    kwargs = Column(JSONB, nullable=False, default=dict, doc="Task keyword args")
+    error = Column(Text, nullable=False, doc="Last delivery error")
+    retries = Column(Integer, nullable=False, default=0, doc="Retries made")
+    replayed_at = Column(DateTime, nullable=True, doc="Re-enqueued at")
+
+    __table_args__ = (
+        Index("ix_failed_email_pending", "id", postgresql_where=replayed_at.is_(None)),
+    )
@@ -0,0 +1,212 @@
+from sqlalchemy import (
+    DDL,
+    VARCHAR,
+    Column,
+    ForeignKey,
+    Integer,
+    UniqueConstraint,
+    event,
+)
+
+from .base import BaseModel
+from .task import Task, TaskExecutors
+
+
+class UserTaskStats(BaseModel):
+    """
+    Count of user's tasks (responsible person or executor) per status and
+    priority, maintained by triggers of task and task_executors tables
+    """
+
+    __tablename__ = "user_task_stats"
+    user_id = Column(
+        Integer,
+        ForeignKey("user.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="User id",
+    )
+    status = Column(VARCHAR, nullable=False, doc="Task status value")
+    priority = Column(VARCHAR, nullable=False, doc="Priority status value")
+    count = Column(Integer, nullable=False, default=0, doc="Tasks count")
+
+    __table_args__ = (UniqueConstraint("user_id", "status", "priority"),)
+
+
+# Triggers pass aggregated (user_id, status, priority, delta) changes of the
+# whole statement, so bulk inserts and updates don't touch counters row by row
+APPLY_FUNCTION = """
+CREATE OR REPLACE FUNCTION user_task_stats_apply(
+    user_ids integer[], statuses varchar[], priorities varchar[],
+    deltas integer[]
+) RETURNS void LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO user_task_stats (user_id, status, priority, count, created_at)
+    SELECT d.user_id, d.status, d.priority, sum(d.delta), timezone('utc', now())
+    FROM unnest(user_ids, statuses, priorities, deltas)
+        AS d(user_id, status, priority, delta)
+    -- Users deleted in this transaction have no counters
+    WHERE EXISTS (SELECT 1 FROM "user" u WHERE u.id = d.user_id)
+    GROUP BY 1, 2, 3
+    HAVING sum(d.delta) <> 0
+    -- All transactions lock counters in the same order
+    ORDER BY 1, 2, 3
+    ON CONFLICT (user_id, status, priority)
+    DO UPDATE SET count = user_task_stats.count + EXCLUDED.count;
+END
+$$;
+"""
+
+TASK_INSERT_FUNCTION = """
+CREATE OR REPLACE FUNCTION user_task_stats_task_insert() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM user_task_stats_apply(
+        array_agg(responsible_person_id),
+        array_agg(status),
+        array_agg(priority),
+        array_agg(1)
+    )
+    FROM new_tasks;
+    RETURN NULL;
+END
+$$;
+"""
+
+# Only tasks with changed status, priority or responsible person are counted
+# again, for every participant of the old and of the new version
+TASK_UPDATE_FUNCTION = """
+CREATE OR REPLACE FUNCTION user_task_stats_task_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM user_task_stats_apply(
+        array_agg(d.user_id),
+        array_agg(d.status),
+        array_agg(d.priority),
+        array_agg(d.delta)
+    )
+    FROM (
+        SELECT p.user_id, o.status, o.priority, -1 AS delta
+        FROM old_tasks o
+        JOIN new_tasks n ON n.id = o.id
+        CROSS JOIN LATERAL (
+            SELECT o.responsible_person_id AS user_id
+            UNION SELECT e.user_id FROM task_executors e WHERE e.task_id = o.id
+        ) p
+        WHERE (o.status, o.priority, o.responsible_person_id)
+            IS DISTINCT FROM (n.status, n.priority, n.responsible_person_id)
+        UNION ALL
+        SELECT p.user_id, n.status, n.priority, 1 AS delta
+        FROM old_tasks o
+        JOIN new_tasks n ON n.id = o.id
+        CROSS JOIN LATERAL (
+            SELECT n.responsible_person_id AS user_id
+            UNION SELECT e.user_id FROM task_executors e WHERE e.task_id = n.id
+        ) p
+        WHERE (o.status, o.priority, o.responsible_person_id)
+            IS DISTINCT FROM (n.status, n.priority, n.responsible_person_id)
+    ) d;
+    RETURN NULL;
+END
+$$;
+"""
+
+# Row level and before delete: executors are removed by cascade after it
+TASK_DELETE_FUNCTION = """
+CREATE OR REPLACE FUNCTION user_task_stats_task_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM user_task_stats_apply(
+        array_agg(p.user_id),
+        array_agg(OLD.status),
+        array_agg(OLD.priority),
+        array_agg(-1)
+    )
+    FROM (
+        SELECT OLD.responsible_person_id AS user_id
+        UNION SELECT e.user_id FROM task_executors e WHERE e.task_id = OLD.id
+    ) p;
+    RETURN OLD;
+END
+$$;
+"""
+
+# Executor who is the responsible person is counted already. Executors
+# deleted by cascade of task delete have no task and are skipped
+EXECUTORS_INSERT_FUNCTION = """
+CREATE OR REPLACE FUNCTION user_task_stats_executors_insert() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM user_task_stats_apply(
+        array_agg(e.user_id),
+        array_agg(t.status),
+        array_agg(t.priority),
+        array_agg(1)
+    )
+    FROM new_executors e
+    JOIN task t ON t.id = e.task_id
+    WHERE e.user_id <> t.responsible_person_id;
+    RETURN NULL;
+END
+$$;
+"""
+
+EXECUTORS_DELETE_FUNCTION = """
+CREATE OR REPLACE FUNCTION user_task_stats_executors_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM user_task_stats_apply(
+        array_agg(e.user_id),
+        array_agg(t.status),
+        array_agg(t.priority),
+        array_agg(-1)
+    )
+    FROM old_executors e
+    JOIN task t ON t.id = e.task_id
+    WHERE e.user_id <> t.responsible_person_id;
+    RETURN NULL;
+END
+$$;
+"""
+
+TASK_STATS_DDL = (
+    APPLY_FUNCTION,
+    TASK_INSERT_FUNCTION,
+    TASK_UPDATE_FUNCTION,
+    TASK_DELETE_FUNCTION,
+    """
+CREATE OR REPLACE TRIGGER user_task_stats_insert AFTER INSERT ON task
+REFERENCING NEW TABLE AS new_tasks
+FOR EACH STATEMENT EXECUTE FUNCTION user_task_stats_task_insert();
+""",
+    """
+CREATE OR REPLACE TRIGGER user_task_stats_update AFTER UPDATE ON task
+REFERENCING OLD TABLE AS old_tasks NEW TABLE AS new_tasks
+FOR EACH STATEMENT EXECUTE FUNCTION user_task_stats_task_update();
+""",
+    """
+CREATE OR REPLACE TRIGGER user_task_stats_delete BEFORE DELETE ON task
+FOR EACH ROW EXECUTE FUNCTION user_task_stats_task_delete();
+""",
+)
+
+TASK_EXECUTORS_STATS_DDL = (
+    EXECUTORS_INSERT_FUNCTION,
+    EXECUTORS_DELETE_FUNCTION,
+    """
+CREATE OR REPLACE TRIGGER user_task_stats_insert AFTER INSERT ON task_executors
+REFERENCING NEW TABLE AS new_executors
+FOR EACH STATEMENT EXECUTE FUNCTION user_task_stats_executors_insert();
+""",
+    """
+CREATE OR REPLACE TRIGGER user_task_stats_delete AFTER DELETE ON task_executors
+REFERENCING OLD TABLE AS old_executors
+FOR EACH STATEMENT EXECUTE FUNCTION user_task_stats_executors_delete();
+""",
+)
+
+# Function bodies are resolved when triggers fire, so tables can be created
+# in any order
+for statement in TASK_STATS_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement))
+for statement in TASK_EXECUTORS_STATS_DDL:
+    event.listen(TaskExecutors.__table__, "after_create", DDL(statement))
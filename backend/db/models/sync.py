@@ -0,0 +1,136 @@
+from sqlalchemy import DDL, BigInteger, Column, Index, Integer, event
+
+from .base import BaseModel
+from .task import Task, TaskExecutors
+from .user import User
+
+
+class TaskTombstone(BaseModel):
+    """
+    Task which left user's tasks: it was deleted, the user was unassigned or
+    isn't responsible person anymore. Written by triggers for delta sync and
+    purged by the worker after TASK_TOMBSTONE_LIFETIME days
+    """
+
+    __tablename__ = "task_tombstone"
+    # No foreign keys: tombstones outlive deleted tasks and users
+    task_id = Column(Integer, nullable=False, doc="Task id")
+    user_id = Column(Integer, nullable=False, doc="User id")
+    revision = Column(
+        BigInteger, nullable=False, doc="Id of the transaction which removed task"
+    )
+
+    __table_args__ = (
+        Index("ix_task_tombstone_user_id_revision", "user_id", "revision"),
+        Index("ix_task_tombstone_created_at", "created_at"),
+    )
+
+
+# Transaction ids grow monotonically, and every transaction which isn't
+# committed yet has id >= xmin of a snapshot
+REVISION_FUNCTION = """
+CREATE OR REPLACE FUNCTION set_revision() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.revision := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END
+$$;
+"""
+
+# Row level and before delete: executors are removed by cascade after it
+TASK_DELETE_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_tombstone_task_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO task_tombstone (task_id, user_id, revision, created_at)
+    SELECT OLD.id, p.user_id, pg_current_xact_id()::text::bigint,
+        timezone('utc', now())
+    FROM (
+        SELECT OLD.responsible_person_id AS user_id
+        UNION SELECT e.user_id FROM task_executors e WHERE e.task_id = OLD.id
+    ) p;
+    RETURN OLD;
+END
+$$;
+"""
+
+TASK_UPDATE_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_tombstone_task_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO task_tombstone (task_id, user_id, revision, created_at)
+    SELECT o.id, o.responsible_person_id, pg_current_xact_id()::text::bigint,
+        timezone('utc', now())
+    FROM old_tasks o
+    JOIN new_tasks n ON n.id = o.id
+    WHERE o.responsible_person_id <> n.responsible_person_id;
+    RETURN NULL;
+END
+$$;
+"""
+
+# Executors deleted by cascade of task delete have no task and are skipped.
+# Executor who is the responsible person still has the task
+EXECUTORS_DELETE_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_tombstone_executors_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO task_tombstone (task_id, user_id, revision, created_at)
+    SELECT e.task_id, e.user_id, pg_current_xact_id()::text::bigint,
+        timezone('utc', now())
+    FROM old_executors e
+    JOIN task t ON t.id = e.task_id
+    WHERE e.user_id <> t.responsible_person_id;
+    RETURN NULL;
+END
+$$;
+"""
+
+USER_SYNC_DDL = (
+    REVISION_FUNCTION,
+    """
+CREATE OR REPLACE TRIGGER set_revision BEFORE INSERT OR UPDATE ON "user"
+FOR EACH ROW EXECUTE FUNCTION set_revision();
+""",
+)
+
+TASK_SYNC_DDL = (
+    TASK_DELETE_FUNCTION,
+    TASK_UPDATE_FUNCTION,
+    """
+CREATE OR REPLACE TRIGGER set_revision BEFORE INSERT OR UPDATE ON task
+FOR EACH ROW EXECUTE FUNCTION set_revision();
+""",
+    """
+CREATE OR REPLACE TRIGGER task_tombstone_delete BEFORE DELETE ON task
+FOR EACH ROW EXECUTE FUNCTION task_tombstone_task_delete();
+""",
+    """
+CREATE OR REPLACE TRIGGER task_tombstone_update AFTER UPDATE ON task
+REFERENCING OLD TABLE AS old_tasks NEW TABLE AS new_tasks
+FOR EACH STATEMENT EXECUTE FUNCTION task_tombstone_task_update();
+""",
+)
+
+TASK_EXECUTORS_SYNC_DDL = (
+    EXECUTORS_DELETE_FUNCTION,
+    """
+CREATE OR REPLACE TRIGGER set_revision BEFORE INSERT OR UPDATE ON task_executors
+FOR EACH ROW EXECUTE FUNCTION set_revision();
+""",
+    """
+CREATE OR REPLACE TRIGGER task_tombstone_delete AFTER DELETE ON task_executors
+REFERENCING OLD TABLE AS old_executors
+FOR EACH STATEMENT EXECUTE FUNCTION task_tombstone_executors_delete();
+""",
+)
+
+# User table is created before task and task_executors, which use its
+# set_revision()
+for statement in USER_SYNC_DDL:
+    event.listen(User.__table__, "after_create", DDL(statement))
+for statement in TASK_SYNC_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement))
+for statement in TASK_EXECUTORS_SYNC_DDL:
+    event.listen(TaskExecutors.__table__, "after_create", DDL(statement))
@@ -1,6 +1,21 @@
-from sqlalchemy import (VARCHAR, Column, ForeignKey, Integer, String,
-                        UniqueConstraint)
-from sqlalchemy.orm import Mapped, relationship
+from sqlalchemy import (
+    ARRAY,
+    DDL,
+    VARCHAR,
+    BigInteger,
+    Column,
+    Computed,
+    DateTime,
+    FetchedValue,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    event,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, deferred, relationship
 
 from db import constants
 
@@ -24,11 +39,30 @@ class TaskExecutors(BaseModel):
         nullable=False,
         doc="Executor  id",
     )
+    # Set by trigger, see revision of task
+    revision = Column(
+        BigInteger,
+        nullable=False,
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
+        doc="Id of the last transaction which changed the row",
+    )
     assigned_user = relationship(User, lazy="joined", foreign_keys=[user_id])
 
     task = relationship("Task", lazy="joined", foreign_keys=[task_id])
 
-    __table_args__ = (UniqueConstraint("user_id", "task_id"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "task_id"),
+        # Assignments changed since the last sync of user
+        Index("ix_task_executors_user_id_revision", "user_id", "revision"),
+    )
+
+
+# Name matches are ranked above description matches
+TASK_SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{constants.TASK_SEARCH_CONFIG}', name), 'A') || "
+    f"setweight(to_tsvector('{constants.TASK_SEARCH_CONFIG}', description), 'B')"
+)
 
 
 class Task(BaseModel):
@@ -67,9 +101,243 @@ class Task(BaseModel):
         nullable=False,
         doc="Created by person id",
     )
+    # Deferred, so it isn't loaded with tasks
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(TASK_SEARCH_VECTOR, persisted=True),
+            doc="Full-text search vector of name and description",
+        )
+    )
+    # Set by trigger to id of the transaction, so rows written by transactions
+    # which commit after a sync snapshot are found by the next sync
+    revision = Column(
+        BigInteger,
+        nullable=False,
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
+        doc="Id of the last transaction which changed the row",
+    )
     priority_person: Mapped[User] = relationship(
         User, uselist=False, lazy="joined", foreign_keys=[responsible_person_id]
     )
     created_by_person: Mapped[User] = relationship(
         User, uselist=False, lazy="joined", foreign_keys=[created_by]
     )
+
+    __table_args__ = (
+        Index("ix_task_search_vector", search_vector, postgresql_using="gin"),
+        # Filters and sort keys of task listings
+        Index("ix_task_created_at_id", "created_at", "id"),
+        Index("ix_task_name_id", "name", "id"),
+        Index("ix_task_status_created_at", "status", "created_at", "id"),
+        Index("ix_task_priority_created_at", "priority", "created_at", "id"),
+        Index(
+            "ix_task_responsible_person_id_created_at",
+            "responsible_person_id",
+            "created_at",
+            "id",
+        ),
+        Index("ix_task_created_by_created_at", "created_by", "created_at", "id"),
+        Index("ix_task_status_name", "status", "name", "id"),
+        Index("ix_task_priority_name", "priority", "name", "id"),
+        Index(
+            "ix_task_responsible_person_id_name", "responsible_person_id", "name", "id"
+        ),
+        Index("ix_task_created_by_name", "created_by", "name", "id"),
+        Index("ix_task_revision", "revision"),
+    )
+
+
+class TaskArchive(BaseModel):
+    """Old Done tasks moved out of task table by maintenance job"""
+
+    __tablename__ = "task_archive"
+    name = Column(
+        String(length=constants.MAX_NAME_LENGTH), nullable=False, doc="Task name"
+    )
+    description = Column(
+        String(length=constants.MAX_DESCRIPTIONS_LENGTH),
+        nullable=False,
+        doc="Task description",
+    )
+    responsible_person_id = Column(
+        Integer, nullable=False, doc="responsible  person id"
+    )
+    priority = Column(VARCHAR, nullable=False, doc="Priority status value")
+    status = Column(VARCHAR, nullable=False, doc="Task status value")
+    created_by = Column(Integer, nullable=False, doc="Created by person id")
+    executor_ids = Column(
+        ARRAY(Integer), nullable=False, default=list, doc="Executors ids"
+    )
+    archived_at = Column(DateTime, nullable=False, doc="Archived at")
+
+
+# Changes are sent to TASK_CHANGES_CHANNEL when the transaction commits, one
+# notification per statement and user who sees the changed tasks in their
+# tasks: the responsible person and executors, before and after the change.
+# It holds up to TASK_CHANGES_MAX_TASK_IDS ids of the tasks, so the payload
+# stays under the 8000 bytes limit of NOTIFY and bulk writes don't send one
+# notification per row
+NOTIFY_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION task_changes_notify(
+    op text, user_ids integer[], task_ids integer[]
+) RETURNS void
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_notify('{constants.TASK_CHANGES_CHANNEL}', json_build_object(
+        'op', op,
+        'user_id', c.user_id,
+        'task_ids', array_agg(c.task_id ORDER BY c.task_id)
+    )::text)
+    FROM (
+        SELECT
+            p.user_id,
+            p.task_id,
+            (row_number() OVER (PARTITION BY p.user_id ORDER BY p.task_id) - 1)
+                / {constants.TASK_CHANGES_MAX_TASK_IDS} AS part
+        FROM (
+            SELECT DISTINCT u.user_id, u.task_id
+            FROM unnest(user_ids, task_ids) AS u(user_id, task_id)
+            WHERE u.user_id IS NOT NULL
+        ) p
+    ) c
+    GROUP BY c.user_id, c.part;
+END
+$$;
+"""
+
+TASK_INSERT_NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_changes_task_insert() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM task_changes_notify(
+        'created', array_agg(n.responsible_person_id), array_agg(n.id)
+    )
+    FROM new_tasks n;
+    RETURN NULL;
+END
+$$;
+"""
+
+TASK_UPDATE_NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_changes_task_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM task_changes_notify(
+        'updated', array_agg(c.user_id), array_agg(c.task_id)
+    )
+    FROM (
+        SELECT o.id AS task_id, o.responsible_person_id AS user_id
+        FROM old_tasks o
+        UNION SELECT n.id, n.responsible_person_id FROM new_tasks n
+        UNION SELECT e.task_id, e.user_id
+        FROM task_executors e
+        JOIN new_tasks n ON n.id = e.task_id
+    ) c;
+    RETURN NULL;
+END
+$$;
+"""
+
+# Row level and before delete: executors are removed by cascade after it
+TASK_DELETE_NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_changes_task_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM task_changes_notify(
+        'deleted', array_agg(c.user_id), array_agg(OLD.id)
+    )
+    FROM (
+        SELECT OLD.responsible_person_id AS user_id
+        UNION SELECT e.user_id FROM task_executors e WHERE e.task_id = OLD.id
+    ) c;
+    RETURN OLD;
+END
+$$;
+"""
+
+EXECUTORS_INSERT_NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_changes_executors_insert() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM task_changes_notify(
+        'assigned', array_agg(c.user_id), array_agg(c.task_id)
+    )
+    FROM (
+        SELECT t.id AS task_id, t.responsible_person_id AS user_id
+        FROM task t
+        WHERE t.id IN (SELECT task_id FROM new_executors)
+        UNION SELECT e.task_id, e.user_id
+        FROM task_executors e
+        WHERE e.task_id IN (SELECT task_id FROM new_executors)
+    ) c;
+    RETURN NULL;
+END
+$$;
+"""
+
+# Executors deleted by cascade of task delete have no task and are skipped
+EXECUTORS_DELETE_NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_changes_executors_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM task_changes_notify(
+        'unassigned', array_agg(c.user_id), array_agg(c.task_id)
+    )
+    FROM (
+        SELECT t.id AS task_id, t.responsible_person_id AS user_id
+        FROM task t
+        WHERE t.id IN (SELECT task_id FROM old_executors)
+        UNION SELECT e.task_id, e.user_id
+        FROM task_executors e
+        WHERE e.task_id IN (SELECT task_id FROM old_executors)
+        UNION SELECT o.task_id, o.user_id
+        FROM old_executors o
+        JOIN task t ON t.id = o.task_id
+    ) c;
+    RETURN NULL;
+END
+$$;
+"""
+
+TASK_NOTIFY_DDL = (
+    NOTIFY_FUNCTION,
+    TASK_INSERT_NOTIFY_FUNCTION,
+    TASK_UPDATE_NOTIFY_FUNCTION,
+    TASK_DELETE_NOTIFY_FUNCTION,
+    """
+CREATE OR REPLACE TRIGGER task_changes_insert AFTER INSERT ON task
+REFERENCING NEW TABLE AS new_tasks
+FOR EACH STATEMENT EXECUTE FUNCTION task_changes_task_insert();
+""",
+    """
+CREATE OR REPLACE TRIGGER task_changes_update AFTER UPDATE ON task
+REFERENCING OLD TABLE AS old_tasks NEW TABLE AS new_tasks
+FOR EACH STATEMENT EXECUTE FUNCTION task_changes_task_update();
+""",
+    """
+CREATE OR REPLACE TRIGGER task_changes_delete BEFORE DELETE ON task
+FOR EACH ROW EXECUTE FUNCTION task_changes_task_delete();
+""",
+)
+
+TASK_EXECUTORS_NOTIFY_DDL = (
+    EXECUTORS_INSERT_NOTIFY_FUNCTION,
+    EXECUTORS_DELETE_NOTIFY_FUNCTION,
+    """
+CREATE OR REPLACE TRIGGER task_changes_insert AFTER INSERT ON task_executors
+REFERENCING NEW TABLE AS new_executors
+FOR EACH STATEMENT EXECUTE FUNCTION task_changes_executors_insert();
+""",
+    """
+CREATE OR REPLACE TRIGGER task_changes_delete AFTER DELETE ON task_executors
+REFERENCING OLD TABLE AS old_executors
+FOR EACH STATEMENT EXECUTE FUNCTION task_changes_executors_delete();
+""",
+)
+
+for statement in TASK_NOTIFY_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement))
+for statement in TASK_EXECUTORS_NOTIFY_DDL:
+    event.listen(TaskExecutors.__table__, "after_create", DDL(statement))
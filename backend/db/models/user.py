@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Enum, String
+from sqlalchemy import BigInteger, Column, Enum, FetchedValue, Index, String
 
 from db import constants
 
@@ -20,3 +20,27 @@ class User(BaseModel):
         create_type=False,
         doc="User status (manager or developer)",
     )
+    # Set by trigger, see revision of task
+    revision = Column(
+        BigInteger,
+        nullable=False,
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
+        doc="Id of the last transaction which changed the row",
+    )
+
+    __table_args__ = (
+        # Trigram indexes of typeahead search (ILIKE '%q%'), need pg_trgm
+        Index(
+            "ix_user_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_user_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+    )
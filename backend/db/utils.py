@@ -1,6 +1,34 @@
+import csv
+import io
 from datetime import datetime
+from typing import Iterable, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
 
 
 def get_default_now():
     """return default now"""
     return datetime.utcnow()
+
+
+def allocate_ids(db: Session, table: str, count: int) -> list[int]:
+    """Reserve `count` values of table's primary key sequence"""
+    ids_query = text(
+        "SELECT nextval(pg_get_serial_sequence(:table, 'id')) "
+        "FROM generate_series(1, :count)"
+    )
+    return list(db.execute(ids_query, {"table": table, "count": count}).scalars())
+
+
+def copy_rows(
+    db: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence]
+) -> None:
+    """Load rows into table with COPY FROM STDIN inside session's transaction"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    cursor.copy_expert(
+        f'COPY "{table}" ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buffer
+    )
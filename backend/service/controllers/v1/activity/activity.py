@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import PositiveInt
+from sqlalchemy import ColumnElement, Select, select, tuple_
+
+from db import constants, models
+from db.session import DBSession
+from service.core.cursor import decode_cursor, encode_cursor
+from service.core.dependencies import get_current_user, get_session
+from service.schemas import v1 as schemas_v1
+
+router = APIRouter()
+
+
+def get_activity_query(
+    condition: ColumnElement, size: int, after: Optional[list] = None
+) -> Select:
+    """
+    Return query of activity newest first, `after` is (created_at, id) keyset
+    of the last returned event. Feeds are backed by (task_id, created_at, id)
+    and (actor_id, created_at, id) indexes
+    """
+    activity_query = (
+        select(models.Activity)
+        .where(condition)
+        .order_by(models.Activity.created_at.desc(), models.Activity.id.desc())
+        .limit(size)
+    )
+    if after:
+        activity_query = activity_query.where(
+            tuple_(models.Activity.created_at, models.Activity.id) < tuple_(*after)
+        )
+    return activity_query
+
+
+def get_activity_page(
+    session: DBSession, condition: ColumnElement, size: int, cursor: Optional[str]
+) -> schemas_v1.ActivityPage:
+    """Return page of activity feed and cursor of the next page"""
+    after = None
+    if cursor:
+        created_at, activity_id = decode_cursor(cursor, 2)
+        try:
+            after = [datetime.fromisoformat(created_at), int(activity_id)]
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+    activity_query = get_activity_query(condition, size + 1, after)
+    with session() as db:
+        activity = db.execute(activity_query).scalars().all()
+    next_cursor = None
+    if len(activity) > size:
+        last = activity[size - 1]
+        next_cursor = encode_cursor([last.created_at.isoformat(), last.id])
+    return schemas_v1.ActivityPage(items=activity[:size], next_cursor=next_cursor)
+
+
+@router.get("/task/{task_id}", response_model=schemas_v1.ActivityPage)
+def get_task_activity(
+    task_id: PositiveInt,
+    cursor: Optional[str] = None,
+    size: int = Query(50, ge=1, le=100),
+    session: DBSession = Depends(get_session),
+    user: models.User = Depends(get_current_user),
+) -> schemas_v1.ActivityPage:
+    """
+    Get activity of task\n
+    Who created, updated, assigned and deleted the task, newest first,
+    `next_cursor` returns the next page. Events are written in batches, so
+    the latest of them can appear with up to a second delay\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `400` BAD_REQUEST - Invalid cursor\n
+    `401` UNAUTHORIZED - You have not provided authorization token\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    return get_activity_page(session, models.Activity.task_id == task_id, size, cursor)
+
+
+@router.get("/user/{user_id}", response_model=schemas_v1.ActivityPage)
+def get_user_activity(
+    user_id: PositiveInt,
+    cursor: Optional[str] = None,
+    size: int = Query(50, ge=1, le=100),
+    session: DBSession = Depends(get_session),
+    user: models.User = Depends(get_current_user),
+) -> schemas_v1.ActivityPage:
+    """
+    Get activity of user\n
+    Actions made by the user, newest first, `next_cursor` returns the next
+    page. Managers see activity of all users, Developers only their own\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `400` BAD_REQUEST - Invalid cursor\n
+    `403` Forbidden - User hasn't got access\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    if user.id != user_id and user.status != constants.UserStatus.MANAGER:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="User hasn't got access"
+        )
+    return get_activity_page(session, models.Activity.actor_id == user_id, size, cursor)
@@ -0,0 +1,159 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import ujson
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from sqlalchemy import func, select
+
+from db import constants, models
+from db.session import DBSession
+from service.core import settings
+from service.core.dependencies import get_current_manager, get_session
+from service.schemas import v1 as schemas_v1
+
+router = APIRouter()
+
+SNAPSHOT_MEDIA_TYPES = {
+    constants.SnapshotFormat.PARQUET: "application/vnd.apache.parquet",
+    constants.SnapshotFormat.ARROW: "application/vnd.apache.arrow.file",
+}
+
+
+@router.get("/snapshot", response_model=schemas_v1.AnalyticsSnapshot)
+async def get_snapshot(
+    current_manager: models.User = Depends(get_current_manager),
+) -> schemas_v1.AnalyticsSnapshot:
+    """
+    Get analytics snapshot manifest\n
+    Get time of the latest snapshot and row counts of its tables. Return
+    snapshot manifest\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `403` Forbidden - User hasn't got access\n
+    `404` NOT_FOUND - Snapshot does not exist\n
+    """
+    manifest_path = Path(settings.ANALYTICS_DIR) / "manifest.json"
+    if not manifest_path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot does not exist"
+        )
+    return schemas_v1.AnalyticsSnapshot(**ujson.loads(manifest_path.read_text()))
+
+
+@router.get("/snapshot/{table}", response_class=FileResponse)
+async def download_snapshot(
+    table: constants.SnapshotTable,
+    snapshot_format: constants.SnapshotFormat = Query(
+        constants.SnapshotFormat.PARQUET, alias="format"
+    ),
+    current_manager: models.User = Depends(get_current_manager),
+) -> FileResponse:
+    """
+    Download analytics snapshot of table\n
+    Download table snapshot as zstd compressed Parquet or uncompressed
+    (memory-mappable) Arrow IPC file. Return file\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `403` Forbidden - User hasn't got access\n
+    `404` NOT_FOUND - Snapshot does not exist\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    filename = f"{table.value}.{snapshot_format.value}"
+    path = Path(settings.ANALYTICS_DIR) / filename
+    if not path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot does not exist"
+        )
+    return FileResponse(
+        path, media_type=SNAPSHOT_MEDIA_TYPES[snapshot_format], filename=filename
+    )
+
+
+def get_flow_percentiles(
+    cycle_time: Optional[models.TaskCycleTimeDaily], name: str
+) -> schemas_v1.FlowPercentiles:
+    """Return lead or cycle time percentiles of the day rollup"""
+    if not cycle_time:
+        return schemas_v1.FlowPercentiles()
+    return schemas_v1.FlowPercentiles(
+        **{
+            field: getattr(cycle_time, f"{name}_time_{field}")
+            for field in schemas_v1.FlowPercentiles.model_fields
+        }
+    )
+
+
+@router.get("/flow", response_model=schemas_v1.TaskFlow)
+def get_task_flow(
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    session: DBSession = Depends(get_session),
+    current_manager: models.User = Depends(get_current_manager),
+) -> schemas_v1.TaskFlow:
+    """
+    Get task flow analytics\n
+    Get count of tasks in every status at the end of each day (cumulative
+    flow), count of done tasks and lead and cycle time percentiles (hours)
+    of the tasks done that day. Days are UTC, range is inclusive and is the
+    last DEFAULT_FLOW_DAYS days by default. Read from daily rollups which
+    the worker updates every hour. Return days\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `400` BAD_REQUEST - Invalid date range\n
+    `403` Forbidden - User hasn't got access\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    until = until or datetime.utcnow().date()
+    since = since or until - timedelta(days=constants.DEFAULT_FLOW_DAYS - 1)
+    if since > until or (until - since).days >= constants.MAX_FLOW_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid date range"
+        )
+    status_daily = models.TaskStatusDaily
+    in_status_query = (
+        select(
+            status_daily.status,
+            func.sum(status_daily.entered - status_daily.exited),
+        )
+        .where(status_daily.day < since)
+        .group_by(status_daily.status)
+    )
+    transitions_query = select(status_daily).where(
+        status_daily.day.between(since, until)
+    )
+    cycle_time_query = select(models.TaskCycleTimeDaily).where(
+        models.TaskCycleTimeDaily.day.between(since, until)
+    )
+    with session() as db:
+        in_status = defaultdict(int, db.execute(in_status_query).all())
+        transitions = defaultdict(list)
+        for transition in db.execute(transitions_query).scalars():
+            transitions[transition.day].append(transition)
+        cycle_times = {
+            cycle_time.day: cycle_time
+            for cycle_time in db.execute(cycle_time_query).scalars()
+        }
+
+    days = []
+    for offset in range((until - since).days + 1):
+        day = since + timedelta(days=offset)
+        done = 0
+        for transition in transitions[day]:
+            in_status[transition.status] += transition.entered - transition.exited
+            if transition.status == constants.TaskStatus.DONE.value:
+                done = transition.entered
+        days.append(
+            schemas_v1.TaskFlowDay(
+                day=day,
+                statuses={
+                    item.value: in_status[item.value] for item in constants.TaskStatus
+                },
+                done=done,
+                lead_time=get_flow_percentiles(cycle_times.get(day), "lead"),
+                cycle_time=get_flow_percentiles(cycle_times.get(day), "cycle"),
+            )
+        )
+    return schemas_v1.TaskFlow(days=days)
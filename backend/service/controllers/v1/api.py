@@ -1,6 +1,9 @@
 from fastapi import APIRouter
 from fastapi_pagination import add_pagination
 
+from .activity import activity
+from .analytics import analytics
+from .batch import batch
 from .task import task
 from .user import auth, user
 
@@ -9,4 +12,7 @@ router_v1 = APIRouter()
 router_v1.include_router(auth.router, tags=["Auth"], prefix="/auth")
 router_v1.include_router(user.router, tags=["User"], prefix="/user")
 router_v1.include_router(task.router, tags=["Task"], prefix="/task")
+router_v1.include_router(analytics.router, tags=["Analytics"], prefix="/analytics")
+router_v1.include_router(activity.router, tags=["Activity"], prefix="/activity")
+router_v1.include_router(batch.router, tags=["Batch"], prefix="/batch")
 add_pagination(router_v1)
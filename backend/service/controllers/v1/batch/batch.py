@@ -0,0 +1,197 @@
+import asyncio
+import logging
+from typing import Optional
+from urllib.parse import urlsplit
+
+import ujson
+from fastapi import APIRouter, Depends, Request, status
+from starlette.types import ASGIApp, Message, Scope
+
+from db import models
+from service.core import settings
+from service.core.dependencies import (
+    BATCH_TOKEN_KEY,
+    BATCH_USER_KEY,
+    get_access_token,
+    get_current_user,
+)
+from service.schemas import v1 as schemas_v1
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Streams never end and are read by the client itself
+STREAM_MEDIA_TYPES = {"text/event-stream"}
+TEXT_MEDIA_TYPES = {"application/json", "application/x-ndjson"}
+
+
+class ResponseNotBatched(Exception):
+    """Sub-response which can't be put into batch response"""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def get_batch_error(headers: dict, size: int) -> Optional[ResponseNotBatched]:
+    """Return error of sub-response unless it's text of allowed size"""
+    media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    is_text = media_type.startswith("text/") or media_type in TEXT_MEDIA_TYPES
+    encoding = headers.get("content-encoding", "identity").lower()
+    if (
+        media_type in STREAM_MEDIA_TYPES
+        or (media_type and not is_text)
+        or encoding != "identity"
+    ):
+        return ResponseNotBatched(
+            status.HTTP_406_NOT_ACCEPTABLE,
+            "Response can't be batched, request it directly",
+        )
+    if size > settings.BATCH_MAX_BODY_SIZE:
+        return ResponseNotBatched(
+            status.HTTP_502_BAD_GATEWAY, "Response is too large to be batched"
+        )
+    return None
+
+
+async def call_app(app: ASGIApp, scope: Scope) -> schemas_v1.BatchResponseItem:
+    """
+    Run sub-request through the app and return its response. Binary, encoded
+    and streamed responses are stopped, so is a body over BATCH_MAX_BODY_SIZE
+    """
+    start, headers, body = {}, {}, bytearray()
+    error = None
+    request_sent = False
+    # Sub-request has no client connection which could be closed
+    disconnected = asyncio.Event()
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal error
+        if message["type"] == "http.response.start":
+            start.update(message)
+            headers.update(
+                (name.decode("latin-1"), value.decode("latin-1"))
+                for name, value in message.get("headers", [])
+            )
+            error = get_batch_error(headers, int(headers.get("content-length", 0)))
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+            error = get_batch_error(headers, len(body))
+        # Raised error stops the handler, e.g. an export isn't read any further
+        if error:
+            raise error
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # Streaming response raises error of send in an exception group
+        if error is None:
+            raise
+        raise error
+    content = bytes(body)
+    if content and headers.get("content-type", "").startswith("application/json"):
+        content = ujson.loads(content)
+    elif content:
+        content = content.decode(errors="replace")
+    return schemas_v1.BatchResponseItem(
+        status_code=start["status"], headers=headers, body=content or None
+    )
+
+
+def run_app(app: ASGIApp, scope: Scope) -> schemas_v1.BatchResponseItem:
+    """
+    Run sub-request on event loop of the thread, so handlers which block
+    don't block the other sub-requests and the timeout cancels it
+    """
+    return asyncio.run(
+        asyncio.wait_for(call_app(app, scope), settings.BATCH_ITEM_TIMEOUT)
+    )
+
+
+async def run_item(
+    request: Request, item: schemas_v1.BatchRequestItem, api_root: str
+) -> schemas_v1.BatchResponseItem:
+    """Run sub-request with batch's authentication, errors are its responses"""
+    url = urlsplit(item.url)
+    path = f"{api_root}{url.path}"
+    headers = {name.lower(): value for name, value in item.headers.items()}
+    headers["authorization"] = request.headers["authorization"]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": item.method,
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": url.query.encode(),
+        "headers": [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers.items()
+        ],
+        BATCH_TOKEN_KEY: request.scope[BATCH_TOKEN_KEY],
+        BATCH_USER_KEY: request.scope[BATCH_USER_KEY],
+    }
+    try:
+        # Blocking handler can't be cancelled, its thread finishes it later
+        return await asyncio.wait_for(
+            asyncio.to_thread(run_app, request.app, scope),
+            settings.BATCH_ITEM_TIMEOUT,
+        )
+    except ResponseNotBatched as error:
+        status_code, detail = error.status_code, error.detail
+    except asyncio.TimeoutError:
+        status_code, detail = status.HTTP_504_GATEWAY_TIMEOUT, "Request timed out"
+    except Exception:
+        logger.exception(f"Batch request {item.url} failed")
+        status_code, detail = status.HTTP_500_INTERNAL_SERVER_ERROR, "Request failed"
+    return schemas_v1.BatchResponseItem(
+        status_code=status_code,
+        headers={"content-type": "application/json"},
+        body={"detail": detail},
+    )
+
+
+@router.post("", response_model=schemas_v1.BatchResponse)
+async def batch(
+    request: Request,
+    input_data: schemas_v1.BatchRequest,
+    token_payload: schemas_v1.JWTTokenPayload = Depends(get_access_token),
+    user: models.User = Depends(get_current_user),
+) -> schemas_v1.BatchResponse:
+    """
+    Batch request\n
+    Run up to MAX_BATCH_ITEMS read-only (GET) requests to the API in one round
+    trip. `url` of item is relative to API root, e.g. `/task/me/?size=10`,
+    its `headers` are passed too (e.g. `If-None-Match`). Items run
+    concurrently in threads with the batch's authorization, which is checked
+    once, and return their own status codes, headers and bodies in the same
+    order. Only JSON and text responses are batched: streams, binary and
+    compressed downloads get 406 and bodies over BATCH_MAX_BODY_SIZE get 502\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `401` UNAUTHORIZED - You have not provided authorization token\n
+    `403` Forbidden - User hasn't got access\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    # Sub-requests reuse authentication of the batch
+    request.scope[BATCH_TOKEN_KEY] = token_payload
+    request.scope[BATCH_USER_KEY] = user
+    api_root = request.scope["path"].removesuffix("/batch")
+    items = await asyncio.gather(
+        *[run_item(request, item, api_root) for item in input_data.items]
+    )
+    return schemas_v1.BatchResponse(items=items)
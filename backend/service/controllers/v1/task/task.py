@@ -1,34 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import shutil
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+from fastapi import (APIRouter, Depends, HTTPException, Query, Request,
+                     Response, UploadFile, status)
+from fastapi.responses import StreamingResponse
 from fastapi_pagination import Page
 from fastapi_pagination.ext.sqlalchemy import paginate
 from pydantic import PositiveInt
-from sqlalchemy import delete, or_, select
+from sqlalchemy import (VARCHAR, BigInteger, ColumnElement, Integer, Select,
+                        and_, any_, cast, column, delete, func, insert,
+                        literal, or_, select, true, tuple_, update, values)
+from sqlalchemy.dialects.postgresql import ARRAY, REAL, REGCONFIG
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import aliased
 
-from db import models
+from db import constants, models
 from db.session import DBSession
+from db.utils import allocate_ids, copy_rows, get_default_now
+from service.core import redis_cache, settings
+from service.core.activity import activity_log, make_event
 from service.core.celery_app import celery_app
+from service.core.cursor import decode_cursor, encode_cursor
 from service.core.dependencies import (get_current_manager, get_current_user,
                                        get_session)
+from service.core.etag import check_etag, make_etag
+from service.core.export import MEDIA_TYPES, gzip_chunks, stream_rows
+from service.core.idempotency import IdempotentRoute
+from service.core.notifications import get_participants_query, publish_batched
+from service.core.stream import task_stream
 from service.schemas import v1 as schemas_v1
 
-router = APIRouter()
+# Writes can be retried with Idempotency-Key header
+router = APIRouter(route_class=IdempotentRoute)
 
 
 @router.post(
     "/", status_code=status.HTTP_201_CREATED, response_model=schemas_v1.TaskResponse
 )
-async def create_task(
+# Not async: auto-assignment waits for a lock and queries synchronously, so it
+# runs in the threadpool instead of blocking the event loop
+def create_task(
     input_data: schemas_v1.CreateTask,
+    auto_assign: bool = False,
     session: DBSession = Depends(get_session),
     current_manager: models.User = Depends(get_current_manager),
 ) -> models.Task:
     """
     Create Task by Manager\n
-    Create Task by Manager. Return Task\n
+    Create Task by Manager, `auto_assign` also assigns the least loaded
+    Developer to it. Return Task\n
+    Retries with the same `Idempotency-Key` header get the first response\n
     Responses:\n
     `201` CREATED - Everything is good (SUCCESS Response)\n
     `403` Forbidden - User hasn't got access\n
+    `409` CONFLICT - Request with this `Idempotency-Key` is in progress\n
     `422` UNPROCESSABLE_ENTITY - Failed field validation\n
     """
     user_query = select(models.User).where(
@@ -48,18 +78,235 @@ async def create_task(
         priority=input_data.priority.value,
         created_by=current_manager.id,
     )
+    developer = None
     with session() as db:
         db.add(task)
+        if auto_assign:
+            db.flush()
+            developer = assign_least_loaded_developer(db, task.id)
         db.commit()
         db.refresh(task)
+        if developer:
+            db.refresh(developer)
 
     celery_app.send_task(
         "service.tasks.delay.task_creation_confirm",
         args=[user.email, task.name],
     )
+    events = [
+        make_event(
+            current_manager.id, constants.ActivityAction.TASK_CREATED, task_id=task.id
+        )
+    ]
+    if developer:
+        celery_app.send_task(
+            "service.tasks.delay.task_assign_confirm",
+            args=[developer.email, task.name],
+        )
+        events.append(
+            make_event(
+                current_manager.id,
+                constants.ActivityAction.TASK_ASSIGNED,
+                task_id=task.id,
+                user_id=developer.id,
+            )
+        )
+    activity_log.push(events)
     return task
 
 
+TASK_COPY_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "responsible_person_id",
+    "status",
+    "priority",
+    "created_by",
+    "created_at",
+)
+
+
+def insert_tasks(db: DBSession, rows: list[dict]) -> list[int]:
+    """
+    Insert tasks with one multi-row INSERT ... RETURNING, or with COPY for
+    big batches. Return ids in order of rows
+    """
+    if len(rows) < constants.BULK_COPY_THRESHOLD:
+        insert_query = insert(models.Task).returning(
+            models.Task.id, sort_by_parameter_order=True
+        )
+        return list(db.execute(insert_query, rows).scalars())
+    # COPY can't return generated ids, so they are reserved beforehand
+    ids = allocate_ids(db, models.Task.__tablename__, len(rows))
+    copy_rows(
+        db,
+        models.Task.__tablename__,
+        TASK_COPY_COLUMNS,
+        (
+            [task_id, *(row[column] for column in TASK_COPY_COLUMNS[1:])]
+            for task_id, row in zip(ids, rows)
+        ),
+    )
+    return ids
+
+
+@router.post("/bulk", response_model=schemas_v1.BulkTaskResponse)
+async def create_tasks_bulk(
+    input_data: schemas_v1.BulkCreateTask,
+    session: DBSession = Depends(get_session),
+    current_manager: models.User = Depends(get_current_manager),
+) -> schemas_v1.BulkTaskResponse:
+    """
+    Create many Tasks by Manager\n
+    Create up to 5000 Tasks in one request. Return result of every item\n
+    Item results:\n
+    `201` CREATED - Task is created\n
+    `404` NOT_FOUND - Responsible person does not exist\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `403` Forbidden - User hasn't got access\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    person_ids = {item.responsible_person_id for item in input_data.items}
+    persons_query = select(models.User.id, models.User.email).where(
+        models.User.id.in_(person_ids)
+    )
+    with session() as db:
+        emails = dict(db.execute(persons_query).all())
+
+    results = {}
+    rows, indexes = [], []
+    created_at = get_default_now()
+    for index, item in enumerate(input_data.items):
+        if item.responsible_person_id not in emails:
+            results[index] = schemas_v1.BulkTaskResult(
+                index=index,
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User does not exist",
+            )
+            continue
+        rows.append(
+            {
+                "name": item.name,
+                "description": item.description,
+                "responsible_person_id": item.responsible_person_id,
+                "status": item.status.value,
+                "priority": item.priority.value,
+                "created_by": current_manager.id,
+                "created_at": created_at,
+            }
+        )
+        indexes.append(index)
+
+    tasks = {}
+    if rows:
+        with session() as db:
+            task_ids = insert_tasks(db, rows)
+            db.commit()
+            tasks_query = select(models.Task).where(models.Task.id.in_(task_ids))
+            tasks = {task.id: task for task in db.execute(tasks_query).scalars()}
+        for index, task_id in zip(indexes, task_ids):
+            results[index] = schemas_v1.BulkTaskResult(
+                index=index,
+                status_code=status.HTTP_201_CREATED,
+                task=schemas_v1.TaskResponse.model_validate(tasks[task_id]),
+            )
+        publish_batched(
+            "service.tasks.delay.task_creation_confirm_batch",
+            [[emails[row["responsible_person_id"]], row["name"]] for row in rows],
+        )
+        activity_log.push(
+            make_event(
+                current_manager.id,
+                constants.ActivityAction.TASK_CREATED,
+                task_id=task_id,
+            )
+            for task_id in task_ids
+        )
+
+    return schemas_v1.BulkTaskResponse(
+        created=len(rows),
+        failed=len(input_data.items) - len(rows),
+        results=[results[index] for index in range(len(input_data.items))],
+    )
+
+
+@router.patch("/bulk", response_model=schemas_v1.BulkUpdateResponse)
+async def update_tasks_bulk(
+    input_data: schemas_v1.BulkUpdateTask,
+    session: DBSession = Depends(get_session),
+    current_manager: models.User = Depends(get_current_manager),
+) -> schemas_v1.BulkUpdateResponse:
+    """
+    Partial update of many Tasks by Manager\n
+    Set status, priority or responsible person of Tasks selected by ids or
+    filter in one statement. At most MAX_BULK_ITEMS Tasks are updated per
+    request, `limit_reached` means that the filter can match more Tasks\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `403` Forbidden - User hasn't got access\n
+    `404` NOT_FOUND - User does not exist\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    changes = input_data.get_values()
+    if "responsible_person_id" in changes:
+        user_query = select(models.User.id).where(
+            models.User.id == changes["responsible_person_id"]
+        )
+        with session() as db:
+            user_id = db.execute(user_query).scalar_one_or_none()
+        if not user_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User does not exist"
+            )
+
+    if input_data.ids is not None:
+        conditions = [models.Task.id.in_(input_data.ids)]
+    else:
+        conditions = [
+            getattr(models.Task, field) == value
+            for field, value in input_data.filter.model_dump(
+                exclude_none=True, mode="json"
+            ).items()
+        ]
+    # Lock target rows in id order, so concurrent bulk updates can't deadlock
+    target_query = (
+        select(models.Task.id)
+        .where(*conditions)
+        .order_by(models.Task.id)
+        .limit(constants.MAX_BULK_ITEMS)
+        .with_for_update()
+    )
+    update_query = (
+        update(models.Task)
+        .where(models.Task.id.in_(target_query))
+        .values(**changes)
+        .returning(models.Task.id)
+        .execution_options(synchronize_session=False)
+    )
+    with session() as db:
+        ids = sorted(db.execute(update_query).scalars().all())
+        recipients = db.execute(get_participants_query(ids)).all() if ids else []
+        db.commit()
+    publish_batched("service.tasks.delay.task_update_notify", recipients)
+    activity_log.push(
+        make_event(
+            current_manager.id,
+            constants.ActivityAction.TASK_UPDATED,
+            task_id=task_id,
+            details=changes,
+        )
+        for task_id in ids
+    )
+
+    return schemas_v1.BulkUpdateResponse(
+        updated=len(ids),
+        ids=ids,
+        limit_reached=len(ids) == constants.MAX_BULK_ITEMS,
+    )
+
+
 @router.put("/{task_id}", response_model=schemas_v1.TaskResponse)
 async def update_task(
     task_id: PositiveInt,
@@ -70,9 +317,11 @@ async def update_task(
     """
     Update Task by Manager\n
     Update Task by Manager. Return Task\n
+    Retries with the same `Idempotency-Key` header get the first response\n
     Responses:\n
     `201` OK - Everything is good (SUCCESS Response)\n
     `403` Forbidden - User hasn't got access\n
+    `409` CONFLICT - Request with this `Idempotency-Key` is in progress\n
     `422` UNPROCESSABLE_ENTITY - Failed field validation\n
     """
     task_query = select(models.Task).where(models.Task.id == task_id)
@@ -92,19 +341,28 @@ async def update_task(
             status_code=status.HTTP_404_NOT_FOUND, detail="User does not exist"
         )
 
-    task.name = (input_data.name,)
-    task.description = (input_data.description,)
-    task.responsible_person_id = (input_data.responsible_person_id,)
-    task.status = (input_data.status.value,)
-    task.priority = (input_data.priority.value,)
+    task.name = input_data.name
+    task.description = input_data.description
+    task.responsible_person_id = input_data.responsible_person_id
+    task.status = input_data.status.value
+    task.priority = input_data.priority.value
 
     with session() as db:
         db.add(task)
         db.commit()
         db.refresh(task)
-    celery_app.send_task(
-        "service.tasks.delay.task_creation_confirm",
-        args=[user.email, task.name],
+        # Notify responsible person and all executors
+        recipients = db.execute(get_participants_query([task.id])).all()
+    publish_batched("service.tasks.delay.task_update_notify", recipients)
+    activity_log.push(
+        [
+            make_event(
+                current_manager.id,
+                constants.ActivityAction.TASK_UPDATED,
+                task_id=task.id,
+                details=input_data.model_dump(mode="json"),
+            )
+        ]
     )
 
     return task
@@ -128,64 +386,594 @@ async def delete_task(
         models.Task.id == task_id,
     )
     with session() as db:
-        db.execute(delete_query)
+        deleted = db.execute(delete_query).rowcount
         db.commit()
+    if deleted:
+        activity_log.push(
+            [
+                make_event(
+                    current_manager.id,
+                    constants.ActivityAction.TASK_DELETED,
+                    task_id=task_id,
+                )
+            ]
+        )
 
     return
 
 
-@router.get("/", response_model=Page[schemas_v1.TaskResponse])
+# Every sort key ends with id, so pages are stable. Each key is backed by
+# (created_at, id) and (name, id) indexes of task table, and together with an
+# equality filter by (<filter column>, created_at, id) and
+# (<filter column>, name, id) indexes
+TASK_SORT_ORDER = {
+    constants.TaskSort.CREATED_AT: (models.Task.created_at, models.Task.id),
+    constants.TaskSort.CREATED_AT_DESC: (
+        models.Task.created_at.desc(),
+        models.Task.id.desc(),
+    ),
+    constants.TaskSort.NAME: (models.Task.name, models.Task.id),
+    constants.TaskSort.NAME_DESC: (models.Task.name.desc(), models.Task.id.desc()),
+}
+
+
+def get_filtered_tasks_query(task_filter: schemas_v1.TaskFilter) -> Select:
+    """Return tasks query with filters and sort order of task listing"""
+    conditions = []
+    if task_filter.status:
+        conditions.append(models.Task.status == task_filter.status)
+    if task_filter.priority:
+        conditions.append(models.Task.priority == task_filter.priority)
+    if task_filter.responsible_person_id:
+        conditions.append(
+            models.Task.responsible_person_id == task_filter.responsible_person_id
+        )
+    if task_filter.created_by:
+        conditions.append(models.Task.created_by == task_filter.created_by)
+    if task_filter.created_from:
+        conditions.append(models.Task.created_at >= task_filter.created_from)
+    if task_filter.created_to:
+        conditions.append(models.Task.created_at <= task_filter.created_to)
+    return (
+        select(models.Task)
+        .where(*conditions)
+        .order_by(*TASK_SORT_ORDER[task_filter.sort])
+    )
+
+
+def get_task_revisions_query(tasks_query: Select) -> Select:
+    """
+    Return (id, revision of task, of its responsible person and of its creator)
+    rows of tasks query, without loading tasks and joined users
+    """
+    responsible_person = aliased(models.User)
+    created_by_person = aliased(models.User)
+    return (
+        tasks_query.with_only_columns(
+            models.Task.id,
+            models.Task.revision,
+            responsible_person.revision,
+            created_by_person.revision,
+        )
+        .join(
+            responsible_person,
+            responsible_person.id == models.Task.responsible_person_id,
+        )
+        .join(created_by_person, created_by_person.id == models.Task.created_by)
+    )
+
+
+def get_assigners_query(task_ids: List[int]) -> Select:
+    """
+    Return (task id, executor) rows of all tasks of a page with one query,
+    ids are bound as one array parameter
+    """
+    return (
+        select(models.TaskExecutors.task_id, models.User)
+        .join(models.User, models.User.id == models.TaskExecutors.user_id)
+        .where(models.TaskExecutors.task_id == any_(literal(task_ids, ARRAY(Integer))))
+        .order_by(models.TaskExecutors.task_id, models.User.id)
+    )
+
+
+def paginate_tasks(
+    db: DBSession, tasks_query: Select, include: List[constants.TaskInclude]
+) -> Tuple[Page[schemas_v1.TaskResponse], str]:
+    """
+    Return requested page of tasks with included related rows, and its ETag:
+    total and revisions of the loaded rows, and of assignments if they are
+    included. The page is loaded once, the ETag needs no queries of its own
+    """
+    tasks = []
+
+    def keep_tasks(items: List[models.Task]) -> List[models.Task]:
+        # Revisions aren't a part of the response items
+        tasks.extend(items)
+        return items
+
+    page = paginate(db, tasks_query, transformer=keep_tasks)
+    revisions = [
+        (
+            task.id,
+            task.revision,
+            task.priority_person.revision,
+            task.created_by_person.revision,
+        )
+        for task in tasks
+    ]
+    parts = ["tasks", page.total, revisions]
+    if constants.TaskInclude.ASSIGNERS in include:
+        assigners, assigner_revisions = defaultdict(list), []
+        assigners_query = get_assigners_query([task.id for task in page.items])
+        for task_id, user in db.execute(assigners_query):
+            assigners[task_id].append(schemas_v1.User.model_validate(user))
+            assigner_revisions.append((task_id, user.id, user.revision))
+        for task in page.items:
+            task.assigners = assigners[task.id]
+        parts.append(assigner_revisions)
+    return page, make_etag(*parts)
+
+
+@router.get(
+    "/",
+    response_model=Page[schemas_v1.TaskResponse],
+    # Assigners are returned only if included
+    response_model_exclude_unset=True,
+)
 async def get_tasks(
+    request: Request,
+    response: Response,
+    task_filter: schemas_v1.TaskFilter = Depends(),
+    include: List[constants.TaskInclude] = Query([]),
     session: DBSession = Depends(get_session),
     user: models.User = Depends(get_current_user),
 ) -> models.Task:
     """
     Get all tasks\n
-    Update Task by Manager. Return Task\n
+    Get tasks filtered by status, priority, responsible person, creator and
+    creation time, sorted by `sort` key. `include=assigners` adds executors
+    of every task. Return Task\n
     Responses:\n
     `200` OK - Everything is good (SUCCESS Response)\n
+    `304` NOT_MODIFIED - Page didn't change since `If-None-Match` ETag\n
     `403` Forbidden - User hasn't got access\n
     `422` UNPROCESSABLE_ENTITY - Failed field validation\n
     """
-    tasks_query = select(models.Task)
+    tasks_query = get_filtered_tasks_query(task_filter)
 
     with session() as db:
-        return paginate(db, tasks_query)
+        page, etag = paginate_tasks(db, tasks_query, include)
+    not_modified = check_etag(request, response, etag, settings.CACHE_CONTROL_TASK_LIST)
+    if not_modified:
+        return not_modified
+    return page
 
 
-@router.get("/me/", response_model=Page[schemas_v1.TaskResponse])
+def get_my_tasks_condition(user_id: int) -> ColumnElement[bool]:
+    """Return condition of tasks where user is responsible person or executor"""
+    assign_task_ids_query = select(models.TaskExecutors.task_id).where(
+        models.TaskExecutors.user_id == user_id
+    )
+    return or_(
+        models.Task.responsible_person_id == user_id,
+        models.Task.id.in_(assign_task_ids_query),
+    )
+
+
+@router.get(
+    "/me/",
+    response_model=Page[schemas_v1.TaskResponse],
+    response_model_exclude_unset=True,
+)
 async def get_my_tasks(
+    request: Request,
+    response: Response,
+    task_filter: schemas_v1.TaskFilter = Depends(),
+    include: List[constants.TaskInclude] = Query([]),
     session: DBSession = Depends(get_session),
     user: models.User = Depends(get_current_user),
 ) -> models.Task:
     """
     Get my tasks\n
-    Get my tasks. Return Task\n
+    Get tasks where I'm responsible person or executor, with the same filters,
+    sort keys and includes as all tasks. Return Task\n
     Responses:\n
     `200` OK - Everything is good (SUCCESS Response)\n
+    `304` NOT_MODIFIED - Page didn't change since `If-None-Match` ETag\n
     `403` Forbidden - User hasn't got access\n
     `422` UNPROCESSABLE_ENTITY - Failed field validation\n
     """
-    assign_task_ids_query = (
-        select(models.TaskExecutors.task_id)
-        .where(models.TaskExecutors.user_id == user.id)
-        .subquery()
+    tasks_query = get_filtered_tasks_query(task_filter).where(
+        get_my_tasks_condition(user.id)
+    )
+
+    with session() as db:
+        page, etag = paginate_tasks(db, tasks_query, include)
+    not_modified = check_etag(request, response, etag, settings.CACHE_CONTROL_TASK_LIST)
+    if not_modified:
+        return not_modified
+    return page
+
+
+def get_search_query(
+    q: str, limit: int, user_id: Optional[int] = None, after: Optional[list] = None
+) -> Select:
+    """
+    Return query of (Task, rank) rows matching web search query `q` ordered by
+    rank. `user_id` limits rows to user's tasks, `after` is (rank, id) keyset
+    of the previous page
+    """
+    tsquery = func.websearch_to_tsquery(
+        cast(constants.TASK_SEARCH_CONFIG, REGCONFIG), q
+    )
+    rank = func.ts_rank(models.Task.search_vector, tsquery)
+    tasks_query = select(models.Task, rank.label("rank")).where(
+        models.Task.search_vector.bool_op("@@")(tsquery)
+    )
+    if user_id:
+        tasks_query = tasks_query.where(get_my_tasks_condition(user_id))
+    if after:
+        last_rank, last_id = after
+        # ts_rank is real, compare in its precision to not return the same row
+        tasks_query = tasks_query.where(
+            tuple_(rank, models.Task.id) < tuple_(cast(last_rank, REAL), last_id)
+        )
+    return tasks_query.order_by(rank.desc(), models.Task.id.desc()).limit(limit)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_my_tasks(
+    user: models.User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Stream changes of my tasks\n
+    Server-sent events about tasks where I'm responsible person or executor,
+    instead of polling my tasks. Event is `created`, `updated`, `deleted`,
+    `assigned` or `unassigned`, its data is `{"op", "task_id"}`. `resync`
+    means changes could be missed, reload my tasks then\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `401` UNAUTHORIZED - You have not provided authorization token\n
+    `403` Forbidden - User hasn't got access\n
+    """
+    return StreamingResponse(
+        task_stream.events(user.id),
+        media_type="text/event-stream",
+        # Events must not be cached or buffered by proxies
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    tasks_query = select(models.Task).where(
-        or_(
-            models.Task.responsible_person_id == user.id,
-            models.Task.id.in_(assign_task_ids_query),
+
+@router.get("/changes", response_model=schemas_v1.TaskChanges)
+def get_task_changes(
+    since: Optional[str] = None,
+    session: DBSession = Depends(get_session),
+    user: models.User = Depends(get_current_user),
+) -> schemas_v1.TaskChanges:
+    """
+    Get changes of my tasks\n
+    Tasks where I'm responsible person or executor which changed since sync
+    token `since`, and ids of tasks which aren't mine anymore: deleted, or I
+    was unassigned or replaced as responsible person. Without `since` return
+    all my tasks. Keep `since` of the response for the next sync, tasks can
+    be returned by two syncs in a row\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `400` BAD_REQUEST - Invalid sync token\n
+    `401` UNAUTHORIZED - You have not provided authorization token\n
+    `410` GONE - Sync token is expired, reload my tasks\n
+    """
+    revision = 0
+    if since:
+        revision, issued_at = decode_cursor(since, 2)
+        try:
+            revision, issued_at = int(revision), datetime.fromisoformat(issued_at)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+        lifetime = timedelta(days=settings.TASK_TOMBSTONE_LIFETIME)
+        if issued_at < get_default_now() - lifetime:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE, detail="Sync token is expired"
+            )
+    # Transactions with ids below xmin of the snapshot are finished, so the next
+    # sync starts from it and finds rows of transactions which commit later
+    xmin_query = select(
+        cast(
+            cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), VARCHAR), BigInteger
+        )
+    )
+    changed_assignments_query = select(models.TaskExecutors.task_id).where(
+        models.TaskExecutors.user_id == user.id,
+        models.TaskExecutors.revision >= revision,
+    )
+    tasks_query = (
+        select(models.Task)
+        .where(
+            get_my_tasks_condition(user.id),
+            or_(
+                models.Task.revision >= revision,
+                models.Task.id.in_(changed_assignments_query),
+            ),
+        )
+        .order_by(models.Task.id)
+    )
+    removed_query = select(models.TaskTombstone.task_id).where(
+        models.TaskTombstone.user_id == user.id,
+        models.TaskTombstone.revision >= revision,
+    )
+    with session() as db:
+        next_revision = db.execute(xmin_query).scalar_one()
+        tasks = db.execute(tasks_query).scalars().all()
+        removed_task_ids = set(db.execute(removed_query).scalars()) if since else set()
+    # Task could leave and come back, it's removed only if it isn't mine now
+    removed_task_ids -= {task.id for task in tasks}
+    return schemas_v1.TaskChanges(
+        tasks=tasks,
+        removed_task_ids=sorted(removed_task_ids),
+        since=encode_cursor([next_revision, get_default_now().isoformat()]),
+    )
+
+
+@router.get("/search", response_model=schemas_v1.TaskSearchPage)
+async def search_tasks(
+    q: str = Query(min_length=1, max_length=constants.MAX_SEARCH_QUERY_LENGTH),
+    mine: bool = False,
+    cursor: Optional[str] = None,
+    size: int = Query(50, ge=1, le=100),
+    session: DBSession = Depends(get_session),
+    user: models.User = Depends(get_current_user),
+) -> schemas_v1.TaskSearchPage:
+    """
+    Search tasks\n
+    Full-text search by task name and description, supports quotes, `or`
+    and `-` (web search syntax). Tasks are ordered by relevance, `mine`
+    limits them to my tasks, `next_cursor` returns the next page\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `400` BAD_REQUEST - Invalid cursor\n
+    `403` Forbidden - User hasn't got access\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    after = decode_cursor(cursor, 2) if cursor else None
+    tasks_query = get_search_query(q, size + 1, user.id if mine else None, after)
+
+    with session() as db:
+        rows = db.execute(tasks_query).all()
+        items = [
+            schemas_v1.TaskSearchResult(
+                **schemas_v1.TaskResponse.model_validate(row.Task).model_dump(),
+                rank=row.rank,
+            )
+            for row in rows[:size]
+        ]
+    next_cursor = None
+    if len(rows) > size:
+        next_cursor = encode_cursor([items[-1].rank, items[-1].id])
+    return schemas_v1.TaskSearchPage(items=items, next_cursor=next_cursor)
+
+
+def decode_board_cursor(cursor: str) -> list:
+    """Return (status, created_at, id) keyset of board column cursor"""
+    status_value, created_at, task_id = decode_cursor(cursor, 3)
+    try:
+        return [
+            constants.TaskStatus(status_value).value,
+            datetime.fromisoformat(created_at),
+            int(task_id),
+        ]
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def get_board_query(
+    statuses: list,
+    size: int,
+    user_id: Optional[int] = None,
+    after: Optional[list] = None,
+) -> Select:
+    """
+    Return query of (Task, status, total) rows: the first `size` tasks of
+    every status column, newest first, with the column total. A column
+    without tasks has one row with task None. `after` is (status,
+    created_at, id) keyset of the last task of the column
+    """
+    # Each column is a LATERAL scan of (status, created_at, id) index, which
+    # reads only `size` tasks, unlike numbering all tasks with a window
+    board_columns = values(
+        column("position", Integer), column("status", VARCHAR), name="board_column"
+    ).data(list(enumerate(statuses)))
+    conditions = [models.Task.status == board_columns.c.status]
+    if user_id:
+        conditions.append(get_my_tasks_condition(user_id))
+    totals = select(func.count().label("total")).where(*conditions).lateral("totals")
+    if after:
+        _, created_at, task_id = after
+        conditions.append(
+            tuple_(models.Task.created_at, models.Task.id) < tuple_(created_at, task_id)
         )
+    page = (
+        select(models.Task)
+        .where(*conditions)
+        .order_by(models.Task.created_at.desc(), models.Task.id.desc())
+        .limit(size)
+        .lateral("page")
     )
+    task = aliased(models.Task, page)
+    return (
+        select(task, board_columns.c.status, totals.c.total)
+        .select_from(board_columns)
+        .join(totals, true())
+        .outerjoin(page, true())
+        .order_by(board_columns.c.position, task.created_at.desc(), task.id.desc())
+    )
+
 
+@router.get("/board", response_model=schemas_v1.TaskBoard)
+async def get_board(
+    mine: bool = False,
+    size: int = Query(constants.BOARD_COLUMN_SIZE, ge=1, le=100),
+    cursor: Optional[str] = None,
+    session: DBSession = Depends(get_session),
+    user: models.User = Depends(get_current_user),
+) -> schemas_v1.TaskBoard:
+    """
+    Get task board\n
+    Get tasks grouped by status: total of every column and its first `size`
+    tasks, newest first. `mine` limits the board to my tasks, `next_cursor`
+    of a column returns the board with the next tasks of this column only\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `400` BAD_REQUEST - Invalid cursor\n
+    `403` Forbidden - User hasn't got access\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    after = decode_board_cursor(cursor) if cursor else None
+    statuses = [after[0]] if after else [item.value for item in constants.TaskStatus]
+    board_query = get_board_query(statuses, size + 1, user.id if mine else None, after)
+
+    tasks = defaultdict(list)
+    totals = {}
     with session() as db:
-        return paginate(db, tasks_query)
+        for task, status_value, total in db.execute(board_query):
+            totals[status_value] = total
+            if task:
+                tasks[status_value].append(task)
+        columns = []
+        for status_value in statuses:
+            column_tasks = tasks[status_value]
+            next_cursor = None
+            if len(column_tasks) > size:
+                last = column_tasks[size - 1]
+                next_cursor = encode_cursor(
+                    [last.status, last.created_at.isoformat(), last.id]
+                )
+            columns.append(
+                schemas_v1.TaskBoardColumn(
+                    status=status_value,
+                    total=totals[status_value],
+                    items=[
+                        schemas_v1.TaskResponse.model_validate(task)
+                        for task in column_tasks[:size]
+                    ],
+                    next_cursor=next_cursor,
+                )
+            )
+    return schemas_v1.TaskBoard(columns=columns)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_tasks(
+    export_format: constants.ExportFormat = Query(
+        constants.ExportFormat.NDJSON, alias="format"
+    ),
+    gzip: bool = False,
+    session: DBSession = Depends(get_session),
+    current_manager: models.User = Depends(get_current_manager),
+) -> StreamingResponse:
+    """
+    Export all Tasks\n
+    Stream all Tasks as NDJSON or CSV, optionally gzip compressed. Rows are
+    read from server-side cursor, so the response is sent while it's read\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `403` Forbidden - User hasn't got access\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    tasks_query = select(
+        models.Task.id,
+        models.Task.name,
+        models.Task.description,
+        models.Task.status,
+        models.Task.priority,
+        models.Task.responsible_person_id,
+        models.Task.created_by,
+        models.Task.created_at,
+    ).order_by(models.Task.id)
+    chunks = stream_rows(session, tasks_query, export_format)
+    filename = f"tasks.{export_format.value}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        chunks, media_type=MEDIA_TYPES[export_format], headers=headers
+    )
+
+
+IMPORT_COPY_BUFFER_SIZE = 1024 * 1024
+
+
+@router.post(
+    "/import",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=schemas_v1.TaskImportStatus,
+)
+def import_tasks(
+    file: UploadFile,
+    current_manager: models.User = Depends(get_current_manager),
+) -> schemas_v1.TaskImportStatus:
+    """
+    Import Tasks from CSV file\n
+    Save CSV file with `name`, `description`, `responsible_email`, `status`
+    and `priority` columns and start background import. Return import status\n
+    Responses:\n
+    `202` ACCEPTED - Import is queued (SUCCESS Response)\n
+    `403` Forbidden - User hasn't got access\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    import_id = uuid4().hex
+    import_dir = Path(settings.IMPORT_DIR)
+    import_dir.mkdir(parents=True, exist_ok=True)
+    path = import_dir / f"{import_id}.csv"
+    # Sync endpoint runs in threadpool, so copying doesn't block the event loop
+    with path.open("wb") as spool:
+        shutil.copyfileobj(file.file, spool, IMPORT_COPY_BUFFER_SIZE)
+
+    progress = schemas_v1.TaskImportStatus(
+        import_id=import_id, status=constants.ImportStatus.QUEUED
+    )
+    redis_cache.set(
+        f"task-import:{import_id}",
+        progress.model_dump(),
+        settings.IMPORT_PROGRESS_LIFETIME,
+    )
+    celery_app.send_task(
+        "service.tasks.imports.import_tasks_csv",
+        args=[import_id, str(path), current_manager.id],
+    )
+    return progress
+
+
+@router.get("/import/{import_id}", response_model=schemas_v1.TaskImportStatus)
+async def get_import_status(
+    import_id: str,
+    current_manager: models.User = Depends(get_current_manager),
+) -> schemas_v1.TaskImportStatus:
+    """
+    Get Tasks import status\n
+    Get progress of CSV import. Return import status\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `403` Forbidden - User hasn't got access\n
+    `404` NOT_FOUND - Import does not exist\n
+    """
+    progress = redis_cache.get(f"task-import:{import_id}")
+    if not progress:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Import does not exist"
+        )
+    return schemas_v1.TaskImportStatus(**progress)
 
 
 @router.get("/{task_id}/", response_model=schemas_v1.TaskResponse)
 async def get_task_by_id(
     task_id: PositiveInt,
+    request: Request,
+    response: Response,
     session: DBSession = Depends(get_session),
     user: models.User = Depends(get_current_user),
 ) -> models.Task:
@@ -194,17 +982,38 @@ async def get_task_by_id(
     Get task by id. Return Task\n
     Responses:\n
     `200` OK - Everything is good (SUCCESS Response)\n
-
+    `304` NOT_MODIFIED - Task didn't change since `If-None-Match` ETag\n
     `403` Forbidden - User hasn't got access\n
+    `404` NOT_FOUND - Task does not exist\n
     `422` UNPROCESSABLE_ENTITY - Failed field validation\n
     """
     task_query = select(models.Task).where(models.Task.id == task_id)
+    with session() as db:
+        revisions = db.execute(get_task_revisions_query(task_query)).one_or_none()
+    if not revisions:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task does not exist"
+        )
+    not_modified = check_etag(
+        request, response, make_etag("task", *revisions), settings.CACHE_CONTROL_TASK
+    )
+    if not_modified:
+        return not_modified
+
     with session() as db:
         task = db.execute(task_query).scalar_one_or_none()
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Task does not exist"
         )
+    # Task could change after the check, ETag has to match the returned body
+    response.headers["ETag"] = make_etag(
+        "task",
+        task.id,
+        task.revision,
+        task.priority_person.revision,
+        task.created_by_person.revision,
+    )
     return task
 
 
@@ -218,10 +1027,12 @@ async def assign_user_to_task(
     """
     Assign User to task\n
     Assign User to task. Return  Task with assign Users\n
+    Retries with the same `Idempotency-Key` header get the first response\n
     Responses:\n
     `200` OK - Everything is good (SUCCESS Response)\n
     `400` BAD_REQUEST - Invalid request data\n
     `403` Forbidden - User hasn't got access\n
+    `409` CONFLICT - Request with this `Idempotency-Key` is in progress\n
     `422` UNPROCESSABLE_ENTITY - Failed field validation\n
     """
     task_executors_instance = models.TaskExecutors(user_id=user_id, task_id=task_id)
@@ -242,10 +1053,126 @@ async def assign_user_to_task(
             task_executors_instance.task.name,
         ],
     )
+    activity_log.push(
+        [
+            make_event(
+                current_manager.id,
+                constants.ActivityAction.TASK_ASSIGNED,
+                task_id=task_id,
+                user_id=user_id,
+            )
+        ]
+    )
 
     return task_executors_instance
 
 
+def assign_least_loaded_developer(db: DBSession, task_id: int) -> Optional[models.User]:
+    """
+    Assign the Developer with the fewest open tasks to the task, ties go to the
+    lowest id. Load is read from user_task_stats counters. Return assigned
+    Developer or None if there is no Developer to assign
+    """
+    # Concurrent auto-assignments wait for each other, so every one of them
+    # sees the loads with the previous assignments and they spread evenly
+    db.execute(select(func.pg_advisory_xact_lock(constants.AUTO_ASSIGN_LOCK_KEY)))
+    load = func.coalesce(func.sum(models.UserTaskStats.count), 0)
+    developer_query = (
+        select(models.User)
+        .outerjoin(
+            models.UserTaskStats,
+            and_(
+                models.UserTaskStats.user_id == models.User.id,
+                models.UserTaskStats.status.in_(
+                    [item.value for item in constants.OPEN_TASK_STATUSES]
+                ),
+            ),
+        )
+        .where(
+            models.User.status == constants.UserStatus.DEVELOPER,
+            # Invited Developers haven't signed up yet
+            models.User.password.is_not(None),
+            ~select(models.Task.id)
+            .where(
+                models.Task.id == task_id,
+                models.Task.responsible_person_id == models.User.id,
+            )
+            .exists(),
+            ~select(models.TaskExecutors.id)
+            .where(
+                models.TaskExecutors.task_id == task_id,
+                models.TaskExecutors.user_id == models.User.id,
+            )
+            .exists(),
+        )
+        .group_by(models.User.id)
+        .order_by(load, models.User.id)
+        .limit(1)
+    )
+    developer = db.execute(developer_query).scalar_one_or_none()
+    if developer:
+        db.add(models.TaskExecutors(user_id=developer.id, task_id=task_id))
+        db.flush()
+    return developer
+
+
+@router.post("/{task_id}/auto-assign", response_model=schemas_v1.AssignResponse)
+def auto_assign_task(
+    task_id: PositiveInt,
+    session: DBSession = Depends(get_session),
+    current_manager: models.User = Depends(get_current_manager),
+) -> models.TaskExecutors:
+    """
+    Auto-assign Developer to task\n
+    Assign the Developer with the fewest Todo and InProgress tasks to task,
+    ties go to the Developer who signed up first. Return Task with assigned
+    User\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `403` Forbidden - User hasn't got access\n
+    `404` NOT_FOUND - Task does not exist\n
+    `409` CONFLICT - There is no Developer to assign\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    task_query = select(models.Task.id).where(models.Task.id == task_id)
+    with session() as db:
+        if not db.execute(task_query).scalar_one_or_none():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Task does not exist"
+            )
+        developer = assign_least_loaded_developer(db, task_id)
+        if not developer:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="There is no Developer to assign",
+            )
+        task_executors_query = select(models.TaskExecutors).where(
+            models.TaskExecutors.task_id == task_id,
+            models.TaskExecutors.user_id == developer.id,
+        )
+        db.commit()
+        task_executors_instance = db.execute(task_executors_query).scalar_one()
+
+    celery_app.send_task(
+        "service.tasks.delay.task_assign_confirm",
+        args=[
+            task_executors_instance.assigned_user.email,
+            task_executors_instance.task.name,
+        ],
+    )
+    activity_log.push(
+        [
+            make_event(
+                current_manager.id,
+                constants.ActivityAction.TASK_ASSIGNED,
+                task_id=task_id,
+                user_id=developer.id,
+            )
+        ]
+    )
+    return task_executors_instance
+
+
 @router.delete("/{task_id}/user/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def unassign_user_from_task(
     task_id: PositiveInt,
@@ -281,17 +1208,146 @@ async def unassign_user_from_task(
     )
 
     with session() as db:
-        db.execute(delete_query)
+        unassigned = db.execute(delete_query).rowcount
         db.commit()
 
     celery_app.send_task(
         "service.tasks.delay.task_unassign_confirm",
         args=[email, name],
     )
+    if unassigned:
+        activity_log.push(
+            [
+                make_event(
+                    current_manager.id,
+                    constants.ActivityAction.TASK_UNASSIGNED,
+                    task_id=task_id,
+                    user_id=user_id,
+                )
+            ]
+        )
 
     return
 
 
+@router.post("/{task_id}/users", response_model=schemas_v1.TaskUsersResponse)
+async def assign_users_to_task(
+    task_id: PositiveInt,
+    input_data: schemas_v1.TaskUsers,
+    session: DBSession = Depends(get_session),
+    current_manager: models.User = Depends(get_current_manager),
+) -> schemas_v1.TaskUsersResponse:
+    """
+    Assign many Users to task\n
+    Assign Users to task in one statement. Return Users which were assigned,
+    already assigned and not existing Users are skipped\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `403` Forbidden - User hasn't got access\n
+    `404` NOT_FOUND - Task does not exist\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    task_name_query = select(models.Task.name).where(models.Task.id == task_id)
+    with session() as db:
+        name = db.execute(task_name_query).scalar_one_or_none()
+    if not name:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task does not exist"
+        )
+    # INSERT ... SELECT skips not existing users, ON CONFLICT skips assigned ones
+    assigned = (
+        pg_insert(models.TaskExecutors)
+        .from_select(
+            ["user_id", "task_id", "created_at"],
+            select(models.User.id, literal(task_id), literal(get_default_now())).where(
+                models.User.id.in_(input_data.user_ids)
+            ),
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "task_id"])
+        .returning(models.TaskExecutors.user_id)
+        .cte("assigned")
+    )
+    users_query = select(models.User).join(
+        assigned, models.User.id == assigned.c.user_id
+    )
+    with session() as db:
+        users = db.execute(users_query).scalars().all()
+        response = schemas_v1.TaskUsersResponse(task_id=task_id, changed=users)
+        db.commit()
+
+    publish_batched(
+        "service.tasks.delay.task_assign_confirm_batch",
+        [[user.email, name] for user in response.changed],
+    )
+    activity_log.push(
+        make_event(
+            current_manager.id,
+            constants.ActivityAction.TASK_ASSIGNED,
+            task_id=task_id,
+            user_id=user.id,
+        )
+        for user in response.changed
+    )
+    return response
+
+
+@router.delete("/{task_id}/users", response_model=schemas_v1.TaskUsersResponse)
+async def unassign_users_from_task(
+    task_id: PositiveInt,
+    input_data: schemas_v1.TaskUsers,
+    session: DBSession = Depends(get_session),
+    current_manager: models.User = Depends(get_current_manager),
+) -> schemas_v1.TaskUsersResponse:
+    """
+    Unassign many Users from task\n
+    Unassign Users from task in one statement. Return Users which were
+    unassigned\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `403` Forbidden - User hasn't got access\n
+    `404` NOT_FOUND - Task does not exist\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    task_name_query = select(models.Task.name).where(models.Task.id == task_id)
+    with session() as db:
+        name = db.execute(task_name_query).scalar_one_or_none()
+    if not name:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task does not exist"
+        )
+    unassigned = (
+        delete(models.TaskExecutors)
+        .where(
+            models.TaskExecutors.task_id == task_id,
+            models.TaskExecutors.user_id.in_(input_data.user_ids),
+        )
+        .returning(models.TaskExecutors.user_id)
+        .cte("unassigned")
+    )
+    users_query = select(models.User).join(
+        unassigned, models.User.id == unassigned.c.user_id
+    )
+    with session() as db:
+        users = db.execute(users_query).scalars().all()
+        response = schemas_v1.TaskUsersResponse(task_id=task_id, changed=users)
+        db.commit()
+
+    publish_batched(
+        "service.tasks.delay.task_unassign_confirm_batch",
+        [[user.email, name] for user in response.changed],
+    )
+    activity_log.push(
+        make_event(
+            current_manager.id,
+            constants.ActivityAction.TASK_UNASSIGNED,
+            task_id=task_id,
+            user_id=user.id,
+        )
+        for user in response.changed
+    )
+    return response
+
+
 @router.get("/{task_id}/assigners", response_model=Page[schemas_v1.User])
 async def get_task_assigners(
     task_id: PositiveInt,
@@ -5,6 +5,7 @@ from sqlalchemy import select
 from db import constants, models
 from db.session import DBSession
 from service.core import settings
+from service.core.activity import activity_log, make_event
 from service.core.celery_app import celery_app
 from service.core.dependencies import (get_current_manager, get_refresh_token,
                                        get_session)
@@ -52,6 +53,9 @@ async def manager_sign_up(
         db.add(user)
         db.commit()
         db.refresh(user)
+    activity_log.push(
+        [make_event(user.id, constants.ActivityAction.USER_SIGNED_UP, user_id=user.id)]
+    )
     # Return JWT tokens
     return UJSONResponse(
         status_code=status.HTTP_201_CREATED,
@@ -104,6 +108,16 @@ async def invite_developer(
         db.commit()
         db.refresh(user)
 
+    activity_log.push(
+        [
+            make_event(
+                current_manager.id,
+                constants.ActivityAction.USER_INVITED,
+                user_id=user.id,
+            )
+        ]
+    )
+
     tmp_token = create_tmp_token(pk=user.id)
     celery_app.send_task(
         "service.tasks.delay.send_invite",
@@ -143,6 +157,9 @@ async def developer_sign_up(
         db.add(user)
         db.commit()
         db.refresh(user)
+    activity_log.push(
+        [make_event(user.id, constants.ActivityAction.USER_SIGNED_UP, user_id=user.id)]
+    )
 
     return UJSONResponse(
         status_code=status.HTTP_201_CREATED,
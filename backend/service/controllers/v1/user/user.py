@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+
+import ujson
+from fastapi import APIRouter, Depends, Query, Request, Response
 from fastapi_pagination import Page
 from fastapi_pagination.ext.sqlalchemy import paginate
-from sqlalchemy import select
+from sqlalchemy import Select, case, or_, select
 
 from db import constants, models
 from db.session import DBSession
+from service.core import redis_cache, settings
 from service.core.dependencies import (get_access_token, get_current_user,
                                        get_session)
+from service.core.etag import check_etag, make_etag
 from service.schemas import v1 as schemas_v1
 
 router = APIRouter()
@@ -14,6 +19,8 @@ router = APIRouter()
 
 @router.get("/me/", response_model=schemas_v1.User)
 async def user_me(
+    request: Request,
+    response: Response,
     token_payload: schemas_v1.JWTTokenPayload = Depends(get_access_token),
     session: DBSession = Depends(get_session),
     user: models.User = Depends(get_current_user),
@@ -22,13 +29,52 @@ async def user_me(
     Return User me info\n
     Responses:\n
     `200` OK - Everything is good (SUCCESS Response)\n
+    `304` NOT_MODIFIED - User didn't change since `If-None-Match` ETag\n
     `401` UNAUTHORIZED - You have not provided authorization token\n
     `403` FORBIDDEN - Invalid authorization\n
     `422` UNPROCESSABLE_ENTITY - Failed field validation\n
     """
+    not_modified = check_etag(
+        request,
+        response,
+        make_etag("user", user.id, user.revision),
+        settings.CACHE_CONTROL_USER_ME,
+    )
+    if not_modified:
+        return not_modified
     return user
 
 
+@router.get("/me/stats", response_model=schemas_v1.UserTaskStats)
+def get_my_stats(
+    session: DBSession = Depends(get_session),
+    user: models.User = Depends(get_current_user),
+) -> schemas_v1.UserTaskStats:
+    """
+    Return my tasks stats\n
+    Counts of tasks where I'm responsible person or executor by status and
+    by priority, read from counters which are kept up to date by the database\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `401` UNAUTHORIZED - You have not provided authorization token\n
+    `403` FORBIDDEN - Invalid authorization\n
+    """
+    stats_query = select(
+        models.UserTaskStats.status,
+        models.UserTaskStats.priority,
+        models.UserTaskStats.count,
+    ).where(models.UserTaskStats.user_id == user.id, models.UserTaskStats.count > 0)
+    by_status = dict.fromkeys((item.value for item in constants.TaskStatus), 0)
+    by_priority = dict.fromkeys((item.value for item in constants.Priority), 0)
+    with session() as db:
+        for status_value, priority, count in db.execute(stats_query):
+            by_status[status_value] = by_status.get(status_value, 0) + count
+            by_priority[priority] = by_priority.get(priority, 0) + count
+    return schemas_v1.UserTaskStats(
+        total=sum(by_status.values()), by_status=by_status, by_priority=by_priority
+    )
+
+
 @router.get("/managers/", response_model=Page[schemas_v1.User])
 def get_managers(
     session: DBSession = Depends(get_session),
@@ -67,3 +113,115 @@ async def get_developers(
     )
     with session() as db:
         return paginate(db, managers_query)
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards, so the value is matched literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def get_user_search_query(
+    q: str,
+    user_status: Optional[constants.UserStatus] = None,
+    limit: int = constants.USER_SEARCH_LIMIT,
+) -> Select:
+    """
+    Return query of users whose name or email contains `q`, served by trigram
+    indexes. Prefix matches go first, then users are ordered by name
+    """
+    pattern = escape_like(q)
+    contains = or_(
+        models.User.name.ilike(f"%{pattern}%", escape="\\"),
+        models.User.email.ilike(f"%{pattern}%", escape="\\"),
+    )
+    starts_with = or_(
+        models.User.name.ilike(f"{pattern}%", escape="\\"),
+        models.User.email.ilike(f"{pattern}%", escape="\\"),
+    )
+    users_query = select(models.User).where(contains)
+    if user_status:
+        users_query = users_query.where(models.User.status == user_status)
+    return users_query.order_by(
+        case((starts_with, 0), else_=1), models.User.name, models.User.id
+    ).limit(limit)
+
+
+def get_cached_users(
+    session: DBSession, cache_key: str, users_query: Select
+) -> List[dict]:
+    """Return users of query, cached for USER_SEARCH_CACHE_LIFETIME seconds"""
+    cached = redis_cache.client.get(cache_key)
+    if cached:
+        return ujson.loads(cached)
+    with session() as db:
+        result = [
+            schemas_v1.User.model_validate(user).model_dump(mode="json")
+            for user in db.scalars(users_query)
+        ]
+    redis_cache.client.set(
+        cache_key, ujson.dumps(result), ex=settings.USER_SEARCH_CACHE_LIFETIME
+    )
+    return result
+
+
+def match_users(users: List[dict], q: str) -> List[dict]:
+    """
+    Return users whose name or email contains lowercase `q` like the search
+    query does, users are ordered by name
+    """
+    matches, prefix_matches = [], []
+    for user in users:
+        fields = (user["name"].lower(), user["email"].lower())
+        if any(field.startswith(q) for field in fields):
+            prefix_matches.append(user)
+        elif any(q in field for field in fields):
+            matches.append(user)
+    return (prefix_matches + matches)[: constants.USER_SEARCH_LIMIT]
+
+
+@router.get("/search", response_model=List[schemas_v1.User])
+def search_users(
+    q: str = Query(
+        min_length=constants.MIN_USER_SEARCH_QUERY_LENGTH,
+        max_length=constants.MAX_USER_SEARCH_QUERY_LENGTH,
+    ),
+    user_status: Optional[constants.UserStatus] = Query(None, alias="status"),
+    session: DBSession = Depends(get_session),
+    user: models.User = Depends(get_current_user),
+) -> List[dict]:
+    """
+    Search users\n
+    Typeahead search of users by part of name or email for assignment
+    pickers, `q` is at least 3 characters long, `status` limits users to
+    managers or developers. Return up to 10 users, the ones starting with `q`
+    first\n
+    Responses:\n
+    `200` OK - Everything is good (SUCCESS Response)\n
+    `401` UNAUTHORIZED - You have not provided authorization token\n
+    `403` FORBIDDEN - Invalid authorization\n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation\n
+    """
+    # Matching is case-insensitive, so are the cache keys
+    q = q.lower()
+    status_key = user_status.value if user_status else "all"
+    # Queries of a typing session share the bucket of their first characters
+    prefix_length = constants.MIN_USER_SEARCH_QUERY_LENGTH
+    prefix = q[:prefix_length]
+    bucket_query = (
+        get_user_search_query(
+            prefix, user_status, constants.USER_SEARCH_BUCKET_SIZE + 1
+        )
+        .order_by(None)
+        .order_by(models.User.name, models.User.id)
+    )
+    bucket = get_cached_users(
+        session, f"user-search:{status_key}:{prefix}", bucket_query
+    )
+    if len(bucket) <= constants.USER_SEARCH_BUCKET_SIZE:
+        return match_users(bucket, q)
+    # Bucket has more users than it holds, longer queries are cached alone
+    return get_cached_users(
+        session,
+        f"user-search:{status_key}:{prefix}:{q}",
+        get_user_search_query(q, user_status),
+    )
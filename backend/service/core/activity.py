@@ -0,0 +1,210 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, Optional
+from uuid import uuid4
+
+import ujson
+from redis.exceptions import RedisError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from db import constants, models
+from db.session import DBSession
+from db.utils import get_default_now
+
+from .redis_cache import redis_cache
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def make_event(
+    actor_id: int,
+    action: constants.ActivityAction,
+    task_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    details: Optional[dict] = None,
+) -> dict:
+    """Return activity event, its time is the time of the action"""
+    return {
+        "event_id": str(uuid4()),
+        "actor_id": actor_id,
+        "action": action.value,
+        "task_id": task_id,
+        "user_id": user_id,
+        "details": details,
+        "created_at": get_default_now().isoformat(),
+    }
+
+
+class ActivityLog:
+    """
+    Write-behind activity log
+
+    Handlers push events to a bounded in-process buffer without waiting for
+    the database or Redis. A background thread writes the buffer to activity
+    table with multi-row INSERTs of up to ACTIVITY_BATCH_SIZE events, at
+    least every ACTIVITY_FLUSH_INTERVAL seconds. Events which can't be
+    written (the database is down) or buffered (the buffer is full) are
+    added to a Redis stream, their durable copy. Events which stay in the
+    stream longer than ACTIVITY_RECOVERY_AGE are written from the stream by
+    any process, and deleted from it. Known event ids are skipped on insert,
+    so an event written twice is stored once.
+    """
+
+    def __init__(self) -> None:
+        self.session = DBSession
+        self.buffer = queue.Queue(maxsize=settings.ACTIVITY_BUFFER_SIZE)
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def push(self, events: Iterable[dict]) -> None:
+        """Queue events for writing"""
+        events = list(events)
+        if not events:
+            return
+        self.start()
+        overflow = []
+        for event in events:
+            try:
+                self.buffer.put_nowait(event)
+            except queue.Full:
+                overflow.append(event)
+        if overflow:
+            self.keep(overflow)
+
+    def keep(self, events: list) -> None:
+        """Add events to the stream, they are written from it later"""
+        try:
+            pipeline = redis_cache.client.pipeline(transaction=False)
+            for event in events:
+                pipeline.xadd(
+                    settings.ACTIVITY_STREAM,
+                    {"event": ujson.dumps(event)},
+                    maxlen=settings.ACTIVITY_STREAM_MAXLEN,
+                    approximate=True,
+                )
+            pipeline.execute()
+        except RedisError as e:
+            logger.error(f"Activity events are lost: {e}, {events}")
+
+    def start(self) -> None:
+        """Start writing thread in this process, if it isn't running"""
+        if self.thread and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.stopped.clear()
+            self.thread = threading.Thread(
+                target=self.run, name="activity-log", daemon=True
+            )
+            self.thread.start()
+
+    def run(self) -> None:
+        recover_at = time.monotonic()
+        while not self.stopped.is_set():
+            try:
+                batch = self.take_batch(settings.ACTIVITY_FLUSH_INTERVAL)
+                if batch:
+                    self.write_buffered(batch)
+                if time.monotonic() >= recover_at:
+                    self.recover()
+                    recover_at = time.monotonic() + settings.ACTIVITY_RECOVERY_INTERVAL
+            except Exception:
+                logger.exception("Activity log thread failed")
+
+    def take_batch(self, timeout: float = 0) -> list:
+        """
+        Take up to ACTIVITY_BATCH_SIZE buffered events, waiting at most
+        `timeout` seconds for the batch to fill
+        """
+        batch = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < settings.ACTIVITY_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self.buffer.get(timeout=remaining))
+                else:
+                    batch.append(self.buffer.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def write(self, batch: list) -> bool:
+        """
+        Insert (stream id, event) pairs with one statement and delete them
+        from the stream. Return whether they are written and deleted
+        """
+        rows = [
+            {**event, "created_at": datetime.fromisoformat(event["created_at"])}
+            for _, event in batch
+        ]
+        insert_query = (
+            pg_insert(models.Activity)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["event_id"])
+        )
+        try:
+            with self.session() as db:
+                db.execute(insert_query)
+                db.commit()
+            stream_ids = [stream_id for stream_id, _ in batch if stream_id]
+            if stream_ids:
+                redis_cache.client.xdel(settings.ACTIVITY_STREAM, *stream_ids)
+        except (SQLAlchemyError, RedisError) as e:
+            logger.warning(f"Activity events aren't written: {e}")
+            return False
+        return True
+
+    def write_buffered(self, batch: list) -> None:
+        """Write events taken from the buffer, keep them in the stream on error"""
+        try:
+            if not self.write([(None, event) for event in batch]):
+                self.keep(batch)
+        finally:
+            for _ in batch:
+                self.buffer.task_done()
+
+    def recover(self, age: float = settings.ACTIVITY_RECOVERY_AGE) -> int:
+        """
+        Write events which are in the stream longer than `age` seconds.
+        Return count of written events
+        """
+        until = int((time.time() - age) * 1000)
+        recovered = 0
+        while True:
+            entries = redis_cache.client.xrange(
+                settings.ACTIVITY_STREAM,
+                "-",
+                until,
+                count=settings.ACTIVITY_BATCH_SIZE,
+            )
+            batch = [
+                (stream_id, ujson.loads(fields["event"]))
+                for stream_id, fields in entries
+            ]
+            if not batch or not self.write(batch):
+                return recovered
+            recovered += len(batch)
+
+    def flush(self) -> None:
+        """Write buffered events and wait for the batch which is being written"""
+        while batch := self.take_batch():
+            self.write_buffered(batch)
+        self.buffer.join()
+
+    def close(self) -> None:
+        """Stop writing thread and write buffered events"""
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+        self.flush()
+
+
+activity_log = ActivityLog()
@@ -1,6 +1,8 @@
 import os
+import time
 
 from celery import Celery
+from celery.signals import before_task_publish
 
 celery_app = Celery(
     "worker",
@@ -10,11 +12,21 @@ celery_app = Celery(
 
 celery_app.conf.task_routes = {
     "service.tasks.delay.test_celery": "main-queue",
+    "service.tasks.delay.send_invite": "mail-queue",
+    "service.tasks.delay.task_creation_confirm": "mail-queue",
+    "service.tasks.delay.task_creation_confirm_batch": "mail-queue",
+    "service.tasks.delay.task_assign_confirm": "mail-queue",
+    "service.tasks.delay.task_unassign_confirm": "mail-queue",
+    "service.tasks.delay.task_assign_confirm_batch": "mail-queue",
+    "service.tasks.delay.task_unassign_confirm_batch": "mail-queue",
+    "service.tasks.delay.task_update_notify": "mail-queue",
+    "service.tasks.imports.import_tasks_csv": "main-queue",
+    "service.tasks.schedule.*": "schedule-queue",
+    "service.tasks.analytics.*": "schedule-queue",
 }
-celery_app.conf.task_routes = {"service.tasks.delay.send_invite": "mail-queue"}
-celery_app.conf.task_routes = {"service.tasks.delay.test_celery": "main-queue"}
-celery_app.conf.task_routes = {"service.tasks.delay.send_invite": "mail-queue"}
-celery_app.conf.task_routes = {"service.tasks.delay.task_assign_confirm": "mail-queue"}
-celery_app.conf.task_routes = {
-    "service.tasks.delay.task_unassign_confirm": "mail-queue"
-}
+
+
+@before_task_publish.connect
+def add_published_at(headers: dict, **kwargs) -> None:
+    """Stamp message with publish time, the worker measures queue latency by it"""
+    headers["published_at"] = time.time()
@@ -0,0 +1,24 @@
+import base64
+import binascii
+from typing import Any, Sequence
+
+import ujson
+from fastapi import HTTPException, status
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Return opaque cursor of keyset values of the last returned row"""
+    return base64.urlsafe_b64encode(ujson.dumps(list(values)).encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Return keyset values of cursor, raise 400 for malformed cursors"""
+    try:
+        values = ujson.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, binascii.Error):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return values
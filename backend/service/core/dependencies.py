@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from jose import jwt
 from sqlalchemy import select
 
@@ -10,6 +10,11 @@ from service.schemas import v1 as schemas_v1
 from .redis_cache import redis_cache
 from .security import APIKeyHeader
 
+# Scope keys of sub-requests of batch request: its token payload and user,
+# so they are authenticated once for the whole batch
+BATCH_TOKEN_KEY = "batch_token"
+BATCH_USER_KEY = "batch_user"
+
 
 def get_session() -> DBSession:
     """Return DB session and close after using"""
@@ -17,9 +22,12 @@ def get_session() -> DBSession:
 
 
 async def get_jwt_token(
+    request: Request,
     token: str = Depends(APIKeyHeader(name="Authorization")),
 ) -> schemas_v1.JWTTokenPayload:
     """Get JWT access or refresh token"""
+    if BATCH_TOKEN_KEY in request.scope:
+        return request.scope[BATCH_TOKEN_KEY]
     if redis_cache.get(token):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -62,10 +70,13 @@ async def get_refresh_token(
 
 
 async def get_current_user(
+    request: Request,
     session: DBSession = Depends(get_session),
     token_payload: schemas_v1.JWTTokenPayload = Depends(get_access_token),
 ) -> models.User:
     """Return current user instance"""
+    if BATCH_USER_KEY in request.scope:
+        return request.scope[BATCH_USER_KEY]
     user_query = select(models.User).filter_by(id=token_payload.pk)
     with session() as db:
         user = db.execute(user_query).scalar_one_or_none()
@@ -78,10 +89,19 @@ async def get_current_user(
 
 
 async def get_current_manager(
+    request: Request,
     session: DBSession = Depends(get_session),
     token_payload: schemas_v1.JWTTokenPayload = Depends(get_access_token),
 ) -> models.User:
     """Return current user instance"""
+    if BATCH_USER_KEY in request.scope:
+        user = request.scope[BATCH_USER_KEY]
+        if user.status != constants.UserStatus.MANAGER:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Could not validate credentials",
+            )
+        return user
     user_query = select(models.User).filter_by(
         id=token_payload.pk, status=constants.UserStatus.MANAGER
     )
@@ -0,0 +1,37 @@
+import hashlib
+from typing import Any, Optional
+
+import ujson
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Return strong ETag of revisions which the representation is built of"""
+    digest = hashlib.blake2b(ujson.dumps(parts).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Return whether If-None-Match of request matches current ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    return etag in {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def check_etag(
+    request: Request, response: Response, etag: str, cache_control: str
+) -> Optional[Response]:
+    """
+    Set validator and caching headers of response. Return empty 304 response
+    if the client's copy is current, so the body isn't loaded and serialized
+    """
+    # Representations depend on the user, so shared caches key them by token
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
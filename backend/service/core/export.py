@@ -0,0 +1,68 @@
+import csv
+import io
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator
+
+import ujson
+from sqlalchemy import Select
+from sqlalchemy.orm import scoped_session
+
+from db import constants
+
+MEDIA_TYPES = {
+    constants.ExportFormat.NDJSON: "application/x-ndjson",
+    constants.ExportFormat.CSV: "text/csv",
+}
+
+
+def serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def stream_rows(
+    session: scoped_session,
+    query: Select,
+    export_format: constants.ExportFormat,
+    batch_size: int = constants.EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yield query rows encoded as NDJSON or CSV, one chunk per batch.
+    Rows are read from server-side cursor on a dedicated connection, so
+    memory doesn't depend on the number of rows. The generator is consumed
+    as the client reads, so slow clients slow down the cursor
+    """
+    with session.get_bind().connect() as connection:
+        result = connection.execution_options(
+            stream_results=True, yield_per=batch_size
+        ).execute(query)
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == constants.ExportFormat.CSV:
+            writer.writerow(columns)
+        for rows in result.partitions():
+            for row in rows:
+                values = [serialize(value) for value in row]
+                if export_format == constants.ExportFormat.CSV:
+                    writer.writerow(values)
+                else:
+                    buffer.write(ujson.dumps(dict(zip(columns, values))))
+                    buffer.write("\n")
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compress chunks into one gzip stream on the fly"""
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
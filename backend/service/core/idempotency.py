@@ -0,0 +1,208 @@
+import asyncio
+import base64
+import hashlib
+import time
+from typing import Callable, Coroutine, Optional
+from uuid import uuid4
+
+import ujson
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from redis.exceptions import WatchError
+
+from db import constants
+
+from .dependencies import get_access_token, get_jwt_token
+from .redis_cache import redis_cache
+from .security import APIKeyHeader
+from .settings import settings
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+async def get_fingerprint(request: Request) -> str:
+    """
+    Return digest of method, path, query and body of request. Body of
+    multipart upload isn't read: the endpoint spools it to disk, so the key
+    alone tells its retries apart
+    """
+    digest = hashlib.sha256()
+    for part in (request.method, request.url.path, request.url.query):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    if not request.headers.get("content-type", "").startswith("multipart/"):
+        digest.update(await request.body())
+    return digest.hexdigest()
+
+
+async def get_idempotency_key(request: Request, key: str) -> str:
+    """
+    Return Redis key of response, keys of clients are separated by user, so
+    a retry with a refreshed token gets the response too. Raise like the
+    endpoint if the request isn't authenticated by access token
+    """
+    token = await APIKeyHeader(name="Authorization")(request)
+    token_payload = await get_access_token(await get_jwt_token(request, token))
+    return f"idempotency:{token_payload.pk}:{key}"
+
+
+def dump_response(response: Response, fingerprint: str) -> str:
+    """Return response as JSON, its body is base64 encoded"""
+    return ujson.dumps(
+        {
+            "fingerprint": fingerprint,
+            "status_code": response.status_code,
+            "headers": [
+                [name.decode("latin-1"), value.decode("latin-1")]
+                for name, value in response.raw_headers
+            ],
+            "body": base64.b64encode(response.body).decode(),
+        }
+    )
+
+
+def load_response(stored: dict) -> Response:
+    """Return stored response with the same status, headers and body"""
+    response = Response(
+        content=base64.b64decode(stored["body"]), status_code=stored["status_code"]
+    )
+    response.raw_headers = [
+        (name.encode("latin-1"), value.encode("latin-1"))
+        for name, value in stored["headers"]
+    ] + [(REPLAYED_HEADER.lower().encode("latin-1"), b"true")]
+    return response
+
+
+def release_lock(lock_key: str, lock: str) -> None:
+    """
+    Delete lock of the key if the request still holds it: an expired lock
+    could be taken by a retry meanwhile
+    """
+    with redis_cache.client.pipeline() as pipeline:
+        try:
+            pipeline.watch(lock_key)
+            if pipeline.get(lock_key) == lock:
+                pipeline.multi()
+                pipeline.delete(lock_key)
+                pipeline.execute()
+        except WatchError:
+            # Lock was changed, so it isn't held anymore
+            pass
+
+
+def extend_lock(lock_key: str, lock: str) -> bool:
+    """
+    Extend lock of the key by IDEMPOTENCY_LOCK_TIMEOUT seconds if the request
+    still holds it, return whether it does
+    """
+    with redis_cache.client.pipeline() as pipeline:
+        try:
+            pipeline.watch(lock_key)
+            if pipeline.get(lock_key) == lock:
+                pipeline.multi()
+                pipeline.expire(lock_key, settings.IDEMPOTENCY_LOCK_TIMEOUT)
+                pipeline.execute()
+                return True
+        except WatchError:
+            pass
+    return False
+
+
+async def keep_lock(lock_key: str, lock: str) -> None:
+    """
+    Extend lock of the key while the request runs, so a slow request isn't
+    run again by a retry when its lock expires
+    """
+    while True:
+        await asyncio.sleep(settings.IDEMPOTENCY_LOCK_TIMEOUT / 3)
+        if not extend_lock(lock_key, lock):
+            return
+
+
+async def wait_for_lock(response_key: str, lock_key: str, lock: str) -> Optional[dict]:
+    """
+    Return stored response of the key, or take the lock of the key and
+    return None. Raise 409 if the key stays locked longer than
+    IDEMPOTENCY_WAIT_TIMEOUT seconds
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+    while True:
+        stored = redis_cache.client.get(response_key)
+        if stored:
+            return ujson.loads(stored)
+        if redis_cache.client.set(
+            lock_key, lock, nx=True, ex=settings.IDEMPOTENCY_LOCK_TIMEOUT
+        ):
+            # Response could be stored between the two checks
+            stored = redis_cache.client.get(response_key)
+            if not stored:
+                return None
+            release_lock(lock_key, lock)
+            return ujson.loads(stored)
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Request with this Idempotency-Key is in progress",
+            )
+        await asyncio.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+
+class IdempotentRoute(APIRoute):
+    """
+    Route whose writes can be retried with the same Idempotency-Key header
+
+    The first response of a key is stored in Redis for IDEMPOTENCY_KEY_TTL
+    seconds with the fingerprint of its request, and retries get it back
+    byte for byte without running the endpoint again. A retry which arrives
+    while the first request is running waits for its response, the request
+    holds a lock of the key, which it extends while it runs, and which
+    expires after IDEMPOTENCY_LOCK_TIMEOUT seconds if its process dies.
+    Raised errors aren't stored, so failed requests can be retried.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine]:
+        handler = super().get_route_handler()
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+            if key is None or request.method not in IDEMPOTENT_METHODS:
+                return await handler(request)
+            if not 0 < len(key) <= constants.MAX_IDEMPOTENCY_KEY_LENGTH:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid Idempotency-Key",
+                )
+            fingerprint = await get_fingerprint(request)
+            response_key = await get_idempotency_key(request, key)
+            lock_key = f"{response_key}:lock"
+            lock = str(uuid4())
+
+            stored = await wait_for_lock(response_key, lock_key, lock)
+            if stored is not None:
+                if stored["fingerprint"] != fingerprint:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail="Idempotency-Key is used with another request",
+                    )
+                return load_response(stored)
+            keeper = asyncio.create_task(keep_lock(lock_key, lock))
+            try:
+                response = await handler(request)
+                # Streamed responses have no body to store
+                if (
+                    hasattr(response, "body")
+                    and response.status_code < status.HTTP_500_INTERNAL_SERVER_ERROR
+                ):
+                    redis_cache.client.set(
+                        response_key,
+                        dump_response(response, fingerprint),
+                        ex=settings.IDEMPOTENCY_KEY_TTL,
+                    )
+                return response
+            finally:
+                keeper.cancel()
+                release_lock(lock_key, lock)
+
+        return idempotent_handler
@@ -0,0 +1,56 @@
+from typing import Iterable, Sequence
+
+from celery import group
+from sqlalchemy import CompoundSelect, select, union
+
+from db import models
+
+from .celery_app import celery_app
+from .settings import settings
+
+
+def get_participants_query(task_ids: Iterable[int]) -> CompoundSelect:
+    """
+    Return query of (email, task name, status, priority) rows for responsible
+    persons and executors of tasks. Users which are both are returned once
+    """
+    task_ids = list(task_ids)
+    responsible_query = (
+        select(
+            models.User.email,
+            models.Task.name,
+            models.Task.status,
+            models.Task.priority,
+        )
+        .join(models.Task, models.Task.responsible_person_id == models.User.id)
+        .where(models.Task.id.in_(task_ids))
+    )
+    executors_query = (
+        select(
+            models.User.email,
+            models.Task.name,
+            models.Task.status,
+            models.Task.priority,
+        )
+        .join(models.TaskExecutors, models.TaskExecutors.user_id == models.User.id)
+        .join(models.Task, models.Task.id == models.TaskExecutors.task_id)
+        .where(models.TaskExecutors.task_id.in_(task_ids))
+    )
+    return union(responsible_query, executors_query)
+
+
+def publish_batched(task_name: str, recipients: Sequence[Sequence]) -> None:
+    """
+    Publish one message per MAIL_BATCH_SIZE recipients as a Celery group
+    instead of one message per recipient
+    """
+    size = settings.MAIL_BATCH_SIZE
+    chunks = []
+    for start in range(0, len(recipients), size):
+        end = start + size
+        chunks.append(list(map(list, recipients[start:end])))
+    if not chunks:
+        return
+    group(
+        celery_app.signature(task_name, args=[chunk]) for chunk in chunks
+    ).apply_async()
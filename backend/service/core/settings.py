@@ -89,6 +89,7 @@ class Settings(BaseSettings):
 
     REDIS_CACHE_URL: Final[str] = f"redis://redis"
     REDIS_CACHE_LIFETIME: int = 10  # Set in minutes
+    USER_SEARCH_CACHE_LIFETIME: int = 30  # Set in seconds
 
     ###########
     # ADMINER #
@@ -102,6 +103,79 @@ class Settings(BaseSettings):
     SMTP_HOST: str = os.getenv("SMTP_HOST")
     SMTP_USER: str = os.getenv("SMTP_USER")
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD")
+    # Max recipients in one broker message of batched notifications
+    MAIL_BATCH_SIZE: int = os.getenv("MAIL_BATCH_SIZE", 50)
+
+    ##########
+    # IMPORT #
+    ##########
+    # Directory shared with the worker where uploaded files are spooled
+    IMPORT_DIR: str = os.getenv("IMPORT_DIR", "/imports")
+    IMPORT_PROGRESS_LIFETIME: int = 60 * 24  # Set in minutes
+
+    #############
+    # ANALYTICS #
+    #############
+    # Directory shared with the worker where analytics snapshots are stored
+    ANALYTICS_DIR: str = os.getenv("ANALYTICS_DIR", "/analytics")
+
+    ############
+    # ACTIVITY #
+    ############
+    # Events are buffered in process and written in multi-row INSERTs of up to
+    # ACTIVITY_BATCH_SIZE events at least every ACTIVITY_FLUSH_INTERVAL seconds
+    ACTIVITY_BATCH_SIZE: int = os.getenv("ACTIVITY_BATCH_SIZE", 500)
+    ACTIVITY_BUFFER_SIZE: int = os.getenv("ACTIVITY_BUFFER_SIZE", 10000)
+    ACTIVITY_FLUSH_INTERVAL: float = 1.0  # Set in seconds
+    # Redis stream with durable copies of events which aren't written yet
+    ACTIVITY_STREAM: str = "activity"
+    ACTIVITY_STREAM_MAXLEN: int = 1_000_000
+    # Events left in the stream longer than this are written from the stream
+    ACTIVITY_RECOVERY_AGE: int = 60  # Set in seconds
+    ACTIVITY_RECOVERY_INTERVAL: int = 30  # Set in seconds
+
+    ###############
+    # TASK STREAM #
+    ###############
+    # Events waiting for a slow subscriber, on overflow it is told to resync
+    TASK_STREAM_QUEUE_SIZE: int = 100
+    TASK_STREAM_PING_INTERVAL: int = 15  # Set in seconds
+    TASK_STREAM_RECONNECT_DELAY: float = 1.0  # Set in seconds
+
+    #############
+    # TASK SYNC #
+    #############
+    # Tombstones of removed tasks are kept, and sync tokens are valid, so long
+    TASK_TOMBSTONE_LIFETIME: int = os.getenv("TASK_TOMBSTONE_LIFETIME", 30)  # Days
+
+    ##############
+    # HTTP CACHE #
+    ##############
+    # Tasks change often: clients revalidate every time and get 304 if the
+    # ETag matches. Own profile rarely changes, so it is reused for a while
+    CACHE_CONTROL_TASK: str = "private, no-cache"
+    CACHE_CONTROL_TASK_LIST: str = "private, no-cache"
+    CACHE_CONTROL_USER_ME: str = "private, max-age=60"
+
+    #########
+    # BATCH #
+    #########
+    # Sub-request which doesn't finish in time (e.g. a stream) gets 504
+    BATCH_ITEM_TIMEOUT: float = 10.0  # Set in seconds
+    # Larger sub-response (e.g. an export) gets 502, it's requested directly
+    BATCH_MAX_BODY_SIZE: int = 1024 * 1024  # Set in bytes
+
+    ###############
+    # IDEMPOTENCY #
+    ###############
+    # Responses of Idempotency-Key requests are replayed to retries so long
+    IDEMPOTENCY_KEY_TTL: int = os.getenv("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60)
+    # Lock of a running request is extended every third of the timeout and
+    # expires if its process dies
+    IDEMPOTENCY_LOCK_TIMEOUT: int = 60  # Set in seconds
+    # Retry waits so long for the running request, then gets 409
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10.0  # Set in seconds
+    IDEMPOTENCY_POLL_INTERVAL: float = 0.05  # Set in seconds
 
     class Config:
         case_sensitive = True
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import AsyncIterator, Optional
+
+import ujson
+
+from db import constants
+from db.session import engine
+
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Changes could be missed: subscriber reloads its tasks
+RESYNC_EVENT = {"op": "resync", "task_id": None}
+
+
+class TaskStream:
+    """
+    Task change feed of this process
+
+    One thread holds one connection which LISTENs on TASK_CHANGES_CHANNEL,
+    whatever the number of subscribers. A notification carries a user and
+    ids of the changed tasks which the user sees, an event of every task is
+    put only to the user's subscriptions' queues, on the event loops which
+    read them. All subscribers get a resync event when the
+    connection is (re)established, and so does a subscriber whose queue
+    overflows, instead of the events it hasn't read.
+    """
+
+    def __init__(self) -> None:
+        self.engine = engine
+        # User id -> {queue: event loop of the queue}
+        self.subscriptions = defaultdict(dict)
+        self.connected = threading.Event()
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """Return queue of changes of user's tasks, call it on the event loop"""
+        queue = asyncio.Queue(maxsize=settings.TASK_STREAM_QUEUE_SIZE)
+        with self.lock:
+            self.subscriptions[user_id][queue] = asyncio.get_running_loop()
+        self.start()
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        with self.lock:
+            self.subscriptions[user_id].pop(queue, None)
+            if not self.subscriptions[user_id]:
+                del self.subscriptions[user_id]
+
+    async def events(self, user_id: int) -> AsyncIterator[str]:
+        """Yield server-sent events of user's task changes until cancelled"""
+        queue = self.subscribe(user_id)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), settings.TASK_STREAM_PING_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    # Comment keeps proxies from closing idle connection
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['op']}\ndata: {ujson.dumps(event)}\n\n"
+        finally:
+            self.unsubscribe(user_id, queue)
+
+    def start(self) -> None:
+        """Start listening thread in this process, if it isn't running"""
+        if self.thread and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.stopped.clear()
+            self.thread = threading.Thread(
+                target=self.run, name="task-stream", daemon=True
+            )
+            self.thread.start()
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            try:
+                self.listen()
+            except Exception:
+                logger.exception("Task stream connection failed")
+            self.stopped.wait(settings.TASK_STREAM_RECONNECT_DELAY)
+
+    def listen(self) -> None:
+        connection = self.engine.raw_connection()
+        try:
+            dbapi_connection = connection.driver_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {constants.TASK_CHANGES_CHANNEL}")
+            self.connected.set()
+            self.dispatch(RESYNC_EVENT)
+            while not self.stopped.is_set():
+                # Wakes up every second to check if stopped
+                if not select.select([dbapi_connection], [], [], 1.0)[0]:
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    change = ujson.loads(dbapi_connection.notifies.pop(0).payload)
+                    for task_id in change["task_ids"]:
+                        self.dispatch(
+                            {"op": change["op"], "task_id": task_id},
+                            {change["user_id"]},
+                        )
+        finally:
+            self.connected.clear()
+            # Listening connection isn't returned to the pool
+            connection.invalidate()
+
+    def dispatch(self, event: dict, user_ids: Optional[set] = None) -> None:
+        """Put event to queues of users, of all subscribers if no users"""
+        with self.lock:
+            if user_ids is None:
+                user_ids = set(self.subscriptions)
+            targets = [
+                (queue, loop)
+                for user_id in user_ids
+                for queue, loop in self.subscriptions.get(user_id, {}).items()
+            ]
+        for queue, loop in targets:
+            try:
+                loop.call_soon_threadsafe(self.put, queue, event)
+            except RuntimeError:
+                # Event loop is closed, its subscribers are gone
+                pass
+
+    @staticmethod
+    def put(queue: asyncio.Queue, event: dict) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_EVENT)
+
+    def close(self) -> None:
+        """Stop listening thread"""
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+
+
+task_stream = TaskStream()
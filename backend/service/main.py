@@ -10,7 +10,9 @@ from fastapi.responses import UJSONResponse
 from service.controllers.v1.api import router_v1
 from service.controllers.v1.home import home
 from service.core import settings
+from service.core.activity import activity_log
 from service.core.celery_app import celery_app
+from service.core.stream import task_stream
 
 app = FastAPI(
     title=f"{settings.PROJECT_NAME}",
@@ -37,6 +39,11 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# Write buffered activity events before the process exits
+app.add_event_handler("shutdown", activity_log.close)
+# Close listening connection of task stream
+app.add_event_handler("shutdown", task_stream.close)
+
 # Include routers
 app.include_router(home.router, tags=["Home"])
 app.include_router(router_v1, prefix=f"/api/v1")
@@ -1,9 +1,37 @@
+from .activity import ActivityPage, ActivityResponse
+from .analytics import (
+    AnalyticsSnapshot,
+    FlowPercentiles,
+    SnapshotTableFiles,
+    TaskFlow,
+    TaskFlowDay,
+)
 from .auth import Auth, DeveloperAuth, DeveloperInvite, ManagerAuth
+from .batch import BatchRequest, BatchRequestItem, BatchResponse, BatchResponseItem
 from .home import HomeResponse
 from .jwt_token import JWTTokenPayload, JWTTokensResponse
 from .response import MsgResponse
-from .task import AssignResponse, CreateTask, TaskResponse
-from .user import User
+from .task import (
+    AssignResponse,
+    BulkCreateTask,
+    BulkTaskFilter,
+    BulkTaskResponse,
+    BulkTaskResult,
+    BulkUpdateResponse,
+    BulkUpdateTask,
+    CreateTask,
+    TaskBoard,
+    TaskBoardColumn,
+    TaskChanges,
+    TaskFilter,
+    TaskImportStatus,
+    TaskResponse,
+    TaskSearchPage,
+    TaskSearchResult,
+    TaskUsers,
+    TaskUsersResponse,
+)
+from .user import User, UserTaskStats
 
 __all__ = (
     # Home
@@ -14,6 +42,7 @@ __all__ = (
     "DeveloperAuth",
     "Auth",
     "User",
+    "UserTaskStats",
     # JWT
     "JWTTokenPayload",
     "JWTTokensResponse",
@@ -23,4 +52,33 @@ __all__ = (
     "CreateTask",
     "TaskResponse",
     "AssignResponse",
+    "BulkCreateTask",
+    "BulkTaskResult",
+    "BulkTaskResponse",
+    "BulkTaskFilter",
+    "BulkUpdateTask",
+    "BulkUpdateResponse",
+    "TaskUsers",
+    "TaskUsersResponse",
+    "TaskImportStatus",
+    "TaskSearchResult",
+    "TaskSearchPage",
+    "TaskFilter",
+    "TaskBoardColumn",
+    "TaskBoard",
+    "TaskChanges",
+    # Analytics
+    "SnapshotTableFiles",
+    "AnalyticsSnapshot",
+    "FlowPercentiles",
+    "TaskFlowDay",
+    "TaskFlow",
+    # Activity
+    "ActivityResponse",
+    "ActivityPage",
+    # Batch
+    "BatchRequestItem",
+    "BatchRequest",
+    "BatchResponseItem",
+    "BatchResponse",
 )
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class ActivityResponse(BaseModel):
+    event_id: str
+    actor_id: int
+    action: str
+    task_id: Optional[int] = None
+    user_id: Optional[int] = None
+    details: Optional[dict] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ActivityPage(BaseModel):
+    items: List[ActivityResponse]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,34 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class SnapshotTableFiles(BaseModel):
+    rows: int
+    arrow: str
+    parquet: str
+
+
+class AnalyticsSnapshot(BaseModel):
+    watermark: datetime
+    generated_at: datetime
+    tables: Dict[str, SnapshotTableFiles]
+
+
+class FlowPercentiles(BaseModel):
+    p50: Optional[float] = None
+    p85: Optional[float] = None
+    p95: Optional[float] = None
+
+
+class TaskFlowDay(BaseModel):
+    day: date
+    statuses: Dict[str, int]
+    done: int
+    lead_time: FlowPercentiles
+    cycle_time: FlowPercentiles
+
+
+class TaskFlow(BaseModel):
+    days: List[TaskFlowDay]
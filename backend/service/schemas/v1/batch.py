@@ -0,0 +1,26 @@
+from typing import Annotated, Any, Dict, List, Literal
+
+from pydantic import BaseModel, StringConstraints, conlist
+
+from db import constants
+
+
+class BatchRequestItem(BaseModel):
+    method: Literal["GET"] = "GET"
+    # Path with query string, relative to API root, e.g. `/task/me/?size=10`
+    url: Annotated[str, StringConstraints(pattern=r"^/", max_length=2048)]
+    headers: Dict[str, str] = {}
+
+
+class BatchRequest(BaseModel):
+    items: conlist(BatchRequestItem, min_length=1, max_length=constants.MAX_BATCH_ITEMS)
+
+
+class BatchResponseItem(BaseModel):
+    status_code: int
+    headers: Dict[str, str]
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    items: List[BatchResponseItem]
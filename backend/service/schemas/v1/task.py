@@ -1,4 +1,9 @@
-from pydantic import BaseModel, PositiveInt, constr
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import Query
+from fastapi.exceptions import ValidationException
+from pydantic import BaseModel, PositiveInt, conlist, constr, model_validator
 
 from db import constants
 
@@ -14,12 +19,15 @@ class CreateTask(BaseModel):
 
 
 class TaskResponse(BaseModel):
+    id: PositiveInt
     name: str
     description: str
     priority_person: User
     created_by_person: User
     status: str
     priority: str
+    # Only with `include=assigners` of task listings
+    assigners: Optional[List[User]] = None
 
     class Config:
         from_attributes = True
@@ -31,3 +39,137 @@ class AssignResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class BulkCreateTask(BaseModel):
+    items: conlist(CreateTask, min_length=1, max_length=constants.MAX_BULK_ITEMS)
+
+
+class BulkTaskResult(BaseModel):
+    index: int
+    status_code: int
+    task: Optional[TaskResponse] = None
+    detail: Optional[str] = None
+
+
+class BulkTaskResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkTaskResult]
+
+
+class TaskUsers(BaseModel):
+    user_ids: conlist(PositiveInt, min_length=1, max_length=constants.MAX_BULK_ITEMS)
+
+
+class TaskUsersResponse(BaseModel):
+    task_id: PositiveInt
+    changed: List[User]
+
+
+class BulkTaskFilter(BaseModel):
+    status: Optional[constants.TaskStatus] = None
+    priority: Optional[constants.Priority] = None
+    responsible_person_id: Optional[PositiveInt] = None
+    created_by: Optional[PositiveInt] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "BulkTaskFilter":
+        if not self.model_dump(exclude_none=True):
+            raise ValueError("Filter must contain at least one field")
+        return self
+
+
+class BulkUpdateTask(BaseModel):
+    ids: Optional[
+        conlist(PositiveInt, min_length=1, max_length=constants.MAX_BULK_ITEMS)
+    ] = None
+    filter: Optional[BulkTaskFilter] = None
+    status: Optional[constants.TaskStatus] = None
+    priority: Optional[constants.Priority] = None
+    responsible_person_id: Optional[PositiveInt] = None
+
+    @model_validator(mode="after")
+    def check_target_and_values(self) -> "BulkUpdateTask":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Either ids or filter must be set")
+        if not self.get_values():
+            raise ValueError("Nothing to update")
+        return self
+
+    def get_values(self) -> dict:
+        """Return fields to update"""
+        return self.model_dump(
+            include={"status", "priority", "responsible_person_id"},
+            exclude_none=True,
+            mode="json",
+        )
+
+
+class BulkUpdateResponse(BaseModel):
+    updated: int
+    ids: List[PositiveInt]
+    limit_reached: bool
+
+
+class TaskImportStatus(BaseModel):
+    import_id: str
+    status: constants.ImportStatus
+    processed: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: List[str] = []
+
+    class Config:
+        use_enum_values = True
+
+
+class TaskSearchResult(TaskResponse):
+    rank: float
+
+
+class TaskSearchPage(BaseModel):
+    items: List[TaskSearchResult]
+    next_cursor: Optional[str] = None
+
+
+class TaskBoardColumn(BaseModel):
+    status: constants.TaskStatus
+    total: int
+    items: List[TaskResponse]
+    next_cursor: Optional[str] = None
+
+    class Config:
+        use_enum_values = True
+
+
+class TaskBoard(BaseModel):
+    columns: List[TaskBoardColumn]
+
+
+class TaskChanges(BaseModel):
+    tasks: List[TaskResponse]
+    removed_task_ids: List[PositiveInt]
+    since: str
+
+
+class TaskFilter:
+    def __init__(
+        self,
+        status: Optional[constants.TaskStatus] = Query(None),
+        priority: Optional[constants.Priority] = Query(None),
+        responsible_person_id: Optional[PositiveInt] = Query(None),
+        created_by: Optional[PositiveInt] = Query(None),
+        created_from: Optional[datetime] = Query(None),
+        created_to: Optional[datetime] = Query(None),
+        sort: constants.TaskSort = Query(constants.TaskSort.CREATED_AT_DESC),
+    ):
+        if created_from and created_to and created_from > created_to:
+            raise ValidationException("created_from is later than created_to")
+        self.status = status.value if status else None
+        self.priority = priority.value if priority else None
+        self.responsible_person_id = responsible_person_id
+        self.created_by = created_by
+        self.created_from = created_from
+        self.created_to = created_to
+        self.sort = sort
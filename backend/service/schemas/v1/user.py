@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Dict
 
 from pydantic import BaseModel, EmailStr, PositiveInt
 
@@ -15,3 +16,9 @@ class User(BaseModel):
     class Config:
         use_enum_values = True
         from_attributes = True
+
+
+class UserTaskStats(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
@@ -1,13 +1,15 @@
 import unittest
 
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy_utils import create_database, database_exists, drop_database
 
 from db.models import BaseModel
 from service.core import settings
+from service.core.activity import activity_log
 from service.core.dependencies import get_session
+from service.core.stream import task_stream
 from service.main import app
 
 # Create test engine
@@ -32,9 +34,9 @@ class BaseTestCase(unittest.TestCase):
         if not database_exists(settings.PSQL_TEST_DB_URI):
             # Crete test database
             create_database(settings.PSQL_TEST_DB_URI)
-        # with test_engine.connect() as connection:
-        #     connection.execute(text("CREATE EXTENSION IF NOT EXISTS postgis;"))
-        #     connection.commit()
+        with test_engine.connect() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
+            connection.commit()
 
     @classmethod
     def tearDownClass(cls) -> None:
@@ -49,6 +51,10 @@ class TestCase(BaseTestCase):
         super().setUpClass()
         # Overwrite get_db() dependencies
         app.dependency_overrides[get_session] = get_test_db
+        # Activity log writes to the test database too
+        activity_log.session = TestSession
+        # Task stream listens to the test database
+        task_stream.engine = test_engine
         # Create client with overwrited get_db()
         cls.client = TestClient(app)
         # Add test session to body
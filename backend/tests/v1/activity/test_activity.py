@@ -0,0 +1,177 @@
+from unittest import mock
+
+import ujson
+from fastapi import status
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import OperationalError
+
+from db import constants, models
+from service.core import redis_cache, settings
+from service.core.activity import activity_log, make_event
+from tests import factories
+from tests.conftests import TestCase, TestSession, test_engine
+from tests.factories.utils import fake
+from tests.utils import get_headers
+
+
+class ActivityLogTestCase(TestCase):
+    def setUp(self) -> None:
+        redis_cache.client.delete(settings.ACTIVITY_STREAM)
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        self.developer = factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+
+    def count_activity(self) -> int:
+        count = TestSession.execute(
+            select(func.count()).select_from(models.Activity)
+        ).scalar()
+        TestSession.commit()
+        return count
+
+    def test_success_task_actions_logged(self) -> None:
+        manager_id, developer_id = self.manager.id, self.developer.id
+        headers = get_headers(manager_id)
+        input_data = {
+            "name": fake.name(),
+            "description": fake.name(),
+            "responsible_person_id": manager_id,
+            "status": constants.TaskStatus.TODO.value,
+            "priority": constants.Priority.LOW.value,
+        }
+        response = self.client.post("/api/v1/task/", json=input_data, headers=headers)
+        task_id = response.json()["id"]
+        url = f"/api/v1/task/{task_id}"
+        input_data["status"] = constants.TaskStatus.IN_PROGRESS.value
+        self.client.put(url, json=input_data, headers=headers)
+        self.client.post(f"{url}/user/{developer_id}/", headers=headers)
+        self.client.delete(f"{url}/user/{developer_id}/", headers=headers)
+        self.client.delete(url, headers=headers)
+        activity_log.flush()
+
+        response = self.client.get(f"/api/v1/activity/task/{task_id}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        items = response.json()["items"]
+        assert [item["action"] for item in items] == [
+            "TaskDeleted",
+            "TaskUnassigned",
+            "TaskAssigned",
+            "TaskUpdated",
+            "TaskCreated",
+        ]
+        assert {item["actor_id"] for item in items} == {manager_id}
+        assert items[1]["user_id"] == developer_id
+        assert items[3]["details"]["status"] == "InProgress"
+        # Written events are removed from the stream
+        assert redis_cache.client.xlen(settings.ACTIVITY_STREAM) == 0
+
+    def test_success_batch_written_with_one_statement(self) -> None:
+        events = [
+            make_event(
+                self.manager.id, constants.ActivityAction.TASK_CREATED, task_id=1
+            )
+            for _ in range(120)
+        ]
+        statements = []
+
+        def count_inserts(conn, cursor, statement, *args) -> None:
+            if statement.startswith("INSERT INTO activity"):
+                statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", count_inserts)
+        self.addCleanup(
+            event.remove, test_engine, "before_cursor_execute", count_inserts
+        )
+        assert activity_log.write([(None, item) for item in events])
+        assert len(statements) == 1
+        # Events written twice are stored once
+        assert activity_log.write([(None, item) for item in events[:10]])
+        assert self.count_activity() == 120
+
+    def test_success_task_written_while_redis_is_down(self) -> None:
+        input_data = {
+            "name": fake.name(),
+            "description": fake.name(),
+            "responsible_person_id": self.manager.id,
+            "status": constants.TaskStatus.TODO.value,
+            "priority": constants.Priority.LOW.value,
+        }
+        with mock.patch.object(
+            redis_cache.client, "pipeline", side_effect=RedisConnectionError
+        ) as pipeline:
+            response = self.client.post(
+                "/api/v1/task/", json=input_data, headers=get_headers(self.manager.id)
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+            # Request doesn't wait for Redis
+            pipeline.assert_not_called()
+            # Buffered event is written without Redis
+            activity_log.flush()
+        assert self.count_activity() == 1
+
+    def test_success_unwritten_events_kept_in_stream(self) -> None:
+        events = [
+            make_event(self.manager.id, constants.ActivityAction.USER_INVITED)
+            for _ in range(3)
+        ]
+        with mock.patch.object(
+            activity_log, "session", side_effect=OperationalError("", {}, None)
+        ):
+            activity_log.push(events)
+            activity_log.flush()
+        assert self.count_activity() == 0
+        assert redis_cache.client.xlen(settings.ACTIVITY_STREAM) == 3
+        # Database is up again
+        assert activity_log.recover(age=0) == 3
+        assert self.count_activity() == 3
+
+    def test_success_recover_events_from_stream(self) -> None:
+        # Events of a process which died before writing its buffer
+        events = [
+            make_event(self.manager.id, constants.ActivityAction.USER_INVITED)
+            for _ in range(3)
+        ]
+        for item in events:
+            redis_cache.client.xadd(
+                settings.ACTIVITY_STREAM, {"event": ujson.dumps(item)}
+            )
+        assert activity_log.recover() == 0
+        assert activity_log.recover(age=0) == 3
+        assert self.count_activity() == 3
+        assert redis_cache.client.xlen(settings.ACTIVITY_STREAM) == 0
+
+    def test_success_user_activity_pages(self) -> None:
+        developer_id = self.developer.id
+        activity_log.push(
+            make_event(developer_id, constants.ActivityAction.TASK_CREATED, task_id=i)
+            for i in range(1, 6)
+        )
+        activity_log.flush()
+        url = f"/api/v1/activity/user/{developer_id}"
+        headers = get_headers(developer_id)
+        task_ids, cursor = [], None
+        while True:
+            params = {"size": 2, **({"cursor": cursor} if cursor else {})}
+            page = self.client.get(url, params=params, headers=headers).json()
+            task_ids += [item["task_id"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        assert task_ids == [5, 4, 3, 2, 1]
+
+    def test_invalid_user_activity_of_other_user(self) -> None:
+        url = f"/api/v1/activity/user/{self.manager.id}"
+        response = self.client.get(url, headers=get_headers(self.developer.id))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        response = self.client.get(
+            f"/api/v1/activity/user/{self.developer.id}",
+            headers=get_headers(self.manager.id),
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_invalid_activity_cursor(self) -> None:
+        response = self.client.get(
+            "/api/v1/activity/task/1",
+            params={"cursor": "broken"},
+            headers=get_headers(self.manager.id),
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,143 @@
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import ujson
+from fastapi import status
+
+from db import constants, models
+from service.core import settings
+from tests import factories
+from tests.conftests import TestCase, TestSession
+from tests.utils import get_headers
+
+
+class AnalyticsSnapshotTestCase(TestCase):
+    def setUp(self) -> None:
+        self.url = "/api/v1/analytics/snapshot"
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        self.snapshot_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.snapshot_dir.cleanup)
+        self.addCleanup(setattr, settings, "ANALYTICS_DIR", settings.ANALYTICS_DIR)
+        settings.ANALYTICS_DIR = self.snapshot_dir.name
+
+    def write_snapshot(self) -> None:
+        snapshot_dir = Path(self.snapshot_dir.name)
+        tables = {}
+        for table in constants.SnapshotTable:
+            tables[table.value] = {
+                "rows": 1,
+                "arrow": f"{table.value}.arrow",
+                "parquet": f"{table.value}.parquet",
+            }
+            (snapshot_dir / f"{table.value}.arrow").write_bytes(b"ARROW1")
+            (snapshot_dir / f"{table.value}.parquet").write_bytes(b"PAR1")
+        manifest = {
+            "watermark": "2024-01-01T00:00:00",
+            "generated_at": "2024-01-01T00:05:00",
+            "tables": tables,
+        }
+        (snapshot_dir / "manifest.json").write_text(ujson.dumps(manifest))
+
+    def test_success_manager_snapshot_manifest(self) -> None:
+        self.write_snapshot()
+        response = self.client.get(self.url, headers=get_headers(self.manager.id))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["tables"]["task"]["rows"] == 1
+
+    def test_success_manager_snapshot_download(self) -> None:
+        self.write_snapshot()
+        response = self.client.get(
+            f"{self.url}/task_executors",
+            params={"format": constants.SnapshotFormat.ARROW.value},
+            headers=get_headers(self.manager.id),
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b"ARROW1"
+
+    def test_invalid_manager_snapshot_does_not_exist(self) -> None:
+        response = self.client.get(self.url, headers=get_headers(self.manager.id))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_manager_snapshot_download_unknown_table(self) -> None:
+        self.write_snapshot()
+        response = self.client.get(
+            f"{self.url}/password", headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_invalid_developer_snapshot_download(self) -> None:
+        developer = factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+        response = self.client.get(
+            f"{self.url}/task", headers=get_headers(developer.id)
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TaskFlowTestCase(TestCase):
+    def setUp(self) -> None:
+        self.url = "/api/v1/analytics/flow"
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        for day, status_, entered, exited in (
+            (date(2024, 1, 1), "Todo", 5, 0),
+            (date(2024, 1, 3), "Todo", 1, 3),
+            (date(2024, 1, 3), "InProgress", 3, 1),
+            (date(2024, 1, 3), "Done", 1, 0),
+        ):
+            TestSession.add(
+                models.TaskStatusDaily(
+                    day=day, status=status_, entered=entered, exited=exited
+                )
+            )
+        TestSession.add(
+            models.TaskCycleTimeDaily(
+                day=date(2024, 1, 3),
+                lead_time_histogram=[1],
+                cycle_time_histogram=[1],
+                lead_time_p50=48.0,
+                lead_time_p85=50.0,
+                lead_time_p95=51.0,
+                cycle_time_p50=2.5,
+            )
+        )
+        TestSession.commit()
+
+    def test_success_manager_task_flow(self) -> None:
+        response = self.client.get(
+            self.url,
+            params={"since": "2024-01-02", "until": "2024-01-04"},
+            headers=get_headers(self.manager.id),
+        )
+        assert response.status_code == status.HTTP_200_OK
+        days = response.json()["days"]
+        assert [day["day"] for day in days] == [
+            "2024-01-02",
+            "2024-01-03",
+            "2024-01-04",
+        ]
+        # Counts before the range are carried in, days without rollups too
+        assert days[0]["statuses"] == {"Todo": 5, "InProgress": 0, "Done": 0}
+        assert days[2]["statuses"] == {"Todo": 3, "InProgress": 2, "Done": 1}
+        assert [day["done"] for day in days] == [0, 1, 0]
+        assert days[1]["lead_time"] == {"p50": 48.0, "p85": 50.0, "p95": 51.0}
+        assert days[1]["cycle_time"] == {"p50": 2.5, "p85": None, "p95": None}
+        assert days[0]["lead_time"] == {"p50": None, "p85": None, "p95": None}
+
+    def test_success_manager_task_flow_default_range(self) -> None:
+        response = self.client.get(self.url, headers=get_headers(self.manager.id))
+        assert len(response.json()["days"]) == constants.DEFAULT_FLOW_DAYS
+
+    def test_invalid_manager_task_flow_range(self) -> None:
+        for params in (
+            {"since": "2024-01-05", "until": "2024-01-04"},
+            {"since": "2020-01-01", "until": "2024-01-04"},
+        ):
+            response = self.client.get(
+                self.url, params=params, headers=get_headers(self.manager.id)
+            )
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_invalid_developer_task_flow(self) -> None:
+        developer = factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+        response = self.client.get(self.url, headers=get_headers(developer.id))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
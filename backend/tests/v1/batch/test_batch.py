@@ -0,0 +1,170 @@
+import csv
+import io
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi import status
+from sqlalchemy import event
+
+from db import constants
+from service.core import settings
+from service.core.dependencies import get_session
+from service.main import app
+from tests import factories
+from tests.conftests import TestCase, get_test_db, test_engine
+from tests.utils import get_headers
+
+
+class BatchTestCase(TestCase):
+    def setUp(self) -> None:
+        self.manager_id = factories.UserFactory(status=constants.UserStatus.MANAGER).id
+        self.developer_id = factories.UserFactory(
+            status=constants.UserStatus.DEVELOPER
+        ).id
+        self.task_id = factories.TaskFactory(
+            responsible_person_id=self.manager_id, created_by=self.manager_id
+        ).id
+
+    def batch(self, user_id: int, items: list) -> list:
+        response = self.client.post(
+            "/api/v1/batch", json={"items": items}, headers=get_headers(user_id)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()["items"]
+
+    def test_success_dashboard_requests(self) -> None:
+        statements = []
+
+        def log_statement(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", log_statement)
+        self.addCleanup(
+            event.remove, test_engine, "before_cursor_execute", log_statement
+        )
+        items = self.batch(
+            self.manager_id,
+            [
+                {"url": "/user/me/"},
+                {"url": "/task/me/?size=10"},
+                {"url": "/user/developers/"},
+                {"url": f"/task/{self.task_id}/"},
+            ],
+        )
+        assert [item["status_code"] for item in items] == [200] * 4
+        assert items[0]["body"]["id"] == self.manager_id
+        assert [task["id"] for task in items[1]["body"]["items"]] == [self.task_id]
+        assert [user["id"] for user in items[2]["body"]["items"]] == [self.developer_id]
+        assert items[3]["body"]["id"] == self.task_id
+        assert "etag" in items[3]["headers"]
+        # User is loaded once for the whole batch
+        user_queries = [
+            statement for statement in statements if 'WHERE "user".id = ' in statement
+        ]
+        assert len(user_queries) == 1
+
+    def test_success_item_errors(self) -> None:
+        items = self.batch(
+            self.developer_id,
+            [
+                {"url": "/task/999999/"},
+                # Manager only
+                {"url": "/analytics/flow"},
+                {"url": "/batch"},
+                {"url": "/user/me/"},
+            ],
+        )
+        assert [item["status_code"] for item in items] == [404, 403, 405, 200]
+        assert items[0]["body"] == {"detail": "Task does not exist"}
+
+    def test_success_item_not_modified(self) -> None:
+        url = f"/task/{self.task_id}/"
+        etag = self.batch(self.manager_id, [{"url": url}])[0]["headers"]["etag"]
+        items = self.batch(
+            self.manager_id, [{"url": url, "headers": {"If-None-Match": etag}}]
+        )
+        assert items[0]["status_code"] == status.HTTP_304_NOT_MODIFIED
+        assert items[0]["body"] is None
+
+    def test_success_item_timeout(self) -> None:
+        timeout = settings.BATCH_ITEM_TIMEOUT
+        settings.BATCH_ITEM_TIMEOUT = 0.5
+        self.addCleanup(setattr, settings, "BATCH_ITEM_TIMEOUT", timeout)
+
+        def get_slow_db():
+            time.sleep(1)
+            return get_test_db()
+
+        app.dependency_overrides[get_session] = get_slow_db
+        self.addCleanup(app.dependency_overrides.__setitem__, get_session, get_test_db)
+        items = self.batch(self.manager_id, [{"url": f"/task/{self.task_id}/"}])
+        assert [item["status_code"] for item in items] == [504]
+
+    def test_success_item_not_batched(self) -> None:
+        snapshot_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(snapshot_dir.cleanup)
+        self.addCleanup(setattr, settings, "ANALYTICS_DIR", settings.ANALYTICS_DIR)
+        settings.ANALYTICS_DIR = snapshot_dir.name
+        (Path(snapshot_dir.name) / "task.parquet").write_bytes(b"PAR1\xff\x00PAR1")
+        items = self.batch(
+            self.manager_id,
+            [
+                # Stream never ends
+                {"url": "/task/stream"},
+                {"url": "/analytics/snapshot/task"},
+                {"url": "/task/export?format=csv&gzip=true"},
+                {"url": "/task/export?format=csv"},
+            ],
+        )
+        assert [item["status_code"] for item in items] == [406, 406, 406, 200]
+        assert items[0]["body"] == {
+            "detail": "Response can't be batched, request it directly"
+        }
+        # Text is passed as it is
+        rows = list(csv.DictReader(io.StringIO(items[3]["body"])))
+        assert [int(row["id"]) for row in rows] == [self.task_id]
+
+    def test_success_item_too_large(self) -> None:
+        size = settings.BATCH_MAX_BODY_SIZE
+        settings.BATCH_MAX_BODY_SIZE = 1000
+        self.addCleanup(setattr, settings, "BATCH_MAX_BODY_SIZE", size)
+        factories.TaskFactory.create_batch(
+            10, responsible_person_id=self.manager_id, created_by=self.manager_id
+        )
+        items = self.batch(
+            self.manager_id, [{"url": "/task/export"}, {"url": "/user/me/"}]
+        )
+        assert [item["status_code"] for item in items] == [502, 200]
+        assert items[0]["body"] == {"detail": "Response is too large to be batched"}
+
+    def test_success_blocking_items_run_concurrently(self) -> None:
+        async def get_slow_db():
+            # Blocks event loop like a DB call of async handler
+            time.sleep(0.5)
+            return get_test_db()
+
+        app.dependency_overrides[get_session] = get_slow_db
+        self.addCleanup(app.dependency_overrides.__setitem__, get_session, get_test_db)
+        started = time.monotonic()
+        # Batch itself waits once too
+        items = self.batch(self.manager_id, [{"url": f"/task/{self.task_id}/"}] * 4)
+        assert [item["status_code"] for item in items] == [200] * 4
+        assert time.monotonic() - started < 2
+
+    def test_invalid_batch(self) -> None:
+        headers = get_headers(self.manager_id)
+        for items in (
+            [],
+            [{"url": "/user/me/", "method": "POST"}],
+            [{"url": "user/me/"}],
+            [{"url": "/user/me/"}] * (constants.MAX_BATCH_ITEMS + 1),
+        ):
+            response = self.client.post(
+                "/api/v1/batch", json={"items": items}, headers=headers
+            )
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        response = self.client.post(
+            "/api/v1/batch", json={"items": [{"url": "/user/me/"}]}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
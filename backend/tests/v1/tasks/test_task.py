@@ -1,10 +1,36 @@
+import asyncio
+import csv
+import io
+import itertools
 import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
 
-from fastapi import status
+import ujson
+from fastapi import Request, status
+from sqlalchemy import event, func, insert, select, text, update
+from sqlalchemy.orm import Session
 
-from db import constants
+from db import constants, models
+from service.controllers.v1.task.task import (
+    assign_least_loaded_developer,
+    get_filtered_tasks_query,
+    get_my_tasks_condition,
+)
+from service.core import redis_cache, settings
+from service.core.cursor import encode_cursor
+from service.core.dependencies import get_session
+from service.core.notifications import get_participants_query
+from service.core.stream import RESYNC_EVENT, TaskStream, task_stream
+from service.main import app
+from service.schemas import v1 as schemas_v1
 from tests import factories
-from tests.conftests import TestCase
+from tests.conftests import TestCase, TestSession, get_test_db, test_engine
 from tests.factories.utils import fake
 from tests.utils import get_headers
 
@@ -210,3 +236,1635 @@ class TaskUnassignTestCase(TestCase):
         url = f"/api/v1/task/{self.task.id}/user/{random.randint(0,999)}/"
         response = self.client.delete(url, headers=get_headers(self.manager.id))
         assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TaskParticipantsTestCase(TestCase):
+    def setUp(self) -> None:
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        self.developer = factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+        self.task = factories.TaskFactory(
+            responsible_person_id=self.developer.id, created_by=self.manager.id
+        )
+
+    def test_success_participants_include_executors_once(self) -> None:
+        executor = factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+        factories.TaskExecutors(task_id=self.task.id, user_id=executor.id)
+        # Responsible person which is executor too must be notified once
+        factories.TaskExecutors(task_id=self.task.id, user_id=self.developer.id)
+        recipients = TestSession.execute(get_participants_query([self.task.id])).all()
+        emails = [recipient.email for recipient in recipients]
+        assert sorted(emails) == sorted([self.developer.email, executor.email])
+
+
+class TaskBulkCreateTestCase(TestCase):
+    def setUp(self) -> None:
+        self.url = "/api/v1/task/bulk"
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+
+    def get_item(self, responsible_person_id: int) -> dict:
+        return {
+            "name": fake.name(),
+            "description": fake.name(),
+            "responsible_person_id": responsible_person_id,
+            "status": constants.TaskStatus.TODO.value,
+            "priority": constants.Priority.LOW.value,
+        }
+
+    def test_success_manager_tasks_bulk_create(self) -> None:
+        input_data = {"items": [self.get_item(self.manager.id) for _ in range(3)]}
+        response = self.client.post(
+            self.url, json=input_data, headers=get_headers(self.manager.id)
+        )
+        resp_data = response.json()
+        assert response.status_code == status.HTTP_200_OK
+        assert resp_data["created"] == 3
+        assert [result["index"] for result in resp_data["results"]] == [0, 1, 2]
+        assert resp_data["results"][1]["task"]["name"] == input_data["items"][1]["name"]
+
+    def test_success_manager_tasks_bulk_create_partial_failure(self) -> None:
+        input_data = {
+            "items": [
+                self.get_item(self.manager.id),
+                self.get_item(self.manager.id + 1000),
+            ]
+        }
+        response = self.client.post(
+            self.url, json=input_data, headers=get_headers(self.manager.id)
+        )
+        resp_data = response.json()
+        assert response.status_code == status.HTTP_200_OK
+        assert resp_data["created"] == 1
+        assert resp_data["failed"] == 1
+        assert resp_data["results"][0]["status_code"] == status.HTTP_201_CREATED
+        assert resp_data["results"][1]["status_code"] == status.HTTP_404_NOT_FOUND
+
+    def test_success_manager_tasks_bulk_create_with_copy(self) -> None:
+        items = [
+            self.get_item(self.manager.id) for _ in range(constants.BULK_COPY_THRESHOLD)
+        ]
+        statements = []
+
+        def log_statement(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", log_statement)
+        self.addCleanup(
+            event.remove, test_engine, "before_cursor_execute", log_statement
+        )
+        response = self.client.post(
+            self.url, json={"items": items}, headers=get_headers(self.manager.id)
+        )
+        resp_data = response.json()
+        assert response.status_code == status.HTTP_200_OK
+        assert resp_data["created"] == constants.BULK_COPY_THRESHOLD
+        # Rows are loaded with COPY, not with INSERT
+        assert any("nextval" in statement for statement in statements)
+        assert not any(
+            statement.startswith("INSERT INTO task ") for statement in statements
+        )
+        results = resp_data["results"]
+        assert [result["index"] for result in results] == list(range(len(items)))
+        # Ids reserved from the sequence are returned in order of items
+        task_ids = [result["task"]["id"] for result in results]
+        assert task_ids == sorted(task_ids)
+        assert len(set(task_ids)) == len(items)
+        assert [result["task"]["name"] for result in results] == [
+            item["name"] for item in items
+        ]
+        names_query = select(models.Task.id, models.Task.name).where(
+            models.Task.id.in_(task_ids)
+        )
+        names = dict(TestSession.execute(names_query).all())
+        TestSession.commit()
+        assert [names[task_id] for task_id in task_ids] == [
+            item["name"] for item in items
+        ]
+
+    def test_invalid_manager_tasks_bulk_create_too_many_items(self) -> None:
+        item = self.get_item(self.manager.id)
+        input_data = {"items": [item] * (constants.MAX_BULK_ITEMS + 1)}
+        response = self.client.post(
+            self.url, json=input_data, headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_invalid_manager_tasks_bulk_create_creator_developer(self) -> None:
+        creator = factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+        input_data = {"items": [self.get_item(self.manager.id)]}
+        response = self.client.post(
+            self.url, json=input_data, headers=get_headers(creator.id)
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TaskBulkAssignTestCase(TestCase):
+    def setUp(self) -> None:
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        self.developers = [
+            factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+            for _ in range(3)
+        ]
+        self.task = factories.TaskFactory(
+            responsible_person_id=self.manager.id, created_by=self.manager.id
+        )
+        self.url = f"/api/v1/task/{self.task.id}/users"
+
+    def test_success_manager_task_assign_developers(self) -> None:
+        # Already assigned and not existing users are skipped
+        factories.TaskExecutors(task_id=self.task.id, user_id=self.developers[0].id)
+        expected_ids = sorted(developer.id for developer in self.developers[1:])
+        user_ids = [developer.id for developer in self.developers] + [999999]
+        response = self.client.post(
+            self.url, json={"user_ids": user_ids}, headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        changed = sorted(user["id"] for user in response.json()["changed"])
+        assert changed == expected_ids
+
+    def test_success_manager_task_unassign_developers(self) -> None:
+        for developer in self.developers[:2]:
+            factories.TaskExecutors(task_id=self.task.id, user_id=developer.id)
+        expected_ids = sorted(developer.id for developer in self.developers[:2])
+        user_ids = [developer.id for developer in self.developers]
+        response = self.client.request(
+            "DELETE",
+            self.url,
+            json={"user_ids": user_ids},
+            headers=get_headers(self.manager.id),
+        )
+        assert response.status_code == status.HTTP_200_OK
+        changed = sorted(user["id"] for user in response.json()["changed"])
+        assert changed == expected_ids
+
+    def test_invalid_manager_task_assign_developers_task_does_not_exist(self) -> None:
+        url = f"/api/v1/task/{random.randint(0, 999)}/users"
+        response = self.client.post(
+            url,
+            json={"user_ids": [self.developers[0].id]},
+            headers=get_headers(self.manager.id),
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_manager_task_assign_developers_by_developer(self) -> None:
+        response = self.client.post(
+            self.url,
+            json={"user_ids": [self.developers[0].id]},
+            headers=get_headers(self.developers[0].id),
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TaskBulkUpdateTestCase(TestCase):
+    def setUp(self) -> None:
+        self.url = "/api/v1/task/bulk"
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        self.tasks = [
+            factories.TaskFactory(
+                responsible_person_id=self.manager.id,
+                created_by=self.manager.id,
+                status=constants.TaskStatus.IN_PROGRESS.value,
+            )
+            for _ in range(3)
+        ]
+
+    def test_success_manager_tasks_bulk_update_by_ids(self) -> None:
+        ids = sorted(task.id for task in self.tasks[:2])
+        input_data = {"ids": ids, "status": constants.TaskStatus.DONE.value}
+        response = self.client.patch(
+            self.url, json=input_data, headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["ids"] == ids
+        assert response.json()["limit_reached"] is False
+
+    def test_success_manager_tasks_bulk_update_by_filter(self) -> None:
+        expected_ids = sorted(task.id for task in self.tasks)
+        input_data = {
+            "filter": {
+                "status": constants.TaskStatus.IN_PROGRESS.value,
+                "created_by": self.manager.id,
+            },
+            "status": constants.TaskStatus.DONE.value,
+            "priority": constants.Priority.HIGH.value,
+        }
+        response = self.client.patch(
+            self.url, json=input_data, headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["ids"] == expected_ids
+        # Updated tasks don't match the filter anymore
+        response = self.client.patch(
+            self.url, json=input_data, headers=get_headers(self.manager.id)
+        )
+        assert response.json()["updated"] == 0
+
+    def test_invalid_manager_tasks_bulk_update_ids_and_filter(self) -> None:
+        input_data = {
+            "ids": [self.tasks[0].id],
+            "filter": {"created_by": self.manager.id},
+            "status": constants.TaskStatus.DONE.value,
+        }
+        response = self.client.patch(
+            self.url, json=input_data, headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_invalid_manager_tasks_bulk_update_without_values(self) -> None:
+        input_data = {"ids": [self.tasks[0].id]}
+        response = self.client.patch(
+            self.url, json=input_data, headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_invalid_manager_tasks_bulk_update_responsible_does_not_exist(
+        self,
+    ) -> None:
+        input_data = {"ids": [self.tasks[0].id], "responsible_person_id": 999999}
+        response = self.client.patch(
+            self.url, json=input_data, headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TaskExportTestCase(TestCase):
+    def setUp(self) -> None:
+        self.url = "/api/v1/task/export"
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        self.task_ids = [
+            factories.TaskFactory(
+                responsible_person_id=self.manager.id, created_by=self.manager.id
+            ).id
+            for _ in range(3)
+        ]
+
+    def test_success_manager_tasks_export_ndjson(self) -> None:
+        response = self.client.get(self.url, headers=get_headers(self.manager.id))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [ujson.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == self.task_ids
+
+    def test_success_manager_tasks_export_csv_gzip(self) -> None:
+        response = self.client.get(
+            self.url,
+            params={"format": "csv", "gzip": True},
+            headers=get_headers(self.manager.id),
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-encoding"] == "gzip"
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [int(row["id"]) for row in rows] == self.task_ids
+
+    def test_invalid_manager_tasks_export_by_developer(self) -> None:
+        developer = factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+        response = self.client.get(self.url, headers=get_headers(developer.id))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TaskImportTestCase(TestCase):
+    def setUp(self) -> None:
+        self.url = "/api/v1/task/import"
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        self.import_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.import_dir.cleanup)
+        self.default_import_dir = settings.IMPORT_DIR
+        settings.IMPORT_DIR = self.import_dir.name
+        self.addCleanup(setattr, settings, "IMPORT_DIR", self.default_import_dir)
+        self.content = (
+            "name,description,responsible_email,status,priority\n"
+            f"{fake.word()},{fake.word()},{self.manager.email},Todo,High\n"
+        )
+
+    def test_success_manager_tasks_import(self) -> None:
+        response = self.client.post(
+            self.url,
+            files={"file": ("tasks.csv", self.content, "text/csv")},
+            headers=get_headers(self.manager.id),
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        import_id = response.json()["import_id"]
+        spooled = Path(self.import_dir.name) / f"{import_id}.csv"
+        assert spooled.read_text() == self.content
+
+        response = self.client.get(
+            f"{self.url}/{import_id}", headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == constants.ImportStatus.QUEUED.value
+
+    def test_invalid_manager_tasks_import_status_does_not_exist(self) -> None:
+        response = self.client.get(
+            f"{self.url}/{fake.uuid4()}", headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_manager_tasks_import_by_developer(self) -> None:
+        developer = factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+        response = self.client.post(
+            self.url,
+            files={"file": ("tasks.csv", self.content, "text/csv")},
+            headers=get_headers(developer.id),
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TaskSearchTestCase(TestCase):
+    def setUp(self) -> None:
+        self.url = "/api/v1/task/search"
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        self.developer = factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+        self.name_match = factories.TaskFactory(
+            name="Deploy billing service",
+            description="Release notes",
+            responsible_person_id=self.manager.id,
+            created_by=self.manager.id,
+        )
+        self.description_match = factories.TaskFactory(
+            name="Release",
+            description="Billing deploys are blocked",
+            responsible_person_id=self.developer.id,
+            created_by=self.manager.id,
+        )
+        factories.TaskFactory(
+            name="Fix login form",
+            description="Password field",
+            responsible_person_id=self.manager.id,
+            created_by=self.manager.id,
+        )
+
+    def test_success_search_name_ranked_first(self) -> None:
+        response = self.client.get(
+            self.url, params={"q": "billing"}, headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        ids = [item["id"] for item in response.json()["items"]]
+        assert ids == [self.name_match.id, self.description_match.id]
+
+    def test_success_search_web_syntax(self) -> None:
+        response = self.client.get(
+            self.url,
+            params={"q": "deploy -blocked"},
+            headers=get_headers(self.manager.id),
+        )
+        ids = [item["id"] for item in response.json()["items"]]
+        assert ids == [self.name_match.id]
+
+    def test_success_search_mine(self) -> None:
+        response = self.client.get(
+            self.url,
+            params={"q": "billing", "mine": True},
+            headers=get_headers(self.developer.id),
+        )
+        ids = [item["id"] for item in response.json()["items"]]
+        assert ids == [self.description_match.id]
+
+    def test_success_search_cursor_pagination(self) -> None:
+        params = {"q": "billing", "size": 1}
+        headers = get_headers(self.manager.id)
+        first_page = self.client.get(self.url, params=params, headers=headers).json()
+        assert first_page["next_cursor"]
+        params["cursor"] = first_page["next_cursor"]
+        second_page = self.client.get(self.url, params=params, headers=headers).json()
+        assert second_page["next_cursor"] is None
+        ids = [item["id"] for item in first_page["items"] + second_page["items"]]
+        assert ids == [self.name_match.id, self.description_match.id]
+
+    def test_invalid_search_cursor(self) -> None:
+        response = self.client.get(
+            self.url,
+            params={"q": "billing", "cursor": "broken"},
+            headers=get_headers(self.manager.id),
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TaskListingFilterTestCase(TestCase):
+    def setUp(self) -> None:
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        self.developer = factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+        now = datetime.utcnow()
+        self.tasks = [
+            factories.TaskFactory(
+                responsible_person_id=self.developer.id,
+                created_by=self.manager.id,
+                status=status_.value,
+                priority=priority.value,
+                created_at=now - timedelta(days=days),
+            )
+            for status_, priority, days in (
+                (constants.TaskStatus.IN_PROGRESS, constants.Priority.HIGH, 3),
+                (constants.TaskStatus.IN_PROGRESS, constants.Priority.HIGH, 1),
+                (constants.TaskStatus.IN_PROGRESS, constants.Priority.LOW, 2),
+                (constants.TaskStatus.TODO, constants.Priority.HIGH, 0),
+            )
+        ]
+        self.task_ids = [task.id for task in self.tasks]
+        factories.TaskFactory(
+            responsible_person_id=self.manager.id,
+            created_by=self.manager.id,
+            status=constants.TaskStatus.IN_PROGRESS.value,
+            priority=constants.Priority.HIGH.value,
+        )
+
+    def test_success_my_tasks_filter_newest_first(self) -> None:
+        params = {
+            "status": constants.TaskStatus.IN_PROGRESS.value,
+            "priority": constants.Priority.HIGH.value,
+            "sort": constants.TaskSort.CREATED_AT_DESC.value,
+        }
+        response = self.client.get(
+            "/api/v1/task/me/", params=params, headers=get_headers(self.developer.id)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        ids = [item["id"] for item in response.json()["items"]]
+        assert ids == [self.task_ids[1], self.task_ids[0]]
+
+    def test_success_tasks_created_at_range(self) -> None:
+        now = datetime.utcnow()
+        params = {
+            "responsible_person_id": self.developer.id,
+            "created_from": (now - timedelta(days=2, hours=1)).isoformat(),
+            "created_to": (now - timedelta(hours=1)).isoformat(),
+            "sort": constants.TaskSort.CREATED_AT.value,
+        }
+        response = self.client.get(
+            "/api/v1/task/", params=params, headers=get_headers(self.manager.id)
+        )
+        ids = [item["id"] for item in response.json()["items"]]
+        assert ids == [self.task_ids[2], self.task_ids[1]]
+
+    def test_invalid_tasks_unknown_sort(self) -> None:
+        response = self.client.get(
+            "/api/v1/task/",
+            params={"sort": "password"},
+            headers=get_headers(self.manager.id),
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_invalid_tasks_created_at_range(self) -> None:
+        now = datetime.utcnow()
+        params = {
+            "created_from": now.isoformat(),
+            "created_to": (now - timedelta(days=1)).isoformat(),
+        }
+        response = self.client.get(
+            "/api/v1/task/", params=params, headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TaskListingIndexTestCase(TestCase):
+    """Filters and sort keys of task listings must be served by their indexes"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user_ids = [factories.UserFactory().id for _ in range(50)]
+        # Filtered values are rare, so reading other indexes in sort order and
+        # skipping rows is much more expensive than the matching index
+        TestSession.execute(
+            text(
+                """
+                INSERT INTO task (name, description, responsible_person_id,
+                    created_by, status, priority, created_at)
+                SELECT md5(i::text), '', (:user_ids)[1 + i % 50],
+                    (:user_ids)[1 + i / 7 % 50],
+                    CASE WHEN i % 50 = 0 THEN 'InProgress' ELSE 'Todo' END,
+                    CASE WHEN i % 40 = 0 THEN 'High' ELSE 'Low' END,
+                    timestamp '2024-01-01' + i * interval '10 minutes'
+                FROM generate_series(1, 30000) i
+                """
+            ),
+            {"user_ids": cls.user_ids},
+        )
+        TestSession.commit()
+        with test_engine.connect() as connection:
+            connection.exec_driver_sql("ANALYZE task")
+            connection.commit()
+
+    def get_filters(self) -> list:
+        """Return (filter, columns of indexes which can serve it) pairs"""
+        user_id = self.user_ids[0]
+        return [
+            ({}, [None]),
+            ({"status": constants.TaskStatus.IN_PROGRESS}, ["status"]),
+            ({"priority": constants.Priority.HIGH}, ["priority"]),
+            ({"responsible_person_id": user_id}, ["responsible_person_id"]),
+            ({"created_by": user_id}, ["created_by"]),
+            (
+                {
+                    "created_from": datetime(2024, 1, 1),
+                    "created_to": datetime(2024, 1, 2),
+                },
+                [None],
+            ),
+            (
+                {
+                    "status": constants.TaskStatus.IN_PROGRESS,
+                    "priority": constants.Priority.HIGH,
+                },
+                ["status", "priority"],
+            ),
+        ]
+
+    @staticmethod
+    def get_index_names(
+        task_filter: dict, columns: list, sort: constants.TaskSort
+    ) -> set:
+        """Return names of indexes which serve filter and sort key"""
+        by_name = sort in (constants.TaskSort.NAME, constants.TaskSort.NAME_DESC)
+        if len(columns) > 1:
+            # Few rows match all filters: their indexes are combined with
+            # BitmapAnd and the rows are sorted
+            return {
+                f"ix_task_{column}_{key}"
+                for column in columns
+                for key in ("name", "created_at")
+            }
+        column = columns[0]
+        if column is None:
+            index_names = {"ix_task_name_id" if by_name else "ix_task_created_at_id"}
+            if task_filter:
+                # A day of tasks is read by time and sorted
+                index_names.add("ix_task_created_at_id")
+            return index_names
+        return {f"ix_task_{column}_name" if by_name else f"ix_task_{column}_created_at"}
+
+    @staticmethod
+    def uses_index(plan: str, index_names: set) -> bool:
+        return any(f" {name} " in plan for name in index_names)
+
+    def get_plan(self, task_filter: dict, sort: constants.TaskSort, mine: bool):
+        params = {
+            "status": None,
+            "priority": None,
+            "responsible_person_id": None,
+            "created_by": None,
+            "created_from": None,
+            "created_to": None,
+            "sort": sort,
+        }
+        query = get_filtered_tasks_query(
+            schemas_v1.TaskFilter(**{**params, **task_filter})
+        )
+        if mine:
+            query = query.where(get_my_tasks_condition(self.user_ids[1]))
+        compiled = query.limit(50).compile(test_engine)
+        with test_engine.connect() as connection:
+            plan = connection.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params)
+            return "\n".join(plan.scalars())
+
+    def test_success_task_listings_use_indexes(self) -> None:
+        for (task_filter, columns), sort in itertools.product(
+            self.get_filters(), constants.TaskSort
+        ):
+            with self.subTest(filter=task_filter, sort=sort):
+                plan = self.get_plan(task_filter, sort, False)
+                index_names = self.get_index_names(task_filter, columns, sort)
+                assert self.uses_index(plan, index_names), (index_names, plan)
+
+    def test_success_my_task_listings_use_indexes(self) -> None:
+        # Executors are a row filter of my tasks, which are read in sort order
+        # by the index of the other filter or of the sort key
+        for (task_filter, columns), sort in itertools.product(
+            self.get_filters(), constants.TaskSort
+        ):
+            with self.subTest(filter=task_filter, sort=sort):
+                plan = self.get_plan(task_filter, sort, True)
+                index_names = self.get_index_names(
+                    task_filter, columns, sort
+                ) | self.get_index_names({}, [None], sort)
+                assert "Seq Scan on task " not in plan, plan
+                assert self.uses_index(plan, index_names), (index_names, plan)
+
+
+class TaskBoardTestCase(TestCase):
+    def setUp(self) -> None:
+        self.url = "/api/v1/task/board"
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        self.developer = factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+        now = datetime.utcnow()
+        self.tasks = {}
+        for days, status_ in enumerate(
+            (
+                constants.TaskStatus.TODO,
+                constants.TaskStatus.IN_PROGRESS,
+                constants.TaskStatus.TODO,
+                constants.TaskStatus.TODO,
+                constants.TaskStatus.IN_PROGRESS,
+            )
+        ):
+            task = factories.TaskFactory(
+                responsible_person_id=self.developer.id,
+                created_by=self.manager.id,
+                status=status_.value,
+                created_at=now - timedelta(days=days),
+            )
+            self.tasks.setdefault(status_.value, []).append(task.id)
+        self.manager_task_id = factories.TaskFactory(
+            responsible_person_id=self.manager.id,
+            created_by=self.manager.id,
+            status=constants.TaskStatus.DONE.value,
+        ).id
+
+    def test_success_board_one_query(self) -> None:
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args) -> None:
+            if "FROM task" in statement:
+                statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", before_cursor_execute)
+        self.addCleanup(
+            event.remove, test_engine, "before_cursor_execute", before_cursor_execute
+        )
+        response = self.client.get(
+            self.url, params={"size": 2}, headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(statements) == 1
+        columns = response.json()["columns"]
+        assert [column["status"] for column in columns] == [
+            item.value for item in constants.TaskStatus
+        ]
+        todo, in_progress, done = columns
+        assert todo["total"] == 3
+        assert [item["id"] for item in todo["items"]] == self.tasks["Todo"][:2]
+        assert todo["next_cursor"]
+        assert in_progress["total"] == 2
+        assert [item["id"] for item in in_progress["items"]] == (
+            self.tasks["InProgress"]
+        )
+        assert in_progress["next_cursor"] is None
+        assert done["total"] == 1
+        assert [item["id"] for item in done["items"]] == [self.manager_task_id]
+
+    def test_success_board_load_more(self) -> None:
+        headers = get_headers(self.manager.id)
+        response = self.client.get(self.url, params={"size": 1}, headers=headers)
+        cursor = response.json()["columns"][0]["next_cursor"]
+        ids = [response.json()["columns"][0]["items"][0]["id"]]
+        while cursor:
+            response = self.client.get(
+                self.url, params={"size": 1, "cursor": cursor}, headers=headers
+            )
+            columns = response.json()["columns"]
+            assert len(columns) == 1
+            assert columns[0]["status"] == constants.TaskStatus.TODO.value
+            assert columns[0]["total"] == 3
+            ids += [item["id"] for item in columns[0]["items"]]
+            cursor = columns[0]["next_cursor"]
+        assert ids == self.tasks["Todo"]
+
+    def test_success_board_mine(self) -> None:
+        response = self.client.get(
+            self.url, params={"mine": True}, headers=get_headers(self.developer.id)
+        )
+        totals = [column["total"] for column in response.json()["columns"]]
+        assert totals == [3, 2, 0]
+
+    def test_invalid_board_cursor(self) -> None:
+        for values in (["Todo", "yesterday", 1], ["Unknown", "2024-01-01", 1]):
+            cursor = encode_cursor(values)
+            response = self.client.get(
+                self.url,
+                params={"cursor": cursor},
+                headers=get_headers(self.manager.id),
+            )
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TaskAutoAssignTestCase(TestCase):
+    def setUp(self) -> None:
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        self.developers = [
+            factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+            for _ in range(3)
+        ]
+        # Invited Developer hasn't signed up and isn't assigned
+        factories.UserFactory(status=constants.UserStatus.DEVELOPER, password=None)
+        self.task = factories.TaskFactory(
+            responsible_person_id=self.manager.id, created_by=self.manager.id
+        )
+
+    def add_tasks(self, developer, count: int, task_status) -> None:
+        for _ in range(count):
+            task = factories.TaskFactory(
+                responsible_person_id=self.manager.id,
+                created_by=self.manager.id,
+                status=task_status.value,
+            )
+            factories.TaskExecutors(task_id=task.id, user_id=developer.id)
+
+    def test_success_auto_assign_least_loaded_developer(self) -> None:
+        self.add_tasks(self.developers[0], 1, constants.TaskStatus.IN_PROGRESS)
+        self.add_tasks(self.developers[1], 1, constants.TaskStatus.TODO)
+        # Done tasks aren't load
+        self.add_tasks(self.developers[2], 3, constants.TaskStatus.DONE)
+        url = f"/api/v1/task/{self.task.id}/auto-assign"
+        response = self.client.post(url, headers=get_headers(self.manager.id))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["assigned_user"]["id"] == self.developers[2].id
+        assert response.json()["task"]["id"] == self.task.id
+        # Assigned Developers are skipped, ties go to the lowest id
+        response = self.client.post(url, headers=get_headers(self.manager.id))
+        assert response.json()["assigned_user"]["id"] == self.developers[0].id
+
+    def test_success_create_task_auto_assign(self) -> None:
+        self.add_tasks(self.developers[0], 1, constants.TaskStatus.TODO)
+        input_data = {
+            "name": fake.name(),
+            "description": fake.name(),
+            "responsible_person_id": self.developers[1].id,
+            "status": constants.TaskStatus.TODO.value,
+            "priority": constants.Priority.LOW.value,
+        }
+        response = self.client.post(
+            "/api/v1/task/",
+            json=input_data,
+            params={"auto_assign": True},
+            headers=get_headers(self.manager.id),
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        executors_query = select(models.TaskExecutors.user_id).where(
+            models.TaskExecutors.task_id == response.json()["id"]
+        )
+        # Responsible person isn't assigned as executor
+        assert TestSession.execute(executors_query).scalars().all() == [
+            self.developers[2].id
+        ]
+        TestSession.commit()
+
+    def test_success_concurrent_auto_assign_spread_evenly(self) -> None:
+        tasks = factories.TaskFactory.create_batch(
+            6, responsible_person_id=self.manager.id, created_by=self.manager.id
+        )
+
+        def auto_assign(task_id: int) -> None:
+            with Session(test_engine) as db:
+                assign_least_loaded_developer(db, task_id)
+                db.commit()
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(auto_assign, [task.id for task in tasks]))
+        load_query = (
+            select(func.count())
+            .select_from(models.TaskExecutors)
+            .group_by(models.TaskExecutors.user_id)
+        )
+        assert TestSession.execute(load_query).scalars().all() == [2, 2, 2]
+        TestSession.commit()
+
+    def test_success_concurrent_create_task_auto_assign(self) -> None:
+        # Counters of responsible persons are separate rows, so creates don't
+        # wait for each other to update them
+        manager_ids = [
+            factories.UserFactory(status=constants.UserStatus.MANAGER).id
+            for _ in range(6)
+        ]
+
+        def create_task(manager_id: int) -> int:
+            input_data = {
+                "name": fake.name(),
+                "description": fake.name(),
+                "responsible_person_id": manager_id,
+                "status": constants.TaskStatus.TODO.value,
+                "priority": constants.Priority.LOW.value,
+            }
+            return self.client.post(
+                "/api/v1/task/",
+                json=input_data,
+                params={"auto_assign": True},
+                headers=get_headers(self.manager.id),
+            ).status_code
+
+        waiting_query = text(
+            "SELECT count(*) FROM pg_stat_activity "
+            "WHERE wait_event_type = 'Lock' AND datname = current_database()"
+        )
+        with test_engine.connect() as connection:
+            # Creates line up behind the lock, then race for the Developers
+            connection.execute(
+                text("LOCK TABLE user_task_stats IN ACCESS EXCLUSIVE MODE")
+            )
+            with ThreadPoolExecutor(max_workers=6) as executor:
+                status_codes = executor.map(create_task, manager_ids)
+                deadline = time.monotonic() + 5
+                while time.monotonic() < deadline:
+                    with test_engine.connect() as monitor:
+                        if monitor.execute(waiting_query).scalar() >= 6:
+                            break
+                    time.sleep(0.05)
+                connection.rollback()
+                assert list(status_codes) == [status.HTTP_201_CREATED] * 6
+        # Every create sees the previous assignments
+        load_query = (
+            select(func.count())
+            .select_from(models.TaskExecutors)
+            .group_by(models.TaskExecutors.user_id)
+        )
+        assert TestSession.execute(load_query).scalars().all() == [2, 2, 2]
+        TestSession.commit()
+
+    def test_invalid_auto_assign_no_developer(self) -> None:
+        for developer in self.developers:
+            factories.TaskExecutors(task_id=self.task.id, user_id=developer.id)
+        url = f"/api/v1/task/{self.task.id}/auto-assign"
+        response = self.client.post(url, headers=get_headers(self.manager.id))
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    def test_invalid_auto_assign_task_does_not_exist(self) -> None:
+        url = f"/api/v1/task/{random.randint(1000, 9999)}/auto-assign"
+        response = self.client.post(url, headers=get_headers(self.manager.id))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_auto_assign_by_developer(self) -> None:
+        url = f"/api/v1/task/{self.task.id}/auto-assign"
+        response = self.client.post(url, headers=get_headers(self.developers[0].id))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TaskStatusHistoryTestCase(TestCase):
+    def setUp(self) -> None:
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        self.input_data = {
+            "name": fake.name(),
+            "description": fake.name(),
+            "responsible_person_id": self.manager.id,
+            "status": constants.TaskStatus.TODO.value,
+            "priority": constants.Priority.LOW.value,
+        }
+
+    def get_history(self, task_id: int) -> list:
+        history_query = (
+            select(
+                models.TaskStatusHistory.from_status,
+                models.TaskStatusHistory.to_status,
+            )
+            .where(models.TaskStatusHistory.task_id == task_id)
+            .order_by(models.TaskStatusHistory.id)
+        )
+        history = TestSession.execute(history_query).all()
+        TestSession.commit()
+        return [tuple(transition) for transition in history]
+
+    def test_success_history_of_task_transitions(self) -> None:
+        headers = get_headers(self.manager.id)
+        response = self.client.post(
+            "/api/v1/task/", json=self.input_data, headers=headers
+        )
+        task_id = response.json()["id"]
+        url = f"/api/v1/task/{task_id}"
+        # Update without status change isn't a transition
+        self.input_data["name"] = fake.name()
+        self.client.put(url, json=self.input_data, headers=headers)
+        self.input_data["status"] = constants.TaskStatus.IN_PROGRESS.value
+        self.client.put(url, json=self.input_data, headers=headers)
+        self.client.patch(
+            "/api/v1/task/bulk",
+            json={"ids": [task_id], "status": constants.TaskStatus.DONE.value},
+            headers=headers,
+        )
+        self.client.delete(url, headers=headers)
+        assert self.get_history(task_id) == [
+            (None, "Todo"),
+            ("Todo", "InProgress"),
+            ("InProgress", "Done"),
+            ("Done", None),
+        ]
+
+    def test_success_history_of_bulk_created_tasks(self) -> None:
+        items = [self.input_data] * 3
+        response = self.client.post(
+            "/api/v1/task/bulk",
+            json={"items": items},
+            headers=get_headers(self.manager.id),
+        )
+        for result in response.json()["results"]:
+            assert self.get_history(result["task"]["id"]) == [(None, "Todo")]
+
+
+class TaskStreamTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        # Stop listening before the test database is dropped
+        cls.addClassCleanup(task_stream.close)
+
+    def setUp(self) -> None:
+        self.manager_id = factories.UserFactory(status=constants.UserStatus.MANAGER).id
+        self.developer_id = factories.UserFactory(
+            status=constants.UserStatus.DEVELOPER
+        ).id
+        self.other_id = factories.UserFactory(status=constants.UserStatus.DEVELOPER).id
+
+    def collect_events(self, user_ids: list, change) -> dict:
+        """Subscribe users, make change and return events which each one got"""
+
+        async def collect() -> dict:
+            queues = {user_id: task_stream.subscribe(user_id) for user_id in user_ids}
+            try:
+                await asyncio.to_thread(task_stream.connected.wait, 5)
+                await asyncio.to_thread(change)
+                events = {user_id: [] for user_id in user_ids}
+                for user_id, queue in queues.items():
+                    while True:
+                        try:
+                            event = await asyncio.wait_for(queue.get(), 0.5)
+                        except asyncio.TimeoutError:
+                            break
+                        if event != RESYNC_EVENT:
+                            events[user_id].append(event["op"])
+                return events
+            finally:
+                for user_id, queue in queues.items():
+                    task_stream.unsubscribe(user_id, queue)
+
+        return asyncio.run(collect())
+
+    def test_success_changes_sent_to_participants(self) -> None:
+        headers = get_headers(self.manager_id)
+        input_data = {
+            "name": fake.name(),
+            "description": fake.name(),
+            "responsible_person_id": self.manager_id,
+            "status": constants.TaskStatus.TODO.value,
+            "priority": constants.Priority.LOW.value,
+        }
+
+        def change() -> None:
+            response = self.client.post(
+                "/api/v1/task/", json=input_data, headers=headers
+            )
+            url = f"/api/v1/task/{response.json()['id']}"
+            self.client.post(f"{url}/user/{self.developer_id}/", headers=headers)
+            self.client.put(url, json={**input_data, "name": "New"}, headers=headers)
+            self.client.delete(f"{url}/user/{self.developer_id}/", headers=headers)
+            self.client.delete(url, headers=headers)
+
+        events = self.collect_events(
+            [self.manager_id, self.developer_id, self.other_id], change
+        )
+        assert events[self.manager_id] == [
+            "created",
+            "assigned",
+            "updated",
+            "unassigned",
+            "deleted",
+        ]
+        assert events[self.developer_id] == ["assigned", "updated", "unassigned"]
+        assert events[self.other_id] == []
+
+    def test_success_deleted_task_sent_to_executors(self) -> None:
+        task = factories.TaskFactory(
+            responsible_person_id=self.manager_id, created_by=self.manager_id
+        )
+        factories.TaskExecutors(task_id=task.id, user_id=self.developer_id)
+        url = f"/api/v1/task/{task.id}"
+
+        def change() -> None:
+            self.client.delete(url, headers=get_headers(self.manager_id))
+
+        events = self.collect_events([self.developer_id], change)
+        # Executors removed by cascade get only the deleted event
+        assert events[self.developer_id] == ["deleted"]
+
+    def get_notifications(self, change) -> list:
+        """Make change and return notifications sent when it commits"""
+        connection = test_engine.raw_connection()
+        try:
+            dbapi_connection = connection.driver_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {constants.TASK_CHANGES_CHANNEL}")
+            change()
+            received = -1
+            while received != len(dbapi_connection.notifies):
+                received = len(dbapi_connection.notifies)
+                time.sleep(0.2)
+                dbapi_connection.poll()
+            return [ujson.loads(notify.payload) for notify in dbapi_connection.notifies]
+        finally:
+            connection.invalidate()
+
+    def test_success_bulk_changes_coalesced(self) -> None:
+        count = constants.TASK_CHANGES_MAX_TASK_IDS + 100
+        rows = [
+            {
+                "name": fake.name(),
+                "description": "",
+                "responsible_person_id": self.manager_id,
+                "created_by": self.manager_id,
+                "status": constants.TaskStatus.TODO.value,
+                "priority": constants.Priority.LOW.value,
+            }
+            for _ in range(count)
+        ]
+
+        def change() -> None:
+            TestSession.execute(insert(models.Task), rows)
+            TestSession.commit()
+
+        notifications = self.get_notifications(change)
+        # One statement, notifications are split by the task ids limit
+        assert [len(item["task_ids"]) for item in notifications] == [
+            constants.TASK_CHANGES_MAX_TASK_IDS,
+            100,
+        ]
+        assert {item["user_id"] for item in notifications} == {self.manager_id}
+        assert {item["op"] for item in notifications} == {"created"}
+
+    def test_success_task_with_many_participants_updated(self) -> None:
+        task = factories.TaskFactory(
+            responsible_person_id=self.manager_id, created_by=self.manager_id
+        )
+        user_ids = TestSession.execute(
+            insert(models.User).returning(models.User.id),
+            [
+                {
+                    "email": f"{index}{fake.email()}",
+                    "name": fake.name(),
+                    "status": constants.UserStatus.DEVELOPER,
+                }
+                for index in range(1000)
+            ],
+        ).scalars()
+        TestSession.execute(
+            insert(models.TaskExecutors),
+            [{"task_id": task.id, "user_id": user_id} for user_id in user_ids],
+        )
+        TestSession.commit()
+
+        def change() -> None:
+            response = self.client.put(
+                f"/api/v1/task/{task.id}",
+                json={
+                    "name": "New",
+                    "description": fake.name(),
+                    "responsible_person_id": self.manager_id,
+                    "status": constants.TaskStatus.TODO.value,
+                    "priority": constants.Priority.LOW.value,
+                },
+                headers=get_headers(self.manager_id),
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        # Payload of all participants would be over the limit of NOTIFY
+        notifications = self.get_notifications(change)
+        assert len(notifications) == 1001
+        assert all(item["task_ids"] == [task.id] for item in notifications)
+
+    def test_success_server_sent_events(self) -> None:
+        async def read() -> str:
+            events = task_stream.events(self.developer_id)
+            first = asyncio.ensure_future(anext(events))
+            await asyncio.to_thread(task_stream.connected.wait, 5)
+            task_stream.dispatch({"op": "updated", "task_id": 1}, {self.developer_id})
+            message = await asyncio.wait_for(first, 5)
+            while "resync" in message:
+                message = await asyncio.wait_for(anext(events), 5)
+            await events.aclose()
+            return message
+
+        message = asyncio.run(read())
+        assert message == 'event: updated\ndata: {"op":"updated","task_id":1}\n\n'
+        assert self.developer_id not in task_stream.subscriptions
+
+    def test_success_slow_subscriber_resyncs(self) -> None:
+        async def overflow() -> list:
+            queue = asyncio.Queue(maxsize=2)
+            for task_id in range(3):
+                TaskStream.put(queue, {"op": "updated", "task_id": task_id})
+            return [queue.get_nowait() for _ in range(queue.qsize())]
+
+        assert asyncio.run(overflow()) == [RESYNC_EVENT]
+
+    def test_invalid_stream_without_token(self) -> None:
+        response = self.client.get("/api/v1/task/stream")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TaskChangesTestCase(TestCase):
+    def setUp(self) -> None:
+        self.manager_id = factories.UserFactory(status=constants.UserStatus.MANAGER).id
+        self.developer_id = factories.UserFactory(
+            status=constants.UserStatus.DEVELOPER
+        ).id
+        self.task_ids = [
+            factories.TaskFactory(
+                responsible_person_id=self.manager_id, created_by=self.manager_id
+            ).id
+            for _ in range(3)
+        ]
+        for task_id in self.task_ids[:2]:
+            factories.TaskExecutors(task_id=task_id, user_id=self.developer_id)
+        self.other_task_id = factories.TaskFactory(
+            responsible_person_id=self.manager_id, created_by=self.manager_id
+        ).id
+        self.headers = get_headers(self.developer_id)
+
+    def get_changes(self, since: str = None) -> dict:
+        params = {"since": since} if since else {}
+        response = self.client.get(
+            "/api/v1/task/changes", params=params, headers=self.headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+    def test_success_first_sync_returns_my_tasks(self) -> None:
+        changes = self.get_changes()
+        assert [task["id"] for task in changes["tasks"]] == self.task_ids[:2]
+        assert changes["removed_task_ids"] == []
+        # Nothing changed since
+        changes = self.get_changes(changes["since"])
+        assert changes["tasks"] == []
+
+    def test_success_changes_since_token(self) -> None:
+        since = self.get_changes()["since"]
+        manager_headers = get_headers(self.manager_id)
+        self.client.patch(
+            "/api/v1/task/bulk",
+            json={"ids": [self.task_ids[0]], "status": "Done"},
+            headers=manager_headers,
+        )
+        self.client.post(
+            f"/api/v1/task/{self.task_ids[2]}/user/{self.developer_id}/",
+            headers=manager_headers,
+        )
+        self.client.delete(
+            f"/api/v1/task/{self.task_ids[1]}/user/{self.developer_id}/",
+            headers=manager_headers,
+        )
+        changes = self.get_changes(since)
+        assert [task["id"] for task in changes["tasks"]] == [
+            self.task_ids[0],
+            self.task_ids[2],
+        ]
+        assert changes["tasks"][0]["status"] == "Done"
+        assert changes["removed_task_ids"] == [self.task_ids[1]]
+
+    def test_success_responsible_person_unassigned_keeps_task(self) -> None:
+        self.headers = get_headers(self.manager_id)
+        url = f"/api/v1/task/{self.task_ids[2]}/user/{self.manager_id}/"
+        self.client.post(url, headers=self.headers)
+        since = self.get_changes()["since"]
+        self.client.delete(url, headers=self.headers)
+        changes = self.get_changes(since)
+        # The task is still mine as its responsible person
+        assert changes["removed_task_ids"] == []
+
+    def test_success_removed_tasks(self) -> None:
+        since = self.get_changes()["since"]
+        manager_headers = get_headers(self.manager_id)
+        self.client.delete(f"/api/v1/task/{self.task_ids[0]}", headers=manager_headers)
+        # Task which left and came back isn't removed
+        url = f"/api/v1/task/{self.task_ids[1]}/user/{self.developer_id}/"
+        self.client.delete(url, headers=manager_headers)
+        self.client.post(url, headers=manager_headers)
+        changes = self.get_changes(since)
+        assert [task["id"] for task in changes["tasks"]] == [self.task_ids[1]]
+        assert changes["removed_task_ids"] == [self.task_ids[0]]
+
+        # Responsible person replaced by other user
+        since = changes["since"]
+        self.client.patch(
+            "/api/v1/task/bulk",
+            json={
+                "ids": [self.other_task_id],
+                "responsible_person_id": self.developer_id,
+            },
+            headers=manager_headers,
+        )
+        assert self.get_changes(since)["tasks"][0]["id"] == self.other_task_id
+        self.headers = manager_headers
+        assert self.get_changes(since)["removed_task_ids"] == [self.other_task_id]
+
+    def test_success_change_committed_after_sync(self) -> None:
+        with test_engine.connect() as connection:
+            # Transaction which began before sync commits after it
+            connection.execute(
+                models.Task.__table__.update()
+                .where(models.Task.id == self.task_ids[0])
+                .values(name="Late")
+            )
+            since = self.get_changes()["since"]
+            connection.commit()
+        changes = self.get_changes(since)
+        assert [task["name"] for task in changes["tasks"]] == ["Late"]
+
+    def test_invalid_sync_token(self) -> None:
+        response = self.client.get(
+            "/api/v1/task/changes", params={"since": "broken"}, headers=self.headers
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        issued_at = datetime.utcnow() - timedelta(
+            days=settings.TASK_TOMBSTONE_LIFETIME + 1
+        )
+        response = self.client.get(
+            "/api/v1/task/changes",
+            params={"since": encode_cursor([0, issued_at.isoformat()])},
+            headers=self.headers,
+        )
+        assert response.status_code == status.HTTP_410_GONE
+
+
+class TaskETagTestCase(TestCase):
+    def setUp(self) -> None:
+        self.manager_id = factories.UserFactory(status=constants.UserStatus.MANAGER).id
+        self.task_ids = [
+            factories.TaskFactory(
+                responsible_person_id=self.manager_id, created_by=self.manager_id
+            ).id
+            for _ in range(3)
+        ]
+        self.headers = get_headers(self.manager_id)
+
+    def get(self, url: str, etag: str = None, **params):
+        headers = {**self.headers, **({"If-None-Match": etag} if etag else {})}
+        return self.client.get(url, params=params, headers=headers)
+
+    def test_success_task_not_modified(self) -> None:
+        url = f"/api/v1/task/{self.task_ids[0]}/"
+        response = self.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["Cache-Control"] == settings.CACHE_CONTROL_TASK
+        etag = response.headers["ETag"]
+
+        statements = []
+
+        def log_statement(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", log_statement)
+        self.addCleanup(
+            event.remove, test_engine, "before_cursor_execute", log_statement
+        )
+        response = self.get(url, etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        # Only revisions are checked, the task isn't loaded
+        assert not any("task.name" in statement for statement in statements)
+        assert (
+            self.get(url, f'W/{etag}, "other"').status_code
+            == status.HTTP_304_NOT_MODIFIED
+        )
+
+    def test_success_task_etag_changes(self) -> None:
+        url = f"/api/v1/task/{self.task_ids[0]}/"
+        etag = self.get(url).headers["ETag"]
+        TestSession.execute(
+            update(models.Task)
+            .where(models.Task.id == self.task_ids[0])
+            .values(name="New")
+        )
+        TestSession.commit()
+        response = self.get(url, etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["name"] == "New"
+        assert response.headers["ETag"] != etag
+        etag = response.headers["ETag"]
+        # Responsible person is a part of the task
+        TestSession.execute(
+            update(models.User)
+            .where(models.User.id == self.manager_id)
+            .values(name="New")
+        )
+        TestSession.commit()
+        response = self.get(url, etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["priority_person"]["name"] == "New"
+
+    def test_success_task_list_not_modified(self) -> None:
+        for url in ("/api/v1/task/", "/api/v1/task/me/"):
+            response = self.get(url, size=2)
+            etag = response.headers["ETag"]
+            assert response.headers["Cache-Control"] == settings.CACHE_CONTROL_TASK_LIST
+            assert (
+                self.get(url, etag, size=2).status_code == status.HTTP_304_NOT_MODIFIED
+            )
+            # Other page has other ETag
+            response = self.get(url, etag, size=2, page=2)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.headers["ETag"] != etag
+
+        statements = []
+
+        def log_statement(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", log_statement)
+        self.addCleanup(
+            event.remove, test_engine, "before_cursor_execute", log_statement
+        )
+        etag = self.get("/api/v1/task/", size=2).headers["ETag"]
+        # Total and page are loaded once for the page and its ETag
+        task_statements = [
+            statement for statement in statements if "FROM task" in statement
+        ]
+        assert len(task_statements) == 2
+        factories.TaskFactory(
+            responsible_person_id=self.manager_id, created_by=self.manager_id
+        )
+        response = self.get("/api/v1/task/", etag, size=2)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["total"] == 4
+
+
+class TaskIncludeAssignersTestCase(TestCase):
+    def setUp(self) -> None:
+        self.manager_id = factories.UserFactory(status=constants.UserStatus.MANAGER).id
+        self.developer_ids = [
+            factories.UserFactory(status=constants.UserStatus.DEVELOPER).id
+            for _ in range(2)
+        ]
+        self.task_ids = [
+            factories.TaskFactory(
+                responsible_person_id=self.manager_id, created_by=self.manager_id
+            ).id
+            for _ in range(3)
+        ]
+        for task_id, user_ids in zip(
+            self.task_ids, [self.developer_ids, self.developer_ids[:1], []]
+        ):
+            for user_id in user_ids:
+                factories.TaskExecutors(task_id=task_id, user_id=user_id)
+        self.headers = get_headers(self.manager_id)
+
+    def test_success_assigners_included(self) -> None:
+        statements = []
+
+        def log_statement(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", log_statement)
+        self.addCleanup(
+            event.remove, test_engine, "before_cursor_execute", log_statement
+        )
+        response = self.client.get(
+            "/api/v1/task/", params={"include": "assigners"}, headers=self.headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assigners = {
+            item["id"]: [user["id"] for user in item["assigners"]]
+            for item in response.json()["items"]
+        }
+        assert assigners == {
+            self.task_ids[0]: self.developer_ids,
+            self.task_ids[1]: self.developer_ids[:1],
+            self.task_ids[2]: [],
+        }
+        # Executors of the whole page are loaded with one query
+        executor_statements = [
+            statement
+            for statement in statements
+            if "FROM task_executors" in statement and "task.name" not in statement
+        ]
+        # ETag is built of the loaded page
+        assert len(executor_statements) == 1
+
+    def test_success_assigners_not_included(self) -> None:
+        response = self.client.get("/api/v1/task/", headers=self.headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert all("assigners" not in item for item in response.json()["items"])
+
+    def test_success_my_tasks_assigners_included(self) -> None:
+        response = self.client.get(
+            "/api/v1/task/me/",
+            params={"include": "assigners"},
+            headers=get_headers(self.developer_ids[1]),
+        )
+        assert response.status_code == status.HTTP_200_OK
+        items = response.json()["items"]
+        assert [item["id"] for item in items] == [self.task_ids[0]]
+        assert [user["id"] for user in items[0]["assigners"]] == self.developer_ids
+
+    def test_success_etag_changes_on_assign(self) -> None:
+        params = {"include": "assigners"}
+        response = self.client.get("/api/v1/task/", params=params, headers=self.headers)
+        etag = response.headers["ETag"]
+        factories.TaskExecutors(task_id=self.task_ids[2], user_id=self.developer_ids[0])
+        headers = {**self.headers, "If-None-Match": etag}
+        response = self.client.get("/api/v1/task/", params=params, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+
+    def test_invalid_include(self) -> None:
+        response = self.client.get(
+            "/api/v1/task/", params={"include": "comments"}, headers=self.headers
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TaskIdempotencyTestCase(TestCase):
+    def setUp(self) -> None:
+        for key in redis_cache.client.scan_iter("idempotency:*"):
+            redis_cache.client.delete(key)
+        self.manager_id = factories.UserFactory(status=constants.UserStatus.MANAGER).id
+        self.developer_id = factories.UserFactory(
+            status=constants.UserStatus.DEVELOPER
+        ).id
+        self.input_data = {
+            "name": fake.name(),
+            "description": fake.name(),
+            "responsible_person_id": self.manager_id,
+            "status": constants.TaskStatus.TODO.value,
+            "priority": constants.Priority.LOW.value,
+        }
+
+    def get_headers(self, key: str) -> dict:
+        return {**get_headers(self.manager_id), "Idempotency-Key": key}
+
+    def get_response_key(self, key: str) -> str:
+        return next(redis_cache.client.scan_iter(f"idempotency:*:{key}"))
+
+    def count_tasks(self) -> int:
+        count = TestSession.execute(
+            select(func.count()).select_from(models.Task)
+        ).scalar()
+        TestSession.commit()
+        return count
+
+    def test_success_create_task_replayed(self) -> None:
+        headers = self.get_headers("create-1")
+        first = self.client.post("/api/v1/task/", json=self.input_data, headers=headers)
+        assert first.status_code == status.HTTP_201_CREATED
+        assert "Idempotent-Replayed" not in first.headers
+        retry = self.client.post("/api/v1/task/", json=self.input_data, headers=headers)
+        assert retry.status_code == status.HTTP_201_CREATED
+        assert retry.content == first.content
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert self.count_tasks() == 1
+        # Another key is another request
+        self.client.post(
+            "/api/v1/task/", json=self.input_data, headers=self.get_headers("create-2")
+        )
+        assert self.count_tasks() == 2
+
+    def test_success_assign_replayed(self) -> None:
+        task_id = factories.TaskFactory(
+            responsible_person_id=self.manager_id, created_by=self.manager_id
+        ).id
+        url = f"/api/v1/task/{task_id}/user/{self.developer_id}"
+        headers = self.get_headers("assign-1")
+        first = self.client.post(url, headers=headers)
+        assert first.status_code == status.HTTP_200_OK
+        # Without the key the same assign fails as a duplicate
+        retry = self.client.post(url, headers=headers)
+        assert retry.status_code == status.HTTP_200_OK
+        assert retry.content == first.content
+
+    def test_success_refreshed_token_replayed(self) -> None:
+        headers = self.get_headers("create-1")
+        first = self.client.post("/api/v1/task/", json=self.input_data, headers=headers)
+        # Token refreshed between the request and its retry
+        expire_minutes = settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
+        settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES = expire_minutes + 1
+        self.addCleanup(
+            setattr, settings, "JWT_ACCESS_TOKEN_EXPIRE_MINUTES", expire_minutes
+        )
+        retry_headers = self.get_headers("create-1")
+        assert retry_headers["Authorization"] != headers["Authorization"]
+        retry = self.client.post(
+            "/api/v1/task/", json=self.input_data, headers=retry_headers
+        )
+        assert retry.content == first.content
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert self.count_tasks() == 1
+
+    def test_success_key_of_another_user_not_replayed(self) -> None:
+        headers = self.get_headers("create-1")
+        self.client.post("/api/v1/task/", json=self.input_data, headers=headers)
+        manager_id = factories.UserFactory(status=constants.UserStatus.MANAGER).id
+        response = self.client.post(
+            "/api/v1/task/",
+            json=self.input_data,
+            headers={**get_headers(manager_id), "Idempotency-Key": "create-1"},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert "Idempotent-Replayed" not in response.headers
+        assert self.count_tasks() == 2
+
+    def test_success_retry_waits_for_running_request(self) -> None:
+        headers = self.get_headers("wait-1")
+        first = self.client.post("/api/v1/task/", json=self.input_data, headers=headers)
+        # Response isn't stored yet and the first request holds the lock
+        response_key = self.get_response_key("wait-1")
+        stored = redis_cache.client.getdel(response_key)
+        lock_key = f"{response_key}:lock"
+        redis_cache.client.set(lock_key, "running")
+
+        def finish() -> None:
+            redis_cache.client.set(response_key, stored)
+            redis_cache.client.delete(lock_key)
+
+        timer = threading.Timer(0.3, finish)
+        timer.start()
+        self.addCleanup(timer.cancel)
+        retry = self.client.post("/api/v1/task/", json=self.input_data, headers=headers)
+        assert retry.status_code == status.HTTP_201_CREATED
+        assert retry.content == first.content
+        assert self.count_tasks() == 1
+
+    def test_success_slow_request_keeps_lock(self) -> None:
+        lock_timeout = settings.IDEMPOTENCY_LOCK_TIMEOUT
+        settings.IDEMPOTENCY_LOCK_TIMEOUT = 1
+        self.addCleanup(setattr, settings, "IDEMPOTENCY_LOCK_TIMEOUT", lock_timeout)
+
+        def get_slow_db():
+            # Request runs longer than its lock timeout
+            time.sleep(2.5)
+            return get_test_db()
+
+        app.dependency_overrides[get_session] = get_slow_db
+        self.addCleanup(app.dependency_overrides.__setitem__, get_session, get_test_db)
+        headers = self.get_headers("slow-1")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(
+                self.client.post, "/api/v1/task/", json=self.input_data, headers=headers
+            )
+            time.sleep(1.5)
+            retry = executor.submit(
+                self.client.post, "/api/v1/task/", json=self.input_data, headers=headers
+            )
+            first, retry = first.result(), retry.result()
+        assert first.status_code == status.HTTP_201_CREATED
+        assert retry.content == first.content
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert self.count_tasks() == 1
+        # Lock is released with the response
+        assert list(redis_cache.client.scan_iter("idempotency:*")) == [
+            self.get_response_key("slow-1")
+        ]
+
+    def test_success_import_replayed_without_reading_body(self) -> None:
+        import_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(import_dir.cleanup)
+        self.addCleanup(setattr, settings, "IMPORT_DIR", settings.IMPORT_DIR)
+        settings.IMPORT_DIR = import_dir.name
+        manager_email = TestSession.get(models.User, self.manager_id).email
+        content = (
+            "name,description,responsible_email,status,priority\n"
+            f"{fake.word()},{fake.word()},{manager_email},Todo,High\n"
+        )
+        headers = self.get_headers("import-1")
+        # Upload is spooled by the endpoint, not read into memory
+        with mock.patch.object(Request, "body", side_effect=AssertionError):
+            responses = [
+                self.client.post(
+                    "/api/v1/task/import",
+                    files={"file": ("tasks.csv", content, "text/csv")},
+                    headers=headers,
+                )
+                for _ in range(2)
+            ]
+        assert responses[0].status_code == status.HTTP_202_ACCEPTED
+        assert responses[1].content == responses[0].content
+        assert responses[1].headers["Idempotent-Replayed"] == "true"
+        assert len(list(Path(import_dir.name).iterdir())) == 1
+
+    def test_success_failed_request_not_stored(self) -> None:
+        headers = self.get_headers("update-1")
+        url = f"/api/v1/task/{random.randint(10000, 99999)}"
+        response = self.client.put(url, json=self.input_data, headers=headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert not list(redis_cache.client.scan_iter("idempotency:*"))
+
+    def test_invalid_key_reused_with_another_request(self) -> None:
+        headers = self.get_headers("create-1")
+        self.client.post("/api/v1/task/", json=self.input_data, headers=headers)
+        self.input_data["name"] = fake.name()
+        response = self.client.post(
+            "/api/v1/task/", json=self.input_data, headers=headers
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert self.count_tasks() == 1
+
+    def test_invalid_key_in_progress(self) -> None:
+        timeout = settings.IDEMPOTENCY_WAIT_TIMEOUT
+        settings.IDEMPOTENCY_WAIT_TIMEOUT = 0.3
+        self.addCleanup(setattr, settings, "IDEMPOTENCY_WAIT_TIMEOUT", timeout)
+        headers = self.get_headers("create-1")
+        self.client.post("/api/v1/task/", json=self.input_data, headers=headers)
+        response_key = self.get_response_key("create-1")
+        redis_cache.client.delete(response_key)
+        redis_cache.client.set(f"{response_key}:lock", "running")
+        response = self.client.post(
+            "/api/v1/task/", json=self.input_data, headers=headers
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert self.count_tasks() == 1
+
+    def test_invalid_key_without_token(self) -> None:
+        response = self.client.post(
+            "/api/v1/task/", json=self.input_data, headers={"Idempotency-Key": "1"}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert not list(redis_cache.client.scan_iter("idempotency:*"))
+
+    def test_invalid_key_too_long(self) -> None:
+        headers = self.get_headers("k" * (constants.MAX_IDEMPOTENCY_KEY_LENGTH + 1))
+        response = self.client.post(
+            "/api/v1/task/", json=self.input_data, headers=headers
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
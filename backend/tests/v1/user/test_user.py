@@ -0,0 +1,313 @@
+from collections import Counter
+from unittest import mock
+
+from fastapi import status
+from sqlalchemy import event, select, update
+
+from db import constants, models
+from service.controllers.v1.user.user import get_user_search_query
+from service.core import redis_cache, settings
+from tests import factories
+from tests.conftests import TestCase, TestSession, test_engine
+from tests.utils import get_headers
+
+
+class UserSearchTestCase(TestCase):
+    def setUp(self) -> None:
+        self.url = "/api/v1/user/search"
+        for key in redis_cache.keys("user-search:*"):
+            redis_cache.client.delete(key)
+        self.manager = factories.UserFactory(
+            name="Alice Manager",
+            email="boss@example.com",
+            status=constants.UserStatus.MANAGER,
+        )
+        self.developers = [
+            factories.UserFactory(
+                name=name, email=email, status=constants.UserStatus.DEVELOPER
+            )
+            for name, email in (
+                ("Bob Malice", "bob@example.com"),
+                ("Alice Smith", "alice@example.com"),
+                ("Carol White", "carol_alice@example.com"),
+            )
+        ]
+
+    def test_success_search_users_prefix_first(self) -> None:
+        response = self.client.get(
+            self.url, params={"q": "ALIC"}, headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        names = [user["name"] for user in response.json()]
+        assert names == ["Alice Manager", "Alice Smith", "Bob Malice", "Carol White"]
+
+    def test_success_search_users_by_status(self) -> None:
+        params = {"q": "alice", "status": constants.UserStatus.DEVELOPER.value}
+        response = self.client.get(
+            self.url, params=params, headers=get_headers(self.manager.id)
+        )
+        ids = {user["id"] for user in response.json()}
+        assert ids == {developer.id for developer in self.developers}
+
+    def test_success_search_users_wildcards_are_literal(self) -> None:
+        response = self.client.get(
+            self.url, params={"q": "l_a"}, headers=get_headers(self.manager.id)
+        )
+        assert [user["name"] for user in response.json()] == ["Carol White"]
+        response = self.client.get(
+            self.url, params={"q": "ice%"}, headers=get_headers(self.manager.id)
+        )
+        assert response.json() == []
+
+    def test_success_search_users_limit(self) -> None:
+        factories.UserFactory.create_batch(
+            constants.USER_SEARCH_LIMIT, name="Alice Clone"
+        )
+        response = self.client.get(
+            self.url, params={"q": "alice"}, headers=get_headers(self.manager.id)
+        )
+        assert len(response.json()) == constants.USER_SEARCH_LIMIT
+
+    def test_success_search_users_cached(self) -> None:
+        headers = get_headers(self.manager.id)
+        response = self.client.get(self.url, params={"q": "smi"}, headers=headers)
+        assert len(response.json()) == 1
+        factories.UserFactory(name="Jane Smith")
+        # Mixed case and longer queries are served by the same prefix bucket
+        response = self.client.get(self.url, params={"q": "Smith"}, headers=headers)
+        assert len(response.json()) == 1
+        assert redis_cache.client.ttl("user-search:all:smi") > 0
+        assert list(redis_cache.keys("user-search:*")) == ["user-search:all:smi"]
+
+    def test_success_search_users_bucket_without_queries(self) -> None:
+        statements = []
+
+        def log_statement(conn, cursor, statement, *args) -> None:
+            if "ILIKE" in statement:
+                statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", log_statement)
+        self.addCleanup(
+            event.remove, test_engine, "before_cursor_execute", log_statement
+        )
+        headers = get_headers(self.manager.id)
+        names = []
+        for q in ("ali", "alic", "alice", "alice s", "alice sm"):
+            response = self.client.get(self.url, params={"q": q}, headers=headers)
+            names.append([user["name"] for user in response.json()])
+        assert len(statements) == 1
+        assert names[2] == [
+            "Alice Manager",
+            "Alice Smith",
+            "Bob Malice",
+            "Carol White",
+        ]
+        assert names[3:] == [["Alice Smith"], ["Alice Smith"]]
+
+    def test_success_search_users_bucket_overflow(self) -> None:
+        factories.UserFactory.create_batch(3, name="Alice Clone")
+        headers = get_headers(self.manager.id)
+        with mock.patch.object(constants, "USER_SEARCH_BUCKET_SIZE", 4):
+            response = self.client.get(
+                self.url, params={"q": "alice s"}, headers=headers
+            )
+        # Full bucket can miss users, the query is run on its own
+        assert [user["name"] for user in response.json()] == ["Alice Smith"]
+        assert sorted(redis_cache.keys("user-search:*")) == [
+            "user-search:all:ali",
+            "user-search:all:ali:alice s",
+        ]
+
+    def test_success_search_users_use_trigram_indexes(self) -> None:
+        query = get_user_search_query("alice")
+        compiled = query.compile(test_engine)
+        with test_engine.connect() as connection:
+            connection.exec_driver_sql("SET enable_seqscan = off")
+            plan = "\n".join(
+                connection.exec_driver_sql(
+                    f"EXPLAIN {compiled}", compiled.params
+                ).scalars()
+            )
+        assert "ix_user_name_trgm" in plan, plan
+        assert "ix_user_email_trgm" in plan, plan
+
+    def test_invalid_search_users_empty_query(self) -> None:
+        response = self.client.get(
+            self.url, params={"q": ""}, headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_invalid_search_users_short_query(self) -> None:
+        response = self.client.get(
+            self.url, params={"q": "al"}, headers=get_headers(self.manager.id)
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_invalid_search_users_without_token(self) -> None:
+        response = self.client.get(self.url, params={"q": "alice"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def get_stats() -> Counter:
+    """Return non-zero counters as {(user_id, status, priority): count}"""
+    rows = TestSession.execute(
+        select(
+            models.UserTaskStats.user_id,
+            models.UserTaskStats.status,
+            models.UserTaskStats.priority,
+            models.UserTaskStats.count,
+        ).where(models.UserTaskStats.count != 0)
+    ).all()
+    TestSession.commit()
+    return Counter({(user_id, *key): count for user_id, *key, count in rows})
+
+
+def count_stats() -> Counter:
+    """Count tasks of responsible persons and executors from scratch"""
+    tasks = {
+        task.id: task for task in TestSession.execute(select(models.Task)).scalars()
+    }
+    participants = {(task.id, task.responsible_person_id) for task in tasks.values()}
+    participants.update(
+        TestSession.execute(
+            select(models.TaskExecutors.task_id, models.TaskExecutors.user_id)
+        ).all()
+    )
+    TestSession.commit()
+    return Counter(
+        (user_id, tasks[task_id].status, tasks[task_id].priority)
+        for task_id, user_id in participants
+    )
+
+
+class UserTaskStatsTestCase(TestCase):
+    def setUp(self) -> None:
+        self.url = "/api/v1/user/me/stats"
+        self.manager = factories.UserFactory(status=constants.UserStatus.MANAGER)
+        self.developers = [
+            factories.UserFactory(status=constants.UserStatus.DEVELOPER)
+            for _ in range(3)
+        ]
+        self.task = factories.TaskFactory(
+            responsible_person_id=self.manager.id, created_by=self.manager.id
+        )
+
+    def test_success_stats_follow_task_changes(self) -> None:
+        headers = get_headers(self.manager.id)
+        input_data = {
+            "name": "Task",
+            "description": "Description",
+            "responsible_person_id": self.developers[0].id,
+            "status": constants.TaskStatus.TODO.value,
+            "priority": constants.Priority.HIGH.value,
+        }
+        response = self.client.post("/api/v1/task/", json=input_data, headers=headers)
+        task_id = response.json()["id"]
+        assert get_stats() == count_stats()
+
+        user_ids = [developer.id for developer in self.developers]
+        self.client.post(
+            f"/api/v1/task/{task_id}/users",
+            json={"user_ids": user_ids},
+            headers=headers,
+        )
+        self.client.post(
+            f"/api/v1/task/{self.task.id}/user/{self.developers[1].id}/",
+            headers=headers,
+        )
+        assert get_stats() == count_stats()
+
+        input_data["status"] = constants.TaskStatus.IN_PROGRESS.value
+        input_data["responsible_person_id"] = self.developers[2].id
+        self.client.put(f"/api/v1/task/{task_id}", json=input_data, headers=headers)
+        self.client.patch(
+            "/api/v1/task/bulk",
+            json={"ids": [task_id, self.task.id], "priority": "Low"},
+            headers=headers,
+        )
+        assert get_stats() == count_stats()
+
+        self.client.delete(
+            f"/api/v1/task/{task_id}/user/{self.developers[1].id}/", headers=headers
+        )
+        self.client.delete(f"/api/v1/task/{self.task.id}", headers=headers)
+        assert get_stats() == count_stats()
+        assert get_stats() == Counter(
+            {
+                (
+                    self.developers[0].id,
+                    constants.TaskStatus.IN_PROGRESS.value,
+                    "Low",
+                ): 1,
+                (
+                    self.developers[2].id,
+                    constants.TaskStatus.IN_PROGRESS.value,
+                    "Low",
+                ): 1,
+            }
+        )
+
+    def test_success_stats_follow_bulk_changes(self) -> None:
+        tasks = factories.TaskFactory.create_batch(
+            10, responsible_person_id=self.manager.id, created_by=self.manager.id
+        )
+        for task in tasks[:5]:
+            factories.TaskExecutors(task_id=task.id, user_id=self.developers[0].id)
+        # Responsible person who is executor too is counted once
+        factories.TaskExecutors(task_id=tasks[5].id, user_id=self.manager.id)
+        TestSession.execute(
+            update(models.Task)
+            .where(models.Task.id.in_([task.id for task in tasks[3:]]))
+            .values(status=constants.TaskStatus.DONE.value)
+        )
+        TestSession.commit()
+        assert get_stats() == count_stats()
+        assert get_stats()[(self.manager.id, "Done", "Low")] == 7
+
+        TestSession.delete(TestSession.get(models.User, self.developers[0].id))
+        TestSession.commit()
+        assert get_stats() == count_stats()
+
+    def test_success_get_my_stats(self) -> None:
+        factories.TaskFactory(
+            responsible_person_id=self.developers[0].id,
+            created_by=self.manager.id,
+            priority=constants.Priority.HIGH.value,
+        )
+        factories.TaskExecutors(task_id=self.task.id, user_id=self.developers[0].id)
+        response = self.client.get(self.url, headers=get_headers(self.developers[0].id))
+        assert response.status_code == status.HTTP_200_OK
+        stats = response.json()
+        assert stats["total"] == 2
+        assert stats["by_status"][constants.TaskStatus.TODO.value] == 2
+        assert stats["by_status"][constants.TaskStatus.DONE.value] == 0
+        assert stats["by_priority"] == {
+            constants.Priority.LOW.value: 1,
+            constants.Priority.MEDIUM.value: 0,
+            constants.Priority.HIGH.value: 1,
+        }
+
+    def test_invalid_get_my_stats_without_token(self) -> None:
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class UserMeETagTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user_id = factories.UserFactory(status=constants.UserStatus.MANAGER).id
+        self.headers = get_headers(self.user_id)
+
+    def test_success_user_me_not_modified(self) -> None:
+        response = self.client.get("/api/v1/user/me/", headers=self.headers)
+        assert response.headers["Cache-Control"] == settings.CACHE_CONTROL_USER_ME
+        headers = {**self.headers, "If-None-Match": response.headers["ETag"]}
+        response = self.client.get("/api/v1/user/me/", headers=headers)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        TestSession.execute(
+            update(models.User).where(models.User.id == self.user_id).values(name="New")
+        )
+        TestSession.commit()
+        response = self.client.get("/api/v1/user/me/", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["name"] == "New"
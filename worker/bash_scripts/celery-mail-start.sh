@@ -0,0 +1,9 @@
+#! /usr/bin/env bash
+set -e
+
+# Mail tasks are I/O-bound (waiting on SMTP), so they run in a separate worker
+# on a thread pool (or gevent with MAIL_WORKER_POOL=gevent) with high concurrency
+celery -A service.tasks worker -l info -Q mail-queue -E \
+    -n mail@%h \
+    -P "${MAIL_WORKER_POOL:-threads}" \
+    -c "${MAIL_WORKER_CONCURRENCY:-50}"
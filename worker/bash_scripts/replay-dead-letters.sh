@@ -0,0 +1,5 @@
+#! /usr/bin/env bash
+set -e
+
+# Re-enqueue failed emails, extra args are passed to the command (see --help)
+python -m service.commands.replay_dead_letters "${@}"
@@ -0,0 +1,128 @@
+"""
+Mail throughput benchmark: prefork vs thread pool
+
+Starts a local SMTP sink which answers every message after a fixed delay
+(simulating a remote SMTP server) and sends the same batch of emails through
+`send_email` with:
+1) a process pool sized like Celery's default prefork pool (one per CPU);
+2) a thread pool sized like the mail worker (`celery-mail-start.sh`).
+
+Usage (from worker directory):
+    python benchmarks/mail_throughput.py --messages 500 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+SINK_HOST = "127.0.0.1"
+SINK_PORT = 8025
+
+# Point worker settings at the sink before they are imported
+os.environ.update(
+    {
+        "SMTP_HOST": SINK_HOST,
+        "SMTP_PORT": str(SINK_PORT),
+        "SMTP_USER": "benchmark@treji.local",
+        "SMTP_PASSWORD": "",
+        "SMTP_USE_TLS": "false",
+    }
+)
+for name in ("PSQL_SERVER", "PSQL_USER", "PSQL_PASSWORD", "PSQL_DB_NAME"):
+    os.environ.setdefault(name, "benchmark")
+
+from service.core import settings  # noqa: E402
+from service.tasks.utils import send_email  # noqa: E402
+
+
+def run_sink(latency: float, ready: threading.Event) -> None:
+    """Run minimal SMTP server which accepts and drops every message"""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        writer.write(b"220 sink ESMTP\r\n")
+        in_data = False
+        while line := await reader.readline():
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    await asyncio.sleep(latency)
+                    writer.write(b"250 OK\r\n")
+            else:
+                command = line[:4].upper()
+                if command in (b"EHLO", b"HELO"):
+                    writer.write(b"250 sink\r\n")
+                elif command == b"DATA":
+                    in_data = True
+                    writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                elif command == b"QUIT":
+                    writer.write(b"221 Bye\r\n")
+                    await writer.drain()
+                    break
+                else:
+                    writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+    async def serve():
+        server = await asyncio.start_server(handle, SINK_HOST, SINK_PORT, backlog=1024)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+def send(index: int) -> Optional[str]:
+    """Send one mail and return its error, so every failed send is counted"""
+    # Spread recipients over a few domains so the per-destination cap applies
+    try:
+        send_email(f"user{index}@domain{index % 10}.test", "Benchmark", "<p>Hi</p>")
+    except OSError as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def measure(executor: Executor, messages: int) -> float:
+    """Send messages through executor and return messages per second"""
+    started = time.perf_counter()
+    with executor:
+        errors = [error for error in executor.map(send, range(messages)) if error]
+    elapsed = time.perf_counter() - started
+    if errors:
+        raise RuntimeError(f"{len(errors)} sends failed, first: {errors[0]}")
+    return messages / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="SMTP delay, s")
+    parser.add_argument("--prefork", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--threads", type=int, default=50)
+    args = parser.parse_args()
+
+    ready = threading.Event()
+    threading.Thread(target=run_sink, args=(args.latency, ready), daemon=True).start()
+    ready.wait()
+
+    print(
+        f"{args.messages} messages, {args.latency * 1000:.0f} ms SMTP latency, "
+        f"{settings.MAIL_DESTINATION_CONCURRENCY} sessions per domain"
+    )
+    context = multiprocessing.get_context("fork")
+    prefork = measure(
+        ProcessPoolExecutor(args.prefork, mp_context=context), args.messages
+    )
+    print(f"prefork  (-c {args.prefork}): {prefork:8.1f} msg/s")
+    threads = measure(ThreadPoolExecutor(args.threads), args.messages)
+    print(f"threads  (-c {args.threads}): {threads:8.1f} msg/s")
+    print(f"speedup: {threads / prefork:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
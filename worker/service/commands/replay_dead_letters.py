@@ -0,0 +1,75 @@
+"""
+Re-enqueue mails stored in `failed_email` table (dead letters)
+
+Dead letters are taken in batches (oldest first), published to the broker
+and marked as replayed. Publishing is rate-limited so a big backlog after
+an SMTP outage doesn't flood the mail worker and SMTP server again.
+
+Usage (from worker directory):
+    python -m service.commands.replay_dead_letters --batch-size 100 --rate 20
+"""
+
+import argparse
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+from db.session import DBSession
+from service.core.celery_app import celery_app
+
+logging.basicConfig(format="%(levelname)s:    %(message)s", level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+replay_query = text(
+    "UPDATE failed_email SET replayed_at = timezone('utc', now()) "
+    "WHERE id IN ("
+    "    SELECT id FROM failed_email "
+    "    WHERE replayed_at IS NULL "
+    "    AND (CAST(:task_name AS VARCHAR) IS NULL OR task_name = :task_name) "
+    "    ORDER BY id LIMIT :batch_size FOR UPDATE SKIP LOCKED"
+    ") RETURNING id, task_name, args, kwargs"
+)
+
+
+def replay_dead_letters(
+    batch_size: int = 100,
+    rate: float = 20,
+    task_name: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> int:
+    """Re-enqueue dead letters not faster than `rate` mails per second"""
+    replayed = 0
+    while limit is None or replayed < limit:
+        started = time.monotonic()
+        size = batch_size if limit is None else min(batch_size, limit - replayed)
+        with DBSession() as db:
+            dead_letters = db.execute(
+                replay_query, {"batch_size": size, "task_name": task_name}
+            ).all()
+            for dead_letter in dead_letters:
+                celery_app.send_task(
+                    dead_letter.task_name,
+                    args=dead_letter.args,
+                    kwargs=dead_letter.kwargs,
+                )
+            # Mark as replayed only after every mail of the batch is published
+            db.commit()
+        replayed += len(dead_letters)
+        if dead_letters:
+            logger.info(f"Replayed {replayed} dead letters")
+        if len(dead_letters) < size:
+            break
+        time.sleep(max(0.0, len(dead_letters) / rate - (time.monotonic() - started)))
+    return replayed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-enqueue failed emails")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=20, help="Mails per second")
+    parser.add_argument("--task-name", help="Replay only this Celery task")
+    parser.add_argument("--limit", type=int, help="Max dead letters to replay")
+    args = parser.parse_args()
+    replay_dead_letters(args.batch_size, args.rate, args.task_name, args.limit)
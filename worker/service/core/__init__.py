@@ -1 +1,4 @@
+from .redis_cache import redis_cache
 from .settings import settings
+
+__all__ = ("settings", "redis_cache")
@@ -0,0 +1,218 @@
+"""
+Celery worker instrumentation
+
+Signal handlers record per task name:
+- queue latency (publish or ETA -> start) histogram;
+- execution time histogram by final state;
+- retry and failure counters;
+- slow task log with redacted arguments.
+
+Metrics are accumulated in Redis (one pipeline per task), so they are shared
+by all prefork children, and exported in Prometheus text format by a small
+HTTP server in the worker main process on WORKER_METRICS_PORT.
+"""
+
+import logging
+import re
+import socket
+import time
+from bisect import bisect_left
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Any, Optional
+
+from celery.signals import (
+    task_failure,
+    task_postrun,
+    task_prerun,
+    task_retry,
+    worker_init,
+)
+from redis import RedisError
+
+from .redis_cache import redis_cache
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+METRICS_PREFIX = f"metrics:{socket.gethostname()}"
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)
+RUNTIME_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HISTOGRAMS = {
+    "celery_task_queue_latency_seconds": (
+        "Time between task publish (or ETA) and execution start",
+        LATENCY_BUCKETS,
+    ),
+    "celery_task_runtime_seconds": ("Task execution time", RUNTIME_BUCKETS),
+}
+COUNTERS = {
+    "celery_task_retries_total": "Task retries",
+    "celery_task_failures_total": "Task failures",
+}
+
+EMAIL_REGEX = re.compile(r"^[^@\s]+@([^@\s]+)$")
+
+# Start times of tasks running in this process
+_started: dict[str, float] = {}
+
+
+def redact(value: Any) -> Any:
+    """Hide personal data and tokens from arguments, keep only their shape"""
+    if isinstance(value, str):
+        email = EMAIL_REGEX.match(value)
+        if email:
+            # Recipient domain helps to find slow SMTP destinations
+            return f"***@{email.group(1)}"
+        return f"<str:{len(value)}>"
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    return value
+
+
+def observe(pipeline, metric: str, labels: str, value: float) -> None:
+    """Add histogram observation to Redis pipeline"""
+    buckets = HISTOGRAMS[metric][1]
+    key = f"{METRICS_PREFIX}:{metric}:{labels}"
+    pipeline.hincrby(key, str(bisect_left(buckets, value)), 1)
+    pipeline.hincrbyfloat(key, "sum", value)
+    pipeline.hincrby(key, "count", 1)
+
+
+def increment(metric: str, labels: str) -> None:
+    try:
+        redis_cache.client.incr(f"{METRICS_PREFIX}:{metric}:{labels}")
+    except RedisError as e:
+        logger.warning(f"Can't store task metrics: {e}")
+
+
+def get_queued_at(request) -> Optional[float]:
+    """Return time from which task waited in the queue"""
+    published_at = getattr(request, "published_at", None)
+    if published_at is None:
+        return
+    eta = getattr(request, "eta", None)
+    if eta:
+        # Countdown of retries and delayed tasks isn't a queue latency
+        eta = eta if isinstance(eta, datetime) else datetime.fromisoformat(eta)
+        return max(published_at, eta.timestamp())
+    return published_at
+
+
+@task_prerun.connect
+def on_task_prerun(task_id: str, task, **kwargs) -> None:
+    _started[task_id] = time.monotonic()
+    queued_at = get_queued_at(task.request)
+    if queued_at is None:
+        return
+    try:
+        pipeline = redis_cache.client.pipeline(transaction=False)
+        observe(
+            pipeline,
+            "celery_task_queue_latency_seconds",
+            f'task="{task.name}"',
+            max(0.0, time.time() - queued_at),
+        )
+        pipeline.execute()
+    except RedisError as e:
+        logger.warning(f"Can't store task metrics: {e}")
+
+
+@task_postrun.connect
+def on_task_postrun(task_id: str, task, args=None, kwargs=None, state=None, **_):
+    started = _started.pop(task_id, None)
+    if started is None:
+        return
+    runtime = time.monotonic() - started
+    try:
+        pipeline = redis_cache.client.pipeline(transaction=False)
+        observe(
+            pipeline,
+            "celery_task_runtime_seconds",
+            f'task="{task.name}",state="{state}"',
+            runtime,
+        )
+        pipeline.execute()
+    except RedisError as e:
+        logger.warning(f"Can't store task metrics: {e}")
+    if runtime >= settings.SLOW_TASK_THRESHOLD:
+        logger.warning(
+            f"Slow task {task.name}[{task_id}] took {runtime:.2f}s "
+            f"(state {state}), args={redact(args)}, kwargs={redact(kwargs)}"
+        )
+
+
+@task_retry.connect
+def on_task_retry(sender=None, **kwargs) -> None:
+    increment("celery_task_retries_total", f'task="{sender.name}"')
+
+
+@task_failure.connect
+def on_task_failure(sender=None, exception=None, **kwargs) -> None:
+    increment(
+        "celery_task_failures_total",
+        f'task="{sender.name}",exception="{type(exception).__name__}"',
+    )
+
+
+def render_metrics() -> str:
+    """Return metrics of this worker host in Prometheus text format"""
+    worker = f'worker="{socket.gethostname()}"'
+    lines = []
+    for metric, (description, buckets) in HISTOGRAMS.items():
+        lines += [f"# HELP {metric} {description}", f"# TYPE {metric} histogram"]
+        prefix = f"{METRICS_PREFIX}:{metric}:"
+        for key in sorted(redis_cache.keys(f"{prefix}*")):
+            labels = f"{worker},{key[len(prefix):]}"
+            values = redis_cache.client.hgetall(key)
+            cumulative = 0
+            for index, bucket in enumerate(buckets):
+                cumulative += int(values.get(str(index), 0))
+                lines.append(f'{metric}_bucket{{{labels},le="{bucket}"}} {cumulative}')
+            count = int(values.get("count", 0))
+            lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{metric}_sum{{{labels}}} {float(values.get('sum', 0))}")
+            lines.append(f"{metric}_count{{{labels}}} {count}")
+    for metric, description in COUNTERS.items():
+        lines += [f"# HELP {metric} {description}", f"# TYPE {metric} counter"]
+        prefix = f"{METRICS_PREFIX}:{metric}:"
+        for key in sorted(redis_cache.keys(f"{prefix}*")):
+            value = int(redis_cache.client.get(key) or 0)
+            lines.append(f"{metric}{{{worker},{key[len(prefix):]}}} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        try:
+            body = render_metrics().encode()
+        except RedisError as e:
+            self.send_error(503, str(e))
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+
+@worker_init.connect
+def start_metrics_server(**kwargs) -> None:
+    """Serve /metrics from the worker main process"""
+    try:
+        server = ThreadingHTTPServer(("", settings.WORKER_METRICS_PORT), MetricsHandler)
+    except OSError as e:
+        logger.warning(f"Metrics endpoint isn't started: {e}")
+        return
+    Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    logger.info(f"Metrics are served on :{settings.WORKER_METRICS_PORT}/metrics")
@@ -1,5 +1,5 @@
 import os
-from typing import Any, Dict, Final, Optional
+from typing import Any, Dict, Final, List, Optional
 
 from pydantic import validator
 from pydantic_settings import BaseSettings
@@ -18,6 +18,26 @@ class Settings(BaseSettings):
 
     DEFAULT_TIME_ZONE: str = os.getenv("DEFAULT_TIME_ZONE", "UTC")
 
+    #############
+    # TMP TOKEN #
+    #############
+    TMP_TOKEN_LIFETIME: int = 30  # 30 minutes
+
+    ###############
+    # MAINTENANCE #
+    ###############
+    # Scheduled jobs change rows in batches, each batch in its own short
+    # transaction, and stop when the time budget of the run is spent
+    MAINTENANCE_BATCH_SIZE: int = os.getenv("MAINTENANCE_BATCH_SIZE", 1000)
+    MAINTENANCE_TIME_BUDGET: int = 60  # Set in seconds per job run
+    MAINTENANCE_LOCK_TIMEOUT: int = 2000  # Set in milliseconds
+    MAINTENANCE_MATERIALIZED_VIEWS: List[str] = []
+    TASK_ARCHIVE_AFTER_DAYS: int = os.getenv("TASK_ARCHIVE_AFTER_DAYS", 90)
+    # Users whose drifted task counters are recounted under one short lock
+    STATS_RECONCILE_BATCH_SIZE: int = 100
+    # Same as in backend, sync tokens expire with tombstones
+    TASK_TOMBSTONE_LIFETIME: int = os.getenv("TASK_TOMBSTONE_LIFETIME", 30)  # Days
+
     #############
     # DATABASES #
     #############
@@ -51,6 +71,13 @@ class Settings(BaseSettings):
     REDIS_CACHE_URL: Final[str] = f"redis://redis"
     REDIS_CACHE_LIFETIME: int = 10  # Set in minutes
 
+    ###########
+    # METRICS #
+    ###########
+    # Prometheus endpoint of the worker (http://<worker>:<port>/metrics)
+    WORKER_METRICS_PORT: int = os.getenv("WORKER_METRICS_PORT", 9808)
+    SLOW_TASK_THRESHOLD: float = os.getenv("SLOW_TASK_THRESHOLD", 5)  # In seconds
+
     #########
     # EMAIL #
     #########
@@ -58,6 +85,40 @@ class Settings(BaseSettings):
     SMTP_HOST: str = os.getenv("SMTP_HOST")
     SMTP_USER: str = os.getenv("SMTP_USER")
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD")
+    SMTP_USE_TLS: bool = os.getenv("SMTP_USE_TLS", True)
+    SMTP_TIMEOUT: int = os.getenv("SMTP_TIMEOUT", 30)  # Set in seconds
+
+    ###############
+    # MAIL WORKER #
+    ###############
+    # Max simultaneous SMTP sessions per recipient domain inside one worker
+    MAIL_DESTINATION_CONCURRENCY: int = os.getenv("MAIL_DESTINATION_CONCURRENCY", 5)
+    # Transient SMTP failures are retried with exponential backoff and jitter,
+    # mails which exhaust retries are stored in `failed_email` table
+    MAIL_MAX_RETRIES: int = os.getenv("MAIL_MAX_RETRIES", 8)
+    MAIL_RETRY_BACKOFF: int = 10  # Set in seconds, doubled on each retry
+    MAIL_RETRY_BACKOFF_MAX: int = 60 * 60  # Set in seconds
+
+    ##########
+    # IMPORT #
+    ##########
+    # Directory shared with the backend where uploaded files are spooled
+    IMPORT_DIR: str = os.getenv("IMPORT_DIR", "/imports")
+    IMPORT_PROGRESS_LIFETIME: int = 60 * 24  # Set in minutes
+    # Rows parsed, resolved and loaded with one COPY
+    IMPORT_CHUNK_SIZE: int = os.getenv("IMPORT_CHUNK_SIZE", 5000)
+    # Max row errors kept in progress record
+    IMPORT_MAX_ERRORS: int = 100
+
+    #############
+    # ANALYTICS #
+    #############
+    # Directory shared with the backend where analytics snapshots are stored
+    ANALYTICS_DIR: str = os.getenv("ANALYTICS_DIR", "/analytics")
+    # Rows fetched from server-side cursor and written as one record batch
+    ANALYTICS_BATCH_SIZE: int = os.getenv("ANALYTICS_BATCH_SIZE", 10000)
+    # Rows created later than now minus this lag are left for the next run
+    ANALYTICS_COMMIT_LAG: int = 5 * 60  # Set in seconds
 
     class Config:
         case_sensitive = True
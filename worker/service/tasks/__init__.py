@@ -1,4 +1,15 @@
+from service.core import metrics  # noqa: F401 (connects signal handlers)
+
+from .analytics import export_analytics_snapshot, rollup_task_flow
 from .delay import celery_app, test_celery
+from .imports import import_tasks_csv
+from .schedule import (
+    archive_done_tasks,
+    purge_expired_invitations,
+    purge_task_tombstones,
+    reconcile_user_task_stats,
+    refresh_statistics,
+)
 
 __all__ = (
     # Celery app
@@ -6,5 +17,15 @@ __all__ = (
     # Test
     "test_celery",
     # Delay
+    # Import
+    "import_tasks_csv",
+    # Analytics
+    "export_analytics_snapshot",
+    "rollup_task_flow",
     # Schedule
+    "purge_expired_invitations",
+    "archive_done_tasks",
+    "purge_task_tombstones",
+    "refresh_statistics",
+    "reconcile_user_task_stats",
 )
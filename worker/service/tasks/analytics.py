@@ -0,0 +1,383 @@
+# This file for analytics snapshot and rollup tasks
+import logging
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import ujson
+from sqlalchemy import text
+
+from db.session import engine
+from service.core import settings
+from service.core.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP = pa.timestamp("us")
+
+FLOW_STATUSES = ("Todo", "InProgress", "Done")
+FLOW_PERCENTILES = (50, 85, 95)
+# Lead and cycle time histogram bucket edges (seconds): 0, then log scale from
+# a minute to two years, longer times fall into the last bucket. Histograms of
+# runs are merged bucket by bucket, so changed edges need rebuilt rollups
+FLOW_HISTOGRAM_EDGES = np.concatenate(([0.0], np.geomspace(60, 2 * 365 * 86400, 200)))
+FLOW_WATERMARK = "task_flow"
+EPOCH = date(1970, 1, 1)
+
+# Snapshot tables: select query (without filter) and Arrow schema
+SNAPSHOT_TABLES = {
+    "task": (
+        "SELECT id, name, description, responsible_person_id, priority, status, "
+        "created_by, created_at FROM task",
+        pa.schema(
+            [
+                ("id", pa.int32()),
+                ("name", pa.string()),
+                ("description", pa.string()),
+                ("responsible_person_id", pa.int32()),
+                ("priority", pa.string()),
+                ("status", pa.string()),
+                ("created_by", pa.int32()),
+                ("created_at", TIMESTAMP),
+            ]
+        ),
+    ),
+    "task_executors": (
+        "SELECT id, user_id, task_id, created_at FROM task_executors",
+        pa.schema(
+            [
+                ("id", pa.int32()),
+                ("user_id", pa.int32()),
+                ("task_id", pa.int32()),
+                ("created_at", TIMESTAMP),
+            ]
+        ),
+    ),
+    # Password hashes never leave the database
+    "user": (
+        'SELECT id, name, email, status::text AS status, created_at FROM "user"',
+        pa.schema(
+            [
+                ("id", pa.int32()),
+                ("name", pa.string()),
+                ("email", pa.string()),
+                ("status", pa.string()),
+                ("created_at", TIMESTAMP),
+            ]
+        ),
+    ),
+}
+
+
+def fetch_batches(
+    query: str, schema: pa.Schema, since: datetime, until: datetime
+) -> Iterator[pa.RecordBatch]:
+    """Yield rows created in (since, until] as record batches"""
+    statement = text(
+        f"{query} WHERE created_at > :since AND created_at <= :until "
+        "ORDER BY created_at, id"
+    )
+    with engine.connect() as connection:
+        result = connection.execution_options(
+            stream_results=True, yield_per=settings.ANALYTICS_BATCH_SIZE
+        ).execute(statement, {"since": since, "until": until})
+        for rows in result.partitions():
+            columns = zip(*rows)
+            yield pa.RecordBatch.from_arrays(
+                [
+                    pa.array(column, type=field.type)
+                    for column, field in zip(columns, schema)
+                ],
+                schema=schema,
+            )
+
+
+def iter_file_batches(path: Path) -> Iterator[pa.RecordBatch]:
+    """Yield record batches of Arrow IPC file without copying them"""
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            yield reader.get_batch(index)
+
+
+def snapshot_table(
+    name: str, since: datetime, until: datetime, full: bool, snapshot_dir: Path
+) -> int:
+    """
+    Write `<name>.arrow` (uncompressed, memory-mappable) and `<name>.parquet`
+    (zstd) snapshots of the table. Unless `full` is set, batches of the
+    previous snapshot are copied and only rows created since it are queried.
+    Files are replaced atomically, so readers never see a partial snapshot.
+    Return the number of rows in the snapshot
+    """
+    query, schema = SNAPSHOT_TABLES[name]
+    arrow_path = snapshot_dir / f"{name}.arrow"
+    parquet_path = snapshot_dir / f"{name}.parquet"
+    if not full and arrow_path.exists():
+        with pa.memory_map(str(arrow_path)) as source:
+            # Schema changes need a full rebuild
+            full = not pa.ipc.open_file(source).schema.equals(schema)
+
+    rows = 0
+    tmp_path = arrow_path.with_suffix(".arrow.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            if not full and arrow_path.exists():
+                for batch in iter_file_batches(arrow_path):
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+            for batch in fetch_batches(query, schema, since, until):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    os.replace(tmp_path, arrow_path)
+
+    tmp_path = parquet_path.with_suffix(".parquet.tmp")
+    with pq.ParquetWriter(str(tmp_path), schema, compression="zstd") as writer:
+        for batch in iter_file_batches(arrow_path):
+            writer.write_batch(batch)
+    os.replace(tmp_path, parquet_path)
+    return rows
+
+
+@celery_app.task(acks_late=True)
+def export_analytics_snapshot(full: bool = False) -> dict:
+    """
+    Export task, task_executors and user tables to ANALYTICS_DIR and write
+    `manifest.json`. Incremental runs only add rows created after the
+    previous watermark, `full` rebuilds the snapshot from scratch
+    """
+    snapshot_dir = Path(settings.ANALYTICS_DIR)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = snapshot_dir / "manifest.json"
+
+    since = datetime.min
+    if not full and manifest_path.exists():
+        since = datetime.fromisoformat(
+            ujson.loads(manifest_path.read_text())["watermark"]
+        )
+    else:
+        full = True
+    # Rows created right before the run may be not committed yet
+    until = datetime.utcnow() - timedelta(seconds=settings.ANALYTICS_COMMIT_LAG)
+
+    tables = {}
+    for name in SNAPSHOT_TABLES:
+        rows = snapshot_table(name, since, until, full, snapshot_dir)
+        tables[name] = {
+            "rows": rows,
+            "arrow": f"{name}.arrow",
+            "parquet": f"{name}.parquet",
+        }
+    manifest = {
+        "watermark": until.isoformat(),
+        "generated_at": datetime.utcnow().isoformat(),
+        "tables": tables,
+    }
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    tmp_path.write_text(ujson.dumps(manifest))
+    os.replace(tmp_path, manifest_path)
+    logger.info(f"Analytics snapshot is exported: {tables}")
+    return manifest
+
+
+# Transitions as numbers, so batches convert to NumPy arrays at once: day since
+# epoch, status indexes (null if created or deleted), lead time (created to
+# Done) and cycle time (first InProgress to Done) in seconds
+FLOW_HISTORY_QUERY = text(
+    "SELECT h.created_at::date - DATE '1970-01-01', "
+    "array_position(CAST(:statuses AS varchar[]), h.from_status) - 1, "
+    "array_position(CAST(:statuses AS varchar[]), h.to_status) - 1, "
+    "extract(epoch FROM h.created_at - created.created_at)::float8, "
+    "extract(epoch FROM h.created_at - started.created_at)::float8 "
+    "FROM task_status_history h "
+    "LEFT JOIN LATERAL ("
+    "    SELECT c.created_at FROM task_status_history c "
+    "    WHERE h.to_status = 'Done' AND c.task_id = h.task_id "
+    "    AND c.from_status IS NULL "
+    "    ORDER BY c.created_at LIMIT 1"
+    ") created ON true "
+    "LEFT JOIN LATERAL ("
+    "    SELECT s.created_at FROM task_status_history s "
+    "    WHERE h.to_status = 'Done' AND s.task_id = h.task_id "
+    "    AND s.to_status = 'InProgress' AND s.created_at <= h.created_at "
+    "    ORDER BY s.created_at LIMIT 1"
+    ") started ON true "
+    "WHERE h.created_at > :since AND h.created_at <= :until"
+)
+
+
+def aggregate_flow(partitions: Iterator[list]) -> tuple[dict, dict]:
+    """
+    Aggregate batches of transitions with NumPy. Return counts of tasks which
+    entered and exited status {(day, status index): [entered, exited]} and
+    lead and cycle time histograms {day: array of shape (2, buckets)}
+    """
+    statuses = len(FLOW_STATUSES)
+    buckets = len(FLOW_HISTOGRAM_EDGES) - 1
+    transitions = defaultdict(lambda: np.zeros(2, dtype=np.int64))
+    histograms = defaultdict(lambda: np.zeros((2, buckets), dtype=np.int64))
+    for rows in partitions:
+        # Nulls become NaN
+        day, from_status, to_status, lead_time, cycle_time = np.array(
+            rows, dtype=np.float64
+        ).T
+        for column, status_index in enumerate((to_status, from_status)):
+            known = ~np.isnan(status_index)
+            keys, counts = np.unique(
+                (day[known] * statuses + status_index[known]).astype(np.int64),
+                return_counts=True,
+            )
+            for key, count in zip(keys, counts):
+                transitions[divmod(int(key), statuses)][column] += count
+        for row, seconds in enumerate((lead_time, cycle_time)):
+            known = ~np.isnan(seconds)
+            bucket = np.clip(
+                np.searchsorted(FLOW_HISTOGRAM_EDGES, seconds[known], side="right") - 1,
+                0,
+                buckets - 1,
+            )
+            keys, counts = np.unique(
+                day[known].astype(np.int64) * buckets + bucket, return_counts=True
+            )
+            for key, count in zip(keys, counts):
+                histograms[int(key) // buckets][row, key % buckets] += count
+    return transitions, histograms
+
+
+def histogram_percentiles(histogram: np.ndarray) -> list[Optional[float]]:
+    """Return FLOW_PERCENTILES (hours) interpolated inside histogram buckets"""
+    total = histogram.sum()
+    if not total:
+        return [None] * len(FLOW_PERCENTILES)
+    cumulative = np.cumsum(histogram)
+    ranks = np.array(FLOW_PERCENTILES) / 100 * total
+    buckets = np.searchsorted(cumulative, ranks)
+    below = np.where(buckets > 0, cumulative[buckets - 1], 0)
+    lower = FLOW_HISTOGRAM_EDGES[buckets]
+    upper = FLOW_HISTOGRAM_EDGES[buckets + 1]
+    seconds = lower + (upper - lower) * (ranks - below) / histogram[buckets]
+    return (seconds / 3600).tolist()
+
+
+@celery_app.task(acks_late=True)
+def rollup_task_flow() -> dict:
+    """
+    Add transitions logged since the previous run to task_status_daily and
+    task_cycle_time_daily rollups. Watermark and rollups change in one
+    transaction, so every transition is counted once even if runs overlap
+    """
+    until = datetime.utcnow() - timedelta(seconds=settings.ANALYTICS_COMMIT_LAG)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO analytics_watermark (name, watermark, created_at) "
+                "VALUES (:name, :watermark, timezone('utc', now())) "
+                "ON CONFLICT (name) DO NOTHING"
+            ),
+            {"name": FLOW_WATERMARK, "watermark": datetime.min},
+        )
+        # Concurrent run waits here and continues from the new watermark
+        since = connection.execute(
+            text(
+                "SELECT watermark FROM analytics_watermark "
+                "WHERE name = :name FOR UPDATE"
+            ),
+            {"name": FLOW_WATERMARK},
+        ).scalar_one()
+        until = max(until, since)
+        result = connection.execution_options(
+            stream_results=True, yield_per=settings.ANALYTICS_BATCH_SIZE
+        ).execute(
+            FLOW_HISTORY_QUERY,
+            {"statuses": list(FLOW_STATUSES), "since": since, "until": until},
+        )
+        transitions, histograms = aggregate_flow(result.partitions())
+
+        if transitions:
+            connection.execute(
+                text(
+                    "INSERT INTO task_status_daily "
+                    "(day, status, entered, exited, created_at) "
+                    "VALUES (:day, :status, :entered, :exited, timezone('utc', now())) "
+                    "ON CONFLICT (day, status) DO UPDATE SET "
+                    "entered = task_status_daily.entered + EXCLUDED.entered, "
+                    "exited = task_status_daily.exited + EXCLUDED.exited"
+                ),
+                [
+                    {
+                        "day": EPOCH + timedelta(days=day),
+                        "status": FLOW_STATUSES[status_index],
+                        "entered": int(entered),
+                        "exited": int(exited),
+                    }
+                    for (day, status_index), (entered, exited) in sorted(
+                        transitions.items()
+                    )
+                ],
+            )
+
+        if histograms:
+            days = {EPOCH + timedelta(days=day): day for day in histograms}
+            stored = connection.execute(
+                text(
+                    "SELECT day, lead_time_histogram, cycle_time_histogram "
+                    "FROM task_cycle_time_daily WHERE day = ANY(:days)"
+                ),
+                {"days": list(days)},
+            )
+            for day, lead_time_histogram, cycle_time_histogram in stored:
+                histograms[days[day]] += np.array(
+                    [lead_time_histogram, cycle_time_histogram], dtype=np.int64
+                )
+            percentiles = [
+                f"{name}_time_p{percentile}"
+                for name in ("lead", "cycle")
+                for percentile in FLOW_PERCENTILES
+            ]
+            params = []
+            for day, histogram in sorted(histograms.items()):
+                values = histogram_percentiles(histogram[0])
+                values += histogram_percentiles(histogram[1])
+                params.append(
+                    {
+                        "day": EPOCH + timedelta(days=day),
+                        "lead_time_histogram": histogram[0].tolist(),
+                        "cycle_time_histogram": histogram[1].tolist(),
+                        **dict(zip(percentiles, values)),
+                    }
+                )
+            connection.execute(
+                text(
+                    "INSERT INTO task_cycle_time_daily (day, lead_time_histogram, "
+                    f"cycle_time_histogram, {', '.join(percentiles)}, created_at) "
+                    "VALUES (:day, :lead_time_histogram, :cycle_time_histogram, "
+                    f"{', '.join(f':{column}' for column in percentiles)}, "
+                    "timezone('utc', now())) "
+                    "ON CONFLICT (day) DO UPDATE SET "
+                    "lead_time_histogram = EXCLUDED.lead_time_histogram, "
+                    "cycle_time_histogram = EXCLUDED.cycle_time_histogram, "
+                    + ", ".join(
+                        f"{column} = EXCLUDED.{column}" for column in percentiles
+                    )
+                ),
+                params,
+            )
+
+        connection.execute(
+            text(
+                "UPDATE analytics_watermark SET watermark = :watermark "
+                "WHERE name = :name"
+            ),
+            {"name": FLOW_WATERMARK, "watermark": until},
+        )
+    rollup = {"since": since.isoformat(), "until": until.isoformat()}
+    logger.info(
+        f"Task flow rollup: {rollup}, {len(transitions)} status and "
+        f"{len(histograms)} cycle time days are updated"
+    )
+    return rollup
@@ -0,0 +1,86 @@
+import smtplib
+from typing import Callable, Sequence
+
+from celery import Task
+from celery.utils.time import get_exponential_backoff_interval
+
+from ..core.settings import settings
+from .utils import save_dead_letter, send_email
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """Return True for SMTP errors which retrying won't fix"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class MailTask(Task):
+    """
+    Base class for mail tasks
+
+    Transient SMTP failures (connection errors, timeouts, 4xx replies) are
+    retried with exponential backoff and full jitter. Permanent failures
+    (5xx replies, refused recipients) and mails which exhausted retries are
+    stored as dead letters in `failed_email` table.
+    """
+
+    acks_late = True
+    max_retries = settings.MAIL_MAX_RETRIES
+
+    def deliver(self, recipient_email: str, subject: str, body: str) -> str:
+        try:
+            return send_email(recipient_email, subject, body)
+        except OSError as e:
+            # smtplib.SMTPException, socket errors and timeouts
+            if is_permanent_error(e):
+                raise
+            raise self.retry(exc=e, countdown=self.get_retry_countdown())
+
+    def deliver_batch(
+        self, recipients: Sequence[Sequence], subject: str, render: Callable[..., str]
+    ) -> str:
+        """
+        Send one mail per recipient `[email, *context]`, body is rendered with
+        `render(*context)`. Only recipients with transient failures are retried
+        """
+        failed, error = [], None
+        # Recipients whose mails are dead letters already
+        rejected = 0
+        for recipient_email, *context in recipients:
+            try:
+                send_email(recipient_email, subject, render(*context))
+            except OSError as e:
+                if is_permanent_error(e):
+                    save_dead_letter(
+                        self.name,
+                        [[[recipient_email, *context]]],
+                        {},
+                        e,
+                        self.request.retries,
+                    )
+                    rejected += 1
+                else:
+                    failed.append([recipient_email, *context])
+                    error = e
+        if failed and self.request.retries < self.max_retries:
+            raise self.retry(
+                args=[failed], exc=error, countdown=self.get_retry_countdown()
+            )
+        if failed:
+            save_dead_letter(self.name, [failed], {}, error, self.request.retries)
+        sent = len(recipients) - len(failed) - rejected
+        return f"Emails sent to {sent} recipients"
+
+    def get_retry_countdown(self) -> int:
+        return get_exponential_backoff_interval(
+            factor=settings.MAIL_RETRY_BACKOFF,
+            retries=self.request.retries,
+            maximum=settings.MAIL_RETRY_BACKOFF_MAX,
+            full_jitter=True,
+        )
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo) -> None:
+        save_dead_letter(self.name, args, kwargs, exc, self.request.retries)
@@ -7,7 +7,7 @@ from jinja2 import Environment, FileSystemLoader
 from service.core import settings
 from service.core.celery_app import celery_app
 
-from .utils import send_email
+from .base import MailTask
 
 
 @celery_app.task(acks_late=True)
@@ -15,40 +15,88 @@ def test_celery(word: str) -> str:
     return f"Test task return {word}"
 
 
-@celery_app.task(acks_late=True)
-def send_invite(email: str, tmp_token: str):
+@celery_app.task(bind=True, base=MailTask)
+def send_invite(self, email: str, tmp_token: str):
     url_link = f"https://{settings.SERVER_HOST}/developer-sign-up/?token={tmp_token}&email={email}"
     template_path = Path("service/templates/email_template.html")
     env = Environment(loader=FileSystemLoader(template_path.parent))
     template = env.get_template(Path("service/templates/email_template.html").name)
-    return send_email(email, "Account Verification", template.render(url=url_link))
+    return self.deliver(email, "Account Verification", template.render(url=url_link))
 
 
-@celery_app.task(acks_late=True)
-def task_creation_confirm(email: str, name: str):
+@celery_app.task(bind=True, base=MailTask)
+def task_creation_confirm(self, email: str, name: str):
     template_path = Path("service/templates/create_task_template.html")
     env = Environment(loader=FileSystemLoader(template_path.parent))
     template = env.get_template(
         Path("service/templates/create_task_template.html").name
     )
-    return send_email(email, "Task created", template.render(name=name))
+    return self.deliver(email, "Task created", template.render(name=name))
 
 
-@celery_app.task(acks_late=True)
-def task_assign_confirm(email: str, name: str):
+@celery_app.task(bind=True, base=MailTask)
+def task_creation_confirm_batch(self, recipients: list[list[str]]):
+    """Notify responsible persons of created tasks, recipient is [email, name]"""
+    template_path = Path("service/templates/create_task_template.html")
+    env = Environment(loader=FileSystemLoader(template_path.parent))
+    template = env.get_template(template_path.name)
+    return self.deliver_batch(
+        recipients, "Task created", lambda name: template.render(name=name)
+    )
+
+
+@celery_app.task(bind=True, base=MailTask)
+def task_assign_confirm(self, email: str, name: str):
     template_path = Path("service/templates/task_assigned_template.html")
     env = Environment(loader=FileSystemLoader(template_path.parent))
     template = env.get_template(
         Path("service/templates/task_assigned_template.html").name
     )
-    return send_email(email, "Task created", template.render(name=name))
+    return self.deliver(email, "Task created", template.render(name=name))
 
 
-@celery_app.task(acks_late=True)
-def task_unassign_confirm(email: str, name: str):
+@celery_app.task(bind=True, base=MailTask)
+def task_unassign_confirm(self, email: str, name: str):
     template_path = Path("service/templates/create_task_template.html")
     env = Environment(loader=FileSystemLoader(template_path.parent))
     template = env.get_template(
         Path("service/templates/task_unassigned_template.html").name
     )
-    return send_email(email, "Task created", template.render(name=name))
+    return self.deliver(email, "Task created", template.render(name=name))
+
+
+@celery_app.task(bind=True, base=MailTask)
+def task_assign_confirm_batch(self, recipients: list[list[str]]):
+    """Notify assigned executors, recipient is [email, name]"""
+    template_path = Path("service/templates/task_assigned_template.html")
+    env = Environment(loader=FileSystemLoader(template_path.parent))
+    template = env.get_template(template_path.name)
+    return self.deliver_batch(
+        recipients, "Task assigned", lambda name: template.render(name=name)
+    )
+
+
+@celery_app.task(bind=True, base=MailTask)
+def task_unassign_confirm_batch(self, recipients: list[list[str]]):
+    """Notify unassigned executors, recipient is [email, name]"""
+    template_path = Path("service/templates/task_unassigned_template.html")
+    env = Environment(loader=FileSystemLoader(template_path.parent))
+    template = env.get_template(template_path.name)
+    return self.deliver_batch(
+        recipients, "Task unassigned", lambda name: template.render(name=name)
+    )
+
+
+@celery_app.task(bind=True, base=MailTask)
+def task_update_notify(self, recipients: list[list[str]]):
+    """Notify task participants, recipient is [email, name, status, priority]"""
+    template_path = Path("service/templates/task_updated_template.html")
+    env = Environment(loader=FileSystemLoader(template_path.parent))
+    template = env.get_template(template_path.name)
+    return self.deliver_batch(
+        recipients,
+        "Task updated",
+        lambda name, status, priority: template.render(
+            name=name, status=status, priority=priority
+        ),
+    )
@@ -0,0 +1,173 @@
+# This file for import tasks
+import csv
+import io
+import logging
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from db.session import DBSession
+from service.core import redis_cache, settings
+from service.core.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+# Mirror backend db.constants, the worker has no access to them
+TASK_STATUSES = {"Todo", "InProgress", "Done"}
+PRIORITIES = {"High", "Medium", "Low"}
+MAX_NAME_LENGTH = 40
+MAX_DESCRIPTIONS_LENGTH = 180
+
+CSV_COLUMNS = {"name", "description", "responsible_email", "status", "priority"}
+COPY_COLUMNS = (
+    "name",
+    "description",
+    "responsible_person_id",
+    "status",
+    "priority",
+    "created_by",
+    "created_at",
+)
+
+
+class EmailResolver:
+    """Resolve user emails to ids, unseen emails of a chunk with one query"""
+
+    def __init__(self) -> None:
+        self.ids: dict[str, Optional[int]] = {}
+
+    def resolve(self, emails: Iterable[str]) -> None:
+        missing = {email for email in emails if email and email not in self.ids}
+        if not missing:
+            return
+        # Unknown emails are cached too, so they aren't queried again
+        self.ids.update(dict.fromkeys(missing))
+        ids_query = text('SELECT email, id FROM "user" WHERE email = ANY(:emails)')
+        with DBSession() as db:
+            self.ids.update(db.execute(ids_query, {"emails": list(missing)}).all())
+
+    def get(self, email: str) -> Optional[int]:
+        return self.ids.get(email)
+
+
+def save_progress(progress: dict) -> None:
+    redis_cache.set(
+        f"task-import:{progress['import_id']}",
+        progress,
+        settings.IMPORT_PROGRESS_LIFETIME,
+    )
+
+
+def iter_chunks(reader: csv.DictReader, size: int) -> Iterator[list]:
+    """Yield lists of (line number, row) without reading the whole file"""
+    rows = ((reader.line_num, row) for row in reader)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def validate_row(row: dict, resolver: EmailResolver) -> Optional[str]:
+    """Return error of CSV row or None"""
+    if not row["name"]:
+        return "name is empty"
+    if len(row["name"]) > MAX_NAME_LENGTH:
+        return f"name is longer than {MAX_NAME_LENGTH}"
+    if len(row["description"]) > MAX_DESCRIPTIONS_LENGTH:
+        return f"description is longer than {MAX_DESCRIPTIONS_LENGTH}"
+    if row["status"] not in TASK_STATUSES:
+        return f"unknown status {row['status']!r}"
+    if row["priority"] not in PRIORITIES:
+        return f"unknown priority {row['priority']!r}"
+    if resolver.get(row["responsible_email"]) is None:
+        return f"user {row['responsible_email']!r} does not exist"
+
+
+def load_chunk(
+    chunk: list, resolver: EmailResolver, created_by: int, progress: dict
+) -> None:
+    """Validate chunk rows and load valid ones with COPY FROM STDIN"""
+    rows = [
+        (line, {key: (row.get(key) or "").strip() for key in CSV_COLUMNS})
+        for line, row in chunk
+    ]
+    resolver.resolve(row["responsible_email"] for _, row in rows)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    created_at = datetime.utcnow().isoformat()
+    created = 0
+    for line, row in rows:
+        error = validate_row(row, resolver)
+        if error:
+            progress["failed"] += 1
+            if len(progress["errors"]) < settings.IMPORT_MAX_ERRORS:
+                progress["errors"].append(f"Line {line}: {error}")
+            continue
+        writer.writerow(
+            (
+                row["name"],
+                row["description"],
+                resolver.get(row["responsible_email"]),
+                row["status"],
+                row["priority"],
+                created_by,
+                created_at,
+            )
+        )
+        created += 1
+
+    if created:
+        buffer.seek(0)
+        with DBSession() as db:
+            cursor = db.connection().connection.cursor()
+            cursor.copy_expert(
+                f"COPY task ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+            db.commit()
+    progress["created"] += created
+    progress["processed"] += len(rows)
+
+
+@celery_app.task
+def import_tasks_csv(import_id: str, path: str, created_by: int) -> dict:
+    """
+    Import tasks from spooled CSV file. The file is read and loaded by chunks
+    of IMPORT_CHUNK_SIZE rows, every chunk is committed and reported to the
+    progress record, so memory doesn't depend on the file size
+    """
+    progress = {
+        "import_id": import_id,
+        "status": "Running",
+        "processed": 0,
+        "created": 0,
+        "failed": 0,
+        "errors": [],
+    }
+    save_progress(progress)
+    resolver = EmailResolver()
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            reader = csv.DictReader(file)
+            missing = CSV_COLUMNS - set(reader.fieldnames or [])
+            if missing:
+                raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+            for chunk in iter_chunks(reader, settings.IMPORT_CHUNK_SIZE):
+                load_chunk(chunk, resolver, created_by, progress)
+                save_progress(progress)
+    except (OSError, ValueError, csv.Error, SQLAlchemyError) as e:
+        logger.exception(f"Import {import_id} failed")
+        progress["status"] = "Failed"
+        progress["errors"].append(str(e))
+    else:
+        progress["status"] = "Done"
+    finally:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    save_progress(progress)
+    return {key: progress[key] for key in ("status", "processed", "created")}
@@ -0,0 +1,278 @@
+# This file for schedule tasks (Celery beat)
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from celery.schedules import crontab
+from sqlalchemy import TextClause, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from db.session import DBSession
+from service.core import settings
+from service.core.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+def run_in_batches(
+    statement: TextClause,
+    params: Optional[dict] = None,
+    batch_size: int = settings.MAINTENANCE_BATCH_SIZE,
+    time_budget: float = settings.MAINTENANCE_TIME_BUDGET,
+) -> int:
+    """
+    Execute batch statement until it changes less than `batch_size` rows or
+    the time budget is spent. Return count of changed rows
+
+    Statement takes `:batch_size` param and should pick its rows with
+    `LIMIT :batch_size FOR UPDATE SKIP LOCKED`, so rows locked by API requests
+    are skipped. Every batch is a short transaction with `lock_timeout`, so a
+    job never holds or waits for locks on hot tables for long.
+    """
+    params = {**(params or {}), "batch_size": batch_size}
+    deadline = time.monotonic() + time_budget
+    changed = 0
+    while time.monotonic() < deadline:
+        with DBSession() as db:
+            db.execute(
+                text(f"SET LOCAL lock_timeout = {settings.MAINTENANCE_LOCK_TIMEOUT}")
+            )
+            try:
+                batch = db.execute(statement, params).rowcount
+                db.commit()
+            except OperationalError as e:
+                db.rollback()
+                logger.warning(f"Batch is skipped till the next run: {e.orig}")
+                break
+        changed += batch
+        if batch < batch_size:
+            break
+    return changed
+
+
+@celery_app.task(acks_late=True)
+def purge_expired_invitations() -> int:
+    """Delete invited developers which haven't signed up while token was alive"""
+    cutoff = datetime.utcnow() - timedelta(minutes=settings.TMP_TOKEN_LIFETIME)
+    statement = text(
+        'DELETE FROM "user" WHERE id IN ('
+        '    SELECT u.id FROM "user" u '
+        "    WHERE u.password IS NULL AND u.status = 'DEVELOPER' "
+        "    AND u.created_at < :cutoff "
+        # Tasks of responsible person would be deleted by cascade
+        "    AND NOT EXISTS ("
+        "        SELECT 1 FROM task t "
+        "        WHERE t.responsible_person_id = u.id OR t.created_by = u.id"
+        "    ) "
+        "    ORDER BY u.id LIMIT :batch_size FOR UPDATE SKIP LOCKED"
+        ")"
+    )
+    deleted = run_in_batches(statement, {"cutoff": cutoff})
+    logger.info(f"Purged {deleted} expired invitations")
+    return deleted
+
+
+@celery_app.task(acks_late=True)
+def archive_done_tasks() -> int:
+    """Move old Done tasks with their executors ids to task_archive table"""
+    cutoff = datetime.utcnow() - timedelta(days=settings.TASK_ARCHIVE_AFTER_DAYS)
+    # All parts of the statement see the same snapshot, so executors are
+    # collected before they are deleted by cascade
+    statement = text(
+        "WITH batch AS ("
+        "    SELECT id FROM task "
+        "    WHERE status = 'Done' AND created_at < :cutoff "
+        "    ORDER BY id LIMIT :batch_size FOR UPDATE SKIP LOCKED"
+        "), moved AS ("
+        "    DELETE FROM task USING batch WHERE task.id = batch.id "
+        "    RETURNING task.*"
+        ") "
+        "INSERT INTO task_archive ("
+        "    id, name, description, responsible_person_id, priority, status, "
+        "    created_by, created_at, executor_ids, archived_at"
+        ") "
+        "SELECT m.id, m.name, m.description, m.responsible_person_id, "
+        "m.priority, m.status, m.created_by, m.created_at, "
+        "ARRAY(SELECT te.user_id FROM task_executors te WHERE te.task_id = m.id), "
+        "timezone('utc', now()) "
+        "FROM moved m"
+    )
+    archived = run_in_batches(statement, {"cutoff": cutoff})
+    logger.info(f"Archived {archived} done tasks")
+    return archived
+
+
+@celery_app.task(acks_late=True)
+def purge_task_tombstones() -> int:
+    """Delete tombstones of removed tasks, sync tokens older than them expire"""
+    # A day more than tokens live: transactions which began before a token was
+    # issued can write tombstones which the token's sync needs
+    cutoff = datetime.utcnow() - timedelta(days=settings.TASK_TOMBSTONE_LIFETIME + 1)
+    statement = text(
+        "DELETE FROM task_tombstone WHERE id IN ("
+        "    SELECT id FROM task_tombstone WHERE created_at < :cutoff "
+        "    ORDER BY id LIMIT :batch_size FOR UPDATE SKIP LOCKED"
+        ")"
+    )
+    deleted = run_in_batches(statement, {"cutoff": cutoff})
+    logger.info(f"Purged {deleted} task tombstones")
+    return deleted
+
+
+def execute_with_lock_timeout(db: Session, statement: str) -> bool:
+    """
+    Execute statement in its own transaction with `lock_timeout`. Return
+    whether it's executed, a statement which waits for a lock longer is
+    skipped till the next run
+    """
+    db.execute(text(f"SET LOCAL lock_timeout = {settings.MAINTENANCE_LOCK_TIMEOUT}"))
+    try:
+        db.execute(text(statement))
+        db.commit()
+    except OperationalError as e:
+        db.rollback()
+        logger.warning(f"{statement} is skipped till the next run: {e.orig}")
+        return False
+    return True
+
+
+@celery_app.task(acks_late=True)
+def refresh_statistics() -> None:
+    """
+    Refresh planner statistics of hot tables and materialized views. A table
+    or view locked by a migration or a long transaction is skipped, instead
+    of queueing API requests behind the job's lock
+    """
+    deadline = time.monotonic() + settings.MAINTENANCE_TIME_BUDGET
+    with DBSession() as db:
+        for table in ("task", "task_executors", '"user"'):
+            execute_with_lock_timeout(db, f"ANALYZE {table}")
+        for view in settings.MAINTENANCE_MATERIALIZED_VIEWS:
+            if time.monotonic() > deadline:
+                logger.warning(f"Time budget is spent, {view} isn't refreshed")
+                break
+            # CONCURRENTLY keeps the view readable while it's refreshed
+            execute_with_lock_timeout(
+                db, f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"
+            )
+
+
+# Tasks of users as responsible person or executor, a task is counted once
+# for a user who is both
+ACTUAL_USER_TASK_STATS = (
+    "SELECT p.user_id, t.status, t.priority, count(*) AS count "
+    "FROM ("
+    "    SELECT responsible_person_id AS user_id, id AS task_id FROM task "
+    "    {task_condition} "
+    "    UNION SELECT user_id, task_id FROM task_executors {executors_condition}"
+    ") p "
+    "JOIN task t ON t.id = p.task_id "
+    "GROUP BY 1, 2, 3"
+)
+
+
+@celery_app.task(acks_late=True)
+def reconcile_user_task_stats() -> int:
+    """
+    Recount user_task_stats counters from task and task_executors tables and
+    fix the drifted ones (e.g. after changes made with triggers disabled).
+    Return count of fixed counters
+
+    Users whose counters differ are found in one snapshot without locks, a
+    difference can also be a change which is being committed. Their counters
+    are recounted and fixed in batches of STATS_RECONCILE_BATCH_SIZE users,
+    each under a short lock of the counters table.
+    """
+    actual = ACTUAL_USER_TASK_STATS.format(task_condition="", executors_condition="")
+    drifted_statement = text(
+        f"SELECT DISTINCT user_id FROM ({actual}) a "
+        "FULL JOIN user_task_stats s USING (user_id, status, priority) "
+        "WHERE coalesce(a.count, 0) <> coalesce(s.count, 0) "
+        "ORDER BY 1"
+    )
+    actual = ACTUAL_USER_TASK_STATS.format(
+        task_condition="WHERE responsible_person_id = ANY(:user_ids)",
+        executors_condition="WHERE user_id = ANY(:user_ids)",
+    )
+    fix_statement = text(
+        "INSERT INTO user_task_stats (user_id, status, priority, count, created_at) "
+        "SELECT user_id, status, priority, coalesce(a.count, 0), "
+        "timezone('utc', now()) "
+        f"FROM ({actual}) a "
+        "FULL JOIN (SELECT * FROM user_task_stats WHERE user_id = ANY(:user_ids)) s "
+        "USING (user_id, status, priority) "
+        "WHERE coalesce(a.count, 0) <> coalesce(s.count, 0) "
+        "ORDER BY 1, 2, 3 "
+        "ON CONFLICT (user_id, status, priority) DO UPDATE SET count = EXCLUDED.count"
+    )
+    with DBSession() as db:
+        user_ids = db.execute(drifted_statement).scalars().all()
+    batch_size = settings.STATS_RECONCILE_BATCH_SIZE
+    deadline = time.monotonic() + settings.MAINTENANCE_TIME_BUDGET
+    fixed = 0
+    for start in range(0, len(user_ids), batch_size):
+        end = start + batch_size
+        if time.monotonic() > deadline:
+            logger.warning("Time budget is spent, reconcile continues next run")
+            break
+        with DBSession() as db:
+            db.execute(
+                text(f"SET LOCAL lock_timeout = {settings.MAINTENANCE_LOCK_TIMEOUT}")
+            )
+            try:
+                # Triggers change counters in the transaction which changes
+                # tasks, so the lock makes the recount and counters see the
+                # same transactions. It is held for a recount of a few users
+                db.execute(
+                    text("LOCK TABLE user_task_stats IN SHARE ROW EXCLUSIVE MODE")
+                )
+                fixed += db.execute(
+                    fix_statement, {"user_ids": user_ids[start:end]}
+                ).rowcount
+                db.commit()
+            except OperationalError as e:
+                db.rollback()
+                logger.warning(f"Batch is skipped till the next run: {e.orig}")
+                break
+    logger.info(f"Fixed {fixed} user task stats counters")
+    return fixed
+
+
+celery_app.conf.beat_schedule = {
+    "purge-expired-invitations": {
+        "task": "service.tasks.schedule.purge_expired_invitations",
+        "schedule": crontab(minute=15),
+    },
+    "archive-done-tasks": {
+        "task": "service.tasks.schedule.archive_done_tasks",
+        "schedule": crontab(hour=2, minute=30),
+    },
+    "purge-task-tombstones": {
+        "task": "service.tasks.schedule.purge_task_tombstones",
+        "schedule": crontab(hour=2, minute=0),
+    },
+    "refresh-statistics": {
+        "task": "service.tasks.schedule.refresh_statistics",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "reconcile-user-task-stats": {
+        "task": "service.tasks.schedule.reconcile_user_task_stats",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "rollup-task-flow": {
+        "task": "service.tasks.analytics.rollup_task_flow",
+        "schedule": crontab(minute=45),
+    },
+    "export-analytics-snapshot": {
+        "task": "service.tasks.analytics.export_analytics_snapshot",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    # Incremental snapshots don't see updated and deleted rows
+    "rebuild-analytics-snapshot": {
+        "task": "service.tasks.analytics.export_analytics_snapshot",
+        "schedule": crontab(hour=5, minute=0, day_of_week="sunday"),
+        "kwargs": {"full": True},
+    },
+}
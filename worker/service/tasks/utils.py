@@ -2,33 +2,79 @@ import smtplib
 from datetime import datetime
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from threading import BoundedSemaphore, Lock
+
+import ujson
+from sqlalchemy import text
+
+from db.session import DBSession
 
 from ..core.settings import settings
 
+# Per recipient domain SMTP session limits, shared by all pool threads/greenlets
+_destination_slots: dict[str, BoundedSemaphore] = {}
+_destination_slots_lock = Lock()
+
 
 def get_default_now() -> str:
     """Return UTC+3"""
     return datetime.utcnow()
 
 
-def send_email(recipient_email: str, subject: str, body: str):
-    try:
-        # Prepare the email
-        msg = MIMEMultipart()
-        msg["From"] = settings.SMTP_USER
-        msg["To"] = recipient_email
-        msg["Subject"] = subject
+def get_destination_slot(recipient_email: str) -> BoundedSemaphore:
+    """Return semaphore which caps concurrent sends to recipient's mail domain"""
+    domain = recipient_email.rsplit("@", 1)[-1].lower()
+    with _destination_slots_lock:
+        slot = _destination_slots.get(domain)
+        if slot is None:
+            slot = BoundedSemaphore(settings.MAIL_DESTINATION_CONCURRENCY)
+            _destination_slots[domain] = slot
+    return slot
+
 
-        # Attach the body as HTML
-        msg.attach(MIMEText(body, "html"))
+def send_email(recipient_email: str, subject: str, body: str) -> str:
+    """Send HTML email. SMTP and connection errors are raised to the caller"""
+    # Prepare the email
+    msg = MIMEMultipart()
+    msg["From"] = settings.SMTP_USER
+    msg["To"] = recipient_email
+    msg["Subject"] = subject
 
-        # Connect to the SMTP server
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
+    # Attach the body as HTML
+    msg.attach(MIMEText(body, "html"))
+
+    # Connect to the SMTP server
+    with get_destination_slot(recipient_email), smtplib.SMTP(
+        settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT
+    ) as server:
+        if settings.SMTP_USE_TLS:
             server.starttls()
             server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
 
-            server.sendmail(settings.SMTP_USER, recipient_email, msg.as_string())
+        server.sendmail(settings.SMTP_USER, recipient_email, msg.as_string())
 
-    except Exception as e:
-        return f"Failed to send email: {str(e)}"
     return f"Email sent to {recipient_email}"
+
+
+def save_dead_letter(
+    task_name: str, args: list, kwargs: dict, error: Exception, retries: int
+) -> None:
+    """Store mail task which can't be delivered for future replay"""
+    insert_query = text(
+        "INSERT INTO failed_email "
+        "(task_name, args, kwargs, error, retries, created_at) "
+        "VALUES (:task_name, CAST(:args AS JSONB), CAST(:kwargs AS JSONB), "
+        ":error, :retries, timezone('utc', now()))"
+    )
+    with DBSession() as db:
+        db.execute(
+            insert_query,
+            {
+                "task_name": task_name,
+                "args": ujson.dumps(list(args or [])),
+                "kwargs": ujson.dumps(kwargs or {}),
+                "error": f"{type(error).__name__}: {error}",
+                "retries": retries,
+            },
+        )
+        db.commit()
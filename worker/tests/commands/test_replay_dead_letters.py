@@ -0,0 +1,70 @@
+from unittest import mock
+
+import ujson
+from sqlalchemy import text
+
+from service.commands.replay_dead_letters import replay_dead_letters
+from tests.conftests import TestCase, TestSession
+
+
+class ReplayDeadLettersTestCase(TestCase):
+    def setUp(self) -> None:
+        patcher = mock.patch(
+            "service.commands.replay_dead_letters.celery_app.send_task"
+        )
+        self.send_task = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def add_dead_letter(self, task_name: str, args: list, replayed: bool = False):
+        TestSession.execute(
+            text(
+                "INSERT INTO failed_email "
+                "(task_name, args, kwargs, error, retries, replayed_at, created_at) "
+                "VALUES (:task_name, CAST(:args AS JSONB), '{}', 'Error', 8, "
+                "CASE WHEN :replayed THEN now() END, now())"
+            ),
+            {"task_name": task_name, "args": ujson.dumps(args), "replayed": replayed},
+        )
+        TestSession.commit()
+
+    def get_pending_count(self) -> int:
+        query = text("SELECT count(*) FROM failed_email WHERE replayed_at IS NULL")
+        count = TestSession.execute(query).scalar()
+        TestSession.commit()
+        return count
+
+    def test_success_replay_oldest_first(self) -> None:
+        self.add_dead_letter("confirm", ["a@b.test", "1"])
+        self.add_dead_letter("confirm", ["c@d.test", "2"], replayed=True)
+        self.add_dead_letter("notify", [[["e@f.test", "3"]]])
+        self.add_dead_letter("confirm", ["g@h.test", "4"])
+
+        assert replay_dead_letters(batch_size=2, rate=1000) == 3
+        assert self.send_task.call_args_list == [
+            mock.call("confirm", args=["a@b.test", "1"], kwargs={}),
+            mock.call("notify", args=[[["e@f.test", "3"]]], kwargs={}),
+            mock.call("confirm", args=["g@h.test", "4"], kwargs={}),
+        ]
+        assert self.get_pending_count() == 0
+        # Replayed dead letters aren't published again
+        assert replay_dead_letters(batch_size=2, rate=1000) == 0
+
+    def test_success_replay_task_name_and_limit(self) -> None:
+        for index in range(3):
+            self.add_dead_letter("confirm", [f"{index}@b.test", "Name"])
+        self.add_dead_letter("notify", [[["e@f.test", "Name"]]])
+
+        assert replay_dead_letters(rate=1000, task_name="confirm", limit=2) == 2
+        assert [call.args[0] for call in self.send_task.call_args_list] == [
+            "confirm",
+            "confirm",
+        ]
+        assert self.get_pending_count() == 2
+
+    def test_invalid_publish_failed(self) -> None:
+        self.add_dead_letter("confirm", ["a@b.test", "1"])
+        self.send_task.side_effect = ConnectionError("Broker is down")
+        with self.assertRaises(ConnectionError):
+            replay_dead_letters(rate=1000)
+        # Batch isn't marked as replayed unless it is published
+        assert self.get_pending_count() == 1
@@ -0,0 +1,63 @@
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy_utils import create_database, database_exists, drop_database
+
+from service.core import settings
+
+# Create test engine
+test_engine = create_engine(settings.PSQL_TEST_DB_URI, pool_pre_ping=True)
+# Create test Session
+TestSession = scoped_session(
+    sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+)
+
+# Worker has no models, tables it writes are created like backend migrations do
+TABLES_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS failed_email (
+        id SERIAL PRIMARY KEY,
+        task_name VARCHAR NOT NULL,
+        args JSONB NOT NULL,
+        kwargs JSONB NOT NULL,
+        error TEXT NOT NULL,
+        retries INTEGER NOT NULL,
+        replayed_at TIMESTAMP WITHOUT TIME ZONE,
+        created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+    )
+    """,
+)
+TABLES = ("failed_email",)
+# Modules which open their own DB sessions
+SESSION_MODULES = (
+    "service.tasks.utils",
+    "service.tasks.schedule",
+    "service.commands.replay_dead_letters",
+)
+
+
+class TestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.addClassCleanup(drop_database, settings.PSQL_TEST_DB_URI)
+        if not database_exists(settings.PSQL_TEST_DB_URI):
+            # Crete test database
+            create_database(settings.PSQL_TEST_DB_URI)
+        with test_engine.connect() as connection:
+            for statement in TABLES_DDL:
+                connection.execute(text(statement))
+            connection.commit()
+        # Overwrite sessions of the worker database
+        for module in SESSION_MODULES:
+            patcher = mock.patch(f"{module}.DBSession", TestSession)
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
+        cls.addClassCleanup(test_engine.dispose)
+
+    def tearDown(self) -> None:
+        with test_engine.connect() as connection:
+            for table in TABLES:
+                connection.execute(text(f"DELETE FROM {table}"))
+            connection.commit()
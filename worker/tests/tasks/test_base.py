@@ -0,0 +1,153 @@
+import smtplib
+from unittest import mock
+
+from celery.exceptions import Retry
+from sqlalchemy import text
+
+from service.core import settings
+from service.tasks.base import is_permanent_error
+from service.tasks.delay import task_creation_confirm, task_update_notify
+from tests.conftests import TestCase, TestSession
+
+TRANSIENT_ERROR = smtplib.SMTPResponseException(421, b"Try again later")
+PERMANENT_ERROR = smtplib.SMTPResponseException(550, b"No such user")
+
+
+class MailTaskTestCase(TestCase):
+    def setUp(self) -> None:
+        patcher = mock.patch("service.tasks.base.send_email")
+        self.send_email = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_task(self, task, retries: int, method: str, *args):
+        """Call method of task as its attempt number `retries`"""
+        task.push_request(retries=retries)
+        self.addCleanup(task.pop_request)
+        with mock.patch.object(task, "retry", side_effect=Retry) as retry:
+            try:
+                result = getattr(task, method)(*args)
+            except Retry:
+                result = None
+        return result, retry
+
+    def get_dead_letters(self) -> list:
+        query = text(
+            "SELECT task_name, args, kwargs, error, retries FROM failed_email "
+            "ORDER BY id"
+        )
+        dead_letters = [tuple(row) for row in TestSession.execute(query)]
+        TestSession.commit()
+        return dead_letters
+
+    def test_success_permanent_errors(self) -> None:
+        assert is_permanent_error(PERMANENT_ERROR)
+        assert is_permanent_error(
+            smtplib.SMTPRecipientsRefused({"a@b.test": (550, b"No such user")})
+        )
+        assert not is_permanent_error(TRANSIENT_ERROR)
+        assert not is_permanent_error(smtplib.SMTPServerDisconnected())
+        assert not is_permanent_error(ConnectionRefusedError())
+        assert not is_permanent_error(TimeoutError())
+
+    def test_success_transient_error_retried(self) -> None:
+        for error in (TRANSIENT_ERROR, ConnectionRefusedError(), TimeoutError()):
+            self.send_email.side_effect = error
+            result, retry = self.run_task(
+                task_creation_confirm, 2, "deliver", "a@b.test", "Subject", "Body"
+            )
+            retry.assert_called_once_with(exc=error, countdown=mock.ANY)
+            # Full jitter over exponential backoff
+            countdown = retry.call_args.kwargs["countdown"]
+            assert 0 <= countdown <= settings.MAIL_RETRY_BACKOFF * 2**2
+        assert self.get_dead_letters() == []
+
+    def test_success_retry_countdown_capped(self) -> None:
+        task_creation_confirm.push_request(retries=30)
+        self.addCleanup(task_creation_confirm.pop_request)
+        countdowns = [task_creation_confirm.get_retry_countdown() for _ in range(50)]
+        assert all(0 <= item <= settings.MAIL_RETRY_BACKOFF_MAX for item in countdowns)
+        # Jitter spreads retries of mails which failed together
+        assert len(set(countdowns)) > 1
+
+    def test_success_permanent_error_dead_letter(self) -> None:
+        self.send_email.side_effect = PERMANENT_ERROR
+        with self.assertRaises(smtplib.SMTPResponseException):
+            self.run_task(
+                task_creation_confirm, 0, "deliver", "a@b.test", "Subject", "Body"
+            )
+        # Raised errors are stored by Celery failure handler, without retries
+        task_creation_confirm.on_failure(
+            PERMANENT_ERROR, "id", ["a@b.test", "Name"], {}, None
+        )
+        assert self.get_dead_letters() == [
+            (
+                task_creation_confirm.name,
+                ["a@b.test", "Name"],
+                {},
+                "SMTPResponseException: (550, b'No such user')",
+                0,
+            )
+        ]
+
+    def test_success_batch_retries_only_transient_failures(self) -> None:
+        recipients = [["ok@b.test", "1"], ["later@b.test", "2"], ["no@b.test", "3"]]
+        errors = {"later@b.test": TRANSIENT_ERROR, "no@b.test": PERMANENT_ERROR}
+
+        def send_email(email: str, subject: str, body: str) -> str:
+            if email in errors:
+                raise errors[email]
+            return f"Email sent to {email}"
+
+        self.send_email.side_effect = send_email
+        result, retry = self.run_task(
+            task_update_notify,
+            1,
+            "deliver_batch",
+            recipients,
+            "Subject",
+            lambda name: f"Body {name}",
+        )
+        retry.assert_called_once_with(
+            args=[[["later@b.test", "2"]]], exc=TRANSIENT_ERROR, countdown=mock.ANY
+        )
+        assert [call.args[2] for call in self.send_email.call_args_list] == [
+            "Body 1",
+            "Body 2",
+            "Body 3",
+        ]
+        # Permanently failed recipient isn't retried
+        assert self.get_dead_letters() == [
+            (
+                task_update_notify.name,
+                [[["no@b.test", "3"]]],
+                {},
+                "SMTPResponseException: (550, b'No such user')",
+                1,
+            )
+        ]
+
+    def test_success_batch_retries_exhausted(self) -> None:
+        recipients = [["ok@b.test", "1"], ["later@b.test", "2"], ["no@b.test", "3"]]
+        errors = {"later@b.test": TRANSIENT_ERROR, "no@b.test": PERMANENT_ERROR}
+
+        def send_email(email: str, subject: str, body: str) -> str:
+            if email in errors:
+                raise errors[email]
+            return f"Email sent to {email}"
+
+        self.send_email.side_effect = send_email
+        result, retry = self.run_task(
+            task_update_notify,
+            settings.MAIL_MAX_RETRIES,
+            "deliver_batch",
+            recipients,
+            "Subject",
+            lambda name: name,
+        )
+        retry.assert_not_called()
+        # Failed recipients aren't counted as sent
+        assert result == "Emails sent to 1 recipients"
+        assert [row[1] for row in self.get_dead_letters()] == [
+            [[["no@b.test", "3"]]],
+            [[["later@b.test", "2"]]],
+        ]
@@ -0,0 +1,69 @@
+import time
+from unittest import mock
+
+from sqlalchemy import text
+
+from service.core import settings
+from service.tasks.schedule import refresh_statistics
+from tests.conftests import TestCase, TestSession, test_engine
+
+# Hot tables of the backend, their columns don't matter to the job
+STATISTICS_DDL = (
+    "CREATE TABLE IF NOT EXISTS task (id SERIAL PRIMARY KEY)",
+    "CREATE TABLE IF NOT EXISTS task_executors (task_id INTEGER, user_id INTEGER)",
+    'CREATE TABLE IF NOT EXISTS "user" (id SERIAL PRIMARY KEY)',
+    "CREATE MATERIALIZED VIEW IF NOT EXISTS task_count AS "
+    "SELECT 1 AS id, count(*) AS count FROM task",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_task_count_id ON task_count (id)",
+)
+
+
+class RefreshStatisticsTestCase(TestCase):
+    def setUp(self) -> None:
+        with test_engine.connect() as connection:
+            for statement in STATISTICS_DDL:
+                connection.execute(text(statement))
+            connection.commit()
+        patcher = mock.patch.multiple(
+            settings,
+            MAINTENANCE_LOCK_TIMEOUT=100,
+            MAINTENANCE_MATERIALIZED_VIEWS=["task_count"],
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        with test_engine.connect() as connection:
+            connection.execute(text("DROP TABLE task, task_executors CASCADE"))
+            connection.execute(text('DROP TABLE "user"'))
+            connection.commit()
+        super().tearDown()
+
+    def get_task_count(self) -> int:
+        count = TestSession.execute(text("SELECT count FROM task_count")).scalar()
+        TestSession.commit()
+        return count
+
+    def test_success_refresh_statistics(self) -> None:
+        TestSession.execute(text("INSERT INTO task DEFAULT VALUES"))
+        TestSession.commit()
+        refresh_statistics()
+        assert self.get_task_count() == 1
+
+    def test_success_locked_table_skipped(self) -> None:
+        TestSession.execute(text("INSERT INTO task DEFAULT VALUES"))
+        TestSession.commit()
+        with test_engine.connect() as connection:
+            # Migration holds the table
+            connection.execute(
+                text("LOCK TABLE task_executors IN ACCESS EXCLUSIVE MODE")
+            )
+            started = time.monotonic()
+            with self.assertLogs("service.tasks.schedule", "WARNING") as logs:
+                refresh_statistics()
+            assert time.monotonic() - started < 2
+            connection.rollback()
+        assert len(logs.output) == 1
+        assert "ANALYZE task_executors is skipped" in logs.output[0]
+        # Statements after the locked one are run
+        assert self.get_task_count() == 1
@@ -0,0 +1,78 @@
+import smtplib
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from uuid import uuid4
+
+from service.core import settings
+from service.tasks.utils import get_destination_slot, send_email
+
+
+class DestinationSlotTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        # Slots live for the whole process, every test gets its own domain
+        self.domain = f"{uuid4().hex}.test"
+        patcher = mock.patch("service.tasks.utils.smtplib.SMTP")
+        self.smtp = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.server = self.smtp.return_value.__enter__.return_value
+
+    def test_success_slot_per_domain(self) -> None:
+        slot = get_destination_slot(f"a@{self.domain}")
+        assert get_destination_slot(f"b@{self.domain.upper()}") is slot
+        assert get_destination_slot("a@other.test") is not slot
+
+    def test_success_concurrent_sends_capped(self) -> None:
+        limit = settings.MAIL_DESTINATION_CONCURRENCY
+        lock, running, peak = threading.Lock(), [0], [0]
+        release = threading.Event()
+
+        def sendmail(*args) -> None:
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            release.wait(5)
+            with lock:
+                running[0] -= 1
+
+        self.server.sendmail.side_effect = sendmail
+        slot = get_destination_slot(f"a@{self.domain}")
+        with ThreadPoolExecutor(max_workers=limit + 2) as executor:
+            futures = [
+                executor.submit(send_email, f"{index}@{self.domain}", "S", "B")
+                for index in range(limit + 2)
+            ]
+            # Senders over the limit wait for a slot
+            for _ in range(50):
+                if running[0] == limit:
+                    break
+                time.sleep(0.02)
+            assert running[0] == limit
+            assert not slot.acquire(timeout=0.1)
+            release.set()
+            for future in futures:
+                future.result()
+        assert peak[0] == limit
+        assert self.server.sendmail.call_count == limit + 2
+
+    def test_success_slot_released_on_error(self) -> None:
+        limit = settings.MAIL_DESTINATION_CONCURRENCY
+        slot = get_destination_slot(f"a@{self.domain}")
+        self.server.sendmail.side_effect = smtplib.SMTPResponseException(
+            421, b"Try again later"
+        )
+        # As many failed sends as slots, a leaked slot fails the check below
+        for _ in range(limit - 1):
+            with self.assertRaises(smtplib.SMTPResponseException):
+                send_email(f"a@{self.domain}", "S", "B")
+        self.smtp.side_effect = ConnectionRefusedError()
+        with self.assertRaises(ConnectionRefusedError):
+            send_email(f"a@{self.domain}", "S", "B")
+        # Every slot is free again
+        for _ in range(limit):
+            assert slot.acquire(timeout=0.1)
+        assert not slot.acquire(timeout=0.1)
+        for _ in range(limit):
+            slot.release()